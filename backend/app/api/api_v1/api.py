@@ -3,7 +3,7 @@ API v1 router configuration
 """
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import funds, holdings, stock_prices
+from app.api.api_v1.endpoints import exposure, funds, holdings, search, stock_prices
 
 # Create API router
 api_router = APIRouter()
@@ -12,3 +12,5 @@ api_router = APIRouter()
 api_router.include_router(funds.router, prefix="/funds", tags=["funds"])
 api_router.include_router(holdings.router, prefix="/holdings", tags=["holdings"])
 api_router.include_router(stock_prices.router, prefix="/stock-prices", tags=["stock-prices"])
+api_router.include_router(exposure.router, prefix="/exposure", tags=["exposure"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
@@ -0,0 +1,177 @@
+"""
+Firm-wide look-through exposure API endpoints
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.versioning import conditional_get
+from app.schemas.exposure import (
+    ConcentrationResponse,
+    FundOverlapResponse,
+    SectorExposureResponse,
+    SectorExposuresResponse,
+    SimilarFundsResponse,
+    SimilarityMatrixResponse,
+    TickerExposureResponse,
+)
+from app.services.exposure_service import MATRIX_VERSIONS, ExposureService
+from app.services.similarity_service import SIMILARITY_VERSIONS, SimilarityService
+
+router = APIRouter()
+
+
+@router.get("/tickers/{ticker}", response_model=TickerExposureResponse)
+async def get_ticker_exposure(
+    request: Request,
+    response: Response,
+    ticker: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Firm-wide market value held in a ticker and its split across funds
+    """
+    not_modified = await conditional_get(request, response, db, MATRIX_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    exposure = await ExposureService(db).get_ticker_exposure(ticker)
+    if exposure is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No fund holds {ticker.upper()}"
+        )
+    return exposure
+
+
+@router.get("/sectors", response_model=SectorExposuresResponse)
+async def get_sector_exposures(
+    request: Request,
+    response: Response,
+    fund_ids: Optional[List[int]] = Query(None, description="Funds to aggregate (all funds when omitted)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Market value per sector across all funds or a selection of them
+    """
+    not_modified = await conditional_get(request, response, db, MATRIX_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    return await ExposureService(db).get_sector_exposures(fund_ids)
+
+
+@router.get("/sectors/{sector}", response_model=SectorExposureResponse)
+async def get_sector_exposure(
+    request: Request,
+    response: Response,
+    sector: str,
+    limit: int = Query(10, ge=1, le=100, description="Number of top tickers to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Firm-wide exposure to a sector, its largest tickers and its split across funds
+    """
+    not_modified = await conditional_get(request, response, db, MATRIX_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    exposure = await ExposureService(db).get_sector_exposure(sector, limit)
+    if exposure is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No holdings in sector '{sector}'"
+        )
+    return exposure
+
+
+@router.get("/concentrations", response_model=ConcentrationResponse)
+async def get_concentrations(
+    request: Request,
+    response: Response,
+    by: str = Query("ticker", pattern="^(ticker|sector)$", description="Aggregate by ticker or sector"),
+    limit: int = Query(20, ge=1, le=500, description="Number of concentrations to return"),
+    fund_ids: Optional[List[int]] = Query(None, description="Funds to aggregate (all funds when omitted)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Largest tickers or sectors by market value, with the heaviest single-fund weight in each
+    """
+    not_modified = await conditional_get(request, response, db, MATRIX_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    return await ExposureService(db).get_concentrations(by, limit, fund_ids)
+
+
+@router.get("/funds/{fund_id}/overlap", response_model=FundOverlapResponse)
+async def get_fund_overlap(
+    request: Request,
+    response: Response,
+    fund_id: int,
+    limit: int = Query(10, ge=1, le=100, description="Number of overlapping funds to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Funds whose books overlap most with a fund, by weighted overlap
+    """
+    not_modified = await conditional_get(request, response, db, MATRIX_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    overlap = await ExposureService(db).get_fund_overlap(fund_id, limit)
+    if overlap is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fund with id {fund_id} not found"
+        )
+    return overlap
+
+
+@router.get("/funds/{fund_id}/similar", response_model=SimilarFundsResponse)
+async def get_similar_funds(
+    request: Request,
+    response: Response,
+    fund_id: int,
+    metric: str = Query("overlap", pattern="^(overlap|cosine|common)$", description="Rank by weighted overlap, cosine similarity or common holdings"),
+    limit: int = Query(10, ge=1, le=50, description="Number of similar funds to return (at most SIMILARITY_TOP_K)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Funds holding the most similar books to a fund, from the precomputed similarity index
+    """
+    not_modified = await conditional_get(request, response, db, SIMILARITY_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    similar = await SimilarityService(db).get_similar_funds(fund_id, metric, limit)
+    if similar is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fund with id {fund_id} not found"
+        )
+    return similar
+
+
+@router.get("/similarity", response_model=SimilarityMatrixResponse)
+async def get_similarity_matrix(
+    request: Request,
+    response: Response,
+    fund_ids: List[int] = Query(..., description="Funds to compare pairwise"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Weighted overlap, cosine similarity and common holdings for every pair of the given funds
+    """
+    if len(fund_ids) > 200:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Maximum 200 funds allowed per request"
+        )
+    
+    not_modified = await conditional_get(request, response, db, SIMILARITY_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    return await SimilarityService(db).get_similarity_matrix(fund_ids)
@@ -2,41 +2,105 @@
 Fund management API endpoints
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.pagination import InvalidCursor, estimate_count, set_page_headers
+from app.core.serialization import ResponseSerializer
+from app.core.versioning import conditional_get
 from app.schemas.fund import (
     Fund, 
     FundCreate, 
     FundUpdate, 
     FundSummary, 
+    FundPerformanceData,
     FundPerformanceResponse,
-    PeerComparisonResponse
+    FundPerformanceWriteResponse,
+    FundAnalyticsResponse,
+    PeerComparisonResponse,
+    PeerRankingRefreshResponse
 )
-from app.services.fund_service import FundService
+from app.services.analytics_service import AnalyticsService
+from app.services.fund_service import FUND_KEYSET, FundService
+from app.services.peer_service import PeerRankingService
 
 router = APIRouter()
 
+FUNDS_SERIALIZER = ResponseSerializer("list_funds", List[Fund])
+PERFORMANCE_SERIALIZER = ResponseSerializer("get_fund_performance", FundPerformanceResponse)
+
+# Data versions behind each conditional GET; a write to any of them changes the ETag
+FUND_LIST_VERSIONS = ("funds", "holdings", "stock_prices", "performance", "read_models")
+FUND_PERFORMANCE_VERSIONS = ("performance",)
+FUND_PEERS_VERSIONS = ("peers",)
+
 
 @router.get("/", response_model=List[Fund])
 async def list_funds(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of funds to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of funds to return"),
-    search: Optional[str] = Query(None, description="Search funds by name or manager"),
+    search: Optional[str] = Query(None, description="Search funds by name, manager or description, most relevant first"),
+    cursor: Optional[str] = Query(None, description="Continue after the page that returned this X-Next-Cursor"),
+    estimate_total: bool = Query(False, description="Return an estimated row count in X-Total-Estimate"),
     db: AsyncSession = Depends(get_db)
 ) -> List[Fund]:
     """
     Retrieve all funds with summary information
     """
+    not_modified = await conditional_get(request, response, db, FUND_LIST_VERSIONS)
+    if not_modified:
+        return not_modified
+    
     fund_service = FundService(db)
     
     if search:
         funds = await fund_service.search_funds(search, limit)
     else:
-        funds = await fund_service.get_funds(skip=skip, limit=limit)
+        try:
+            funds = await fund_service.get_funds(skip=skip, limit=limit, cursor=cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        total = await estimate_count(db, "funds") if estimate_total else None
+        set_page_headers(response, FUND_KEYSET.next_cursor(funds, limit), total)
     
-    return funds
+    return FUNDS_SERIALIZER.response(funds, response)
+
+
+@router.get("/analytics", response_model=FundAnalyticsResponse)
+async def get_funds_analytics(
+    fund_ids: Optional[List[int]] = Query(None, description="Funds to analyse (all funds when omitted)"),
+    days: int = Query(365, ge=2, le=3650, description="Trailing window in calendar days"),
+    benchmark: Optional[str] = Query("SPY", max_length=10, description="Benchmark ticker for beta and tracking error"),
+    risk_free_rate: float = Query(0.0, ge=0, le=1, description="Annual risk-free rate as a fraction"),
+    db: AsyncSession = Depends(get_db)
+) -> FundAnalyticsResponse:
+    """
+    Get volatility, Sharpe/Sortino ratios, max drawdown, tracking error and
+    beta for many funds at once
+    """
+    if fund_ids is not None and len(fund_ids) > 500:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Maximum 500 funds allowed per request"
+        )
+    
+    analytics_service = AnalyticsService(db)
+    return await analytics_service.get_risk_metrics(fund_ids, days, benchmark, risk_free_rate)
+
+
+@router.post("/peer-rankings/refresh", response_model=PeerRankingRefreshResponse)
+async def refresh_peer_rankings(
+    db: AsyncSession = Depends(get_db)
+) -> PeerRankingRefreshResponse:
+    """
+    Recompute trailing returns and percentile ranks for every fund and peer
+    now instead of waiting for the nightly job
+    """
+    result = await PeerRankingService(db).refresh_rankings()
+    return PeerRankingRefreshResponse(**result)
 
 
 @router.get("/{fund_id}", response_model=Fund)
@@ -122,8 +186,11 @@ async def delete_fund(
 
 @router.get("/{fund_id}/performance", response_model=FundPerformanceResponse)
 async def get_fund_performance(
+    request: Request,
+    response: Response,
     fund_id: int,
-    days: int = Query(30, ge=1, le=365, description="Number of days of performance data"),
+    days: int = Query(30, ge=1, le=3650, description="Number of days of performance data"),
+    max_points: Optional[int] = Query(None, ge=3, le=5000, description="Downsample the series to at most this many points (LTTB)"),
     db: AsyncSession = Depends(get_db)
 ) -> FundPerformanceResponse:
     """
@@ -131,49 +198,76 @@ async def get_fund_performance(
     """
     fund_service = FundService(db)
     
+    # NAVs loaded outside the services do not advance the versions, but they
+    # do move the fund's latest NAV date and count
+    watermark = await fund_service.get_performance_watermark(fund_id)
+    not_modified = await conditional_get(
+        request, response, db, (f"fund:{fund_id}", *FUND_PERFORMANCE_VERSIONS), watermark
+    )
+    if not_modified:
+        return not_modified
+    
     # Check if fund exists
-    fund = await fund_service.get_fund_by_id(fund_id)
+    fund = await fund_service.get_fund_header(fund_id)
     if not fund:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Fund with id {fund_id} not found"
         )
     
-    performance_data = await fund_service.get_fund_performance(fund_id, days)
-    return FundPerformanceResponse(
-        fund_id=fund_id,
-        fund_name=fund["name"],
-        performance_data=performance_data,
-        period_days=days
-    )
+    performance_data = await fund_service.get_fund_performance(fund_id, days, max_points)
+    return PERFORMANCE_SERIALIZER.response({
+        "fund_id": fund_id,
+        "fund_name": fund["name"],
+        "performance_data": performance_data,
+        "period_days": days,
+    }, response)
+
+
+@router.post("/{fund_id}/performance", response_model=FundPerformanceWriteResponse)
+async def record_fund_performance(
+    fund_id: int,
+    points: List[FundPerformanceData],
+    db: AsyncSession = Depends(get_db)
+) -> FundPerformanceWriteResponse:
+    """
+    Load NAVs for a fund, replacing any already stored for the same dates
+    """
+    fund_service = FundService(db)
+    
+    if not await fund_service.fund_exists(fund_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fund with id {fund_id} not found"
+        )
+    
+    result = await fund_service.record_performance(fund_id, points)
+    return FundPerformanceWriteResponse(**result)
 
 
 @router.get("/{fund_id}/peers", response_model=PeerComparisonResponse)
 async def get_fund_peers(
+    request: Request,
+    response: Response,
     fund_id: int,
+    limit: int = Query(10, ge=1, le=100, description="Number of peers to return, best one-year return first"),
     db: AsyncSession = Depends(get_db)
 ) -> PeerComparisonResponse:
     """
-    Get peer comparison data for a fund
+    Get the fund's trailing returns and percentile ranks against its peer
+    category, from the nightly peer rankings
     """
-    fund_service = FundService(db)
+    not_modified = await conditional_get(request, response, db, (f"fund:{fund_id}", *FUND_PEERS_VERSIONS))
+    if not_modified:
+        return not_modified
     
-    # Check if fund exists
-    fund = await fund_service.get_fund_by_id(fund_id)
-    if not fund:
+    comparison = await PeerRankingService(db).get_peer_comparison(fund_id, limit)
+    if comparison is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Fund with id {fund_id} not found"
         )
-    
-    peers_data = await fund_service.get_peer_comparison(fund_id)
-    return PeerComparisonResponse(
-        fund_id=fund_id,
-        fund_name=fund["name"],
-        fund_strategy=fund["strategy"],
-        fund_performance=fund.get("total_return_percent"),
-        peers=peers_data
-    )
+    return comparison
 
 
 @router.get("/{fund_id}/stats")
@@ -187,8 +281,7 @@ async def get_fund_statistics(
     fund_service = FundService(db)
     
     # Check if fund exists
-    fund = await fund_service.get_fund_by_id(fund_id)
-    if not fund:
+    if not await fund_service.fund_exists(fund_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Fund with id {fund_id} not found"
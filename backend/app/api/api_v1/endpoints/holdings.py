@@ -2,71 +2,59 @@
 Holdings API endpoints
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.pagination import InvalidCursor, estimate_count, set_page_headers
+from app.core.serialization import ResponseSerializer
 from app.schemas.holding import (
     Holding,
     HoldingCreate,
     HoldingUpdate,
     HoldingSummary,
-    FundHoldingsResponse
+    FundHoldingsResponse,
+    TickerReturns
 )
-from app.services.holding_service import HoldingService
+from app.services.holding_service import HOLDING_KEYSET, HoldingService
 from app.services.fund_service import FundService
 
 router = APIRouter()
 
+# Valued holdings are already JSON-ready dicts, so they are encoded as is
+HOLDINGS_SERIALIZER = ResponseSerializer("list_holdings")
+
 
 @router.get("/")
 async def list_holdings(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of holdings to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of holdings to return"),
     ticker: Optional[str] = Query(None, description="Filter by ticker symbol"),
     fund_id: Optional[int] = Query(None, description="Filter by fund ID"),
     search: Optional[str] = Query(None, description="Search holdings by ticker or company name"),
+    cursor: Optional[str] = Query(None, description="Continue after the page that returned this X-Next-Cursor"),
+    estimate_total: bool = Query(False, description="Return an estimated row count in X-Total-Estimate"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve holdings with optional filtering
     """
     holding_service = HoldingService(db)
+    try:
+        holdings = await holding_service.get_valued_holdings(
+            skip=skip, limit=limit, ticker=ticker, fund_id=fund_id, search=search, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    if search:
-        holdings = await holding_service.search_holdings(search, limit)
-    elif ticker:
-        holdings = await holding_service.get_holdings_by_ticker(ticker)
-    elif fund_id:
-        holdings = await holding_service.get_holdings_by_fund(fund_id)
-    else:
-        holdings = await holding_service.get_holdings(skip=skip, limit=limit)
-    
-    # Transform to dictionaries with calculated fields
-    result = []
-    for holding in holdings:
-        cost_basis = holding.shares * holding.purchase_price
-        result.append({
-            "id": holding.id,
-            "fund_id": holding.fund_id,
-            "ticker": holding.ticker,
-            "company_name": holding.company_name,
-            "shares": str(holding.shares),
-            "purchase_price": str(holding.purchase_price),
-            "purchase_date": holding.purchase_date.isoformat(),
-            "sector": holding.sector,
-            "market_cap": holding.market_cap,
-            "created_at": holding.created_at.isoformat(),
-            "updated_at": holding.updated_at.isoformat(),
-            "cost_basis": str(cost_basis),
-            "current_price": None,
-            "current_value": str(cost_basis),  # Fallback to cost basis
-            "unrealized_gain_loss": "0",
-            "unrealized_gain_loss_percent": "0",
-            "weight_in_fund": None,
-        })
-    
-    return result
+    # Ticker and fund filters return complete results, so only the
+    # paginated listings carry a cursor
+    if not ticker and not fund_id:
+        unfiltered = not search
+        total = await estimate_count(db, "holdings") if estimate_total and unfiltered else None
+        set_page_headers(response, HOLDING_KEYSET.next_cursor(holdings, limit), total)
+    return HOLDINGS_SERIALIZER.response(holdings, response)
 
 
 @router.get("/{holding_id}", response_model=Holding)
@@ -101,8 +89,7 @@ async def create_holding(
     fund_service = FundService(db)
     
     # Check if fund exists
-    fund = await fund_service.get_fund_by_id(holding_data.fund_id)
-    if not fund:
+    if not await fund_service.fund_exists(holding_data.fund_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Fund with id {holding_data.fund_id} not found"
@@ -163,8 +150,7 @@ async def get_fund_holdings_summary(
     fund_service = FundService(db)
     
     # Check if fund exists
-    fund = await fund_service.get_fund_by_id(fund_id)
-    if not fund:
+    if not await fund_service.fund_exists(fund_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Fund with id {fund_id} not found"
@@ -186,8 +172,7 @@ async def get_fund_sector_breakdown(
     fund_service = FundService(db)
     
     # Check if fund exists
-    fund = await fund_service.get_fund_by_id(fund_id)
-    if not fund:
+    if not await fund_service.fund_exists(fund_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Fund with id {fund_id} not found"
@@ -210,12 +195,32 @@ async def get_fund_top_holdings(
     fund_service = FundService(db)
     
     # Check if fund exists
-    fund = await fund_service.get_fund_by_id(fund_id)
-    if not fund:
+    if not await fund_service.fund_exists(fund_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Fund with id {fund_id} not found"
         )
     
     holdings = await holding_service.get_top_holdings(fund_id, limit)
-    return holdings
\ No newline at end of file
+    return holdings
+
+
+@router.get("/fund/{fund_id}/returns", response_model=List[TickerReturns])
+async def get_fund_ticker_returns(
+    fund_id: int,
+    db: AsyncSession = Depends(get_db)
+) -> List[TickerReturns]:
+    """
+    Get the trailing-return ladder of every ticker a fund holds
+    """
+    holding_service = HoldingService(db)
+    fund_service = FundService(db)
+    
+    # Check if fund exists
+    if not await fund_service.fund_exists(fund_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fund with id {fund_id} not found"
+        )
+    
+    return await holding_service.get_ticker_returns(fund_id)
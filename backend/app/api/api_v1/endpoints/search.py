@@ -0,0 +1,44 @@
+"""
+Fund and security search API endpoints
+"""
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.versioning import conditional_get
+from app.schemas.search import AutocompleteResponse, SearchResponse
+from app.services.search_service import SEARCH_VERSIONS, SearchService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100, description="Fund name, manager, description, ticker or company"),
+    limit: int = Query(10, ge=1, le=50, description="Number of funds and of securities to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Funds and held securities matching a query, most relevant first;
+    tolerates misspellings under PostgreSQL
+    """
+    not_modified = await conditional_get(request, response, db, SEARCH_VERSIONS)
+    if not_modified:
+        return not_modified
+    
+    return await SearchService(db).search(q, limit)
+
+
+@router.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix of a fund name, manager, ticker or company"),
+    limit: int = Query(10, ge=1, le=50, description="Number of suggestions to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Funds and securities starting with a prefix, from the in-memory
+    autocomplete index; for search-as-you-type
+    """
+    return await SearchService(db).autocomplete(q, limit)
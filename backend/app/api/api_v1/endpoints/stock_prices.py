@@ -3,29 +3,45 @@ Stock prices API endpoints
 """
 from datetime import date, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import engine, get_db
+from app.core.pagination import InvalidCursor, estimate_count, set_page_headers
+from app.core.serialization import ResponseSerializer
 from app.schemas.stock_price import (
     StockPrice,
     StockPriceCreate,
     StockPriceUpdate,
     StockPriceSummary,
-    StockPriceHistory
+    StockPriceHistory,
+    DailyMovers,
+    BulkStockPriceRequest,
+    BulkStockPriceResponse,
+    MarketDataSyncResponse,
 )
-from app.services.stock_price_service import StockPriceService
+from app.services.export_service import MEDIA_TYPES, stream_price_export
+from app.services.fund_service import FundService
+from app.services.market_data_service import MarketDataService, get_market_data_client
+from app.services.stock_price_service import PRICE_KEYSET, StockPriceService, parse_price_csv
 
 router = APIRouter()
 
+PRICES_SERIALIZER = ResponseSerializer("list_stock_prices", List[StockPrice])
+HISTORY_SERIALIZER = ResponseSerializer("get_stock_price_history", StockPriceHistory)
+
 
 @router.get("/", response_model=List[StockPrice])
 async def list_stock_prices(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     ticker: Optional[str] = Query(None, description="Filter by ticker symbol"),
     start_date: Optional[date] = Query(None, description="Start date for filtering"),
     end_date: Optional[date] = Query(None, description="End date for filtering"),
+    cursor: Optional[str] = Query(None, description="Continue after the page that returned this X-Next-Cursor"),
+    estimate_total: bool = Query(False, description="Return an estimated row count in X-Total-Estimate"),
     db: AsyncSession = Depends(get_db)
 ) -> List[StockPrice]:
     """
@@ -33,14 +49,19 @@ async def list_stock_prices(
     """
     stock_service = StockPriceService(db)
     
-    if ticker:
-        prices = await stock_service.get_stock_prices_by_ticker(
-            ticker, start_date, end_date, limit
-        )
-    else:
-        prices = await stock_service.get_stock_prices(skip=skip, limit=limit)
+    try:
+        if ticker:
+            prices = await stock_service.get_stock_prices_by_ticker(
+                ticker, start_date, end_date, limit, cursor
+            )
+        else:
+            prices = await stock_service.get_stock_prices(skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    return prices
+    total = await estimate_count(db, "stock_prices") if estimate_total and not ticker else None
+    set_page_headers(response, PRICE_KEYSET.next_cursor(prices, limit), total)
+    return PRICES_SERIALIZER.response(prices, response)
 
 
 @router.get("/tickers")
@@ -55,6 +76,58 @@ async def get_available_tickers(
     return tickers
 
 
+@router.get("/movers", response_model=DailyMovers)
+async def get_daily_movers(
+    date: Optional[date] = Query(None, description="Trading date (defaults to the latest available)"),
+    limit: int = Query(10, ge=1, le=100, description="Number of gainers and losers to return"),
+    fund_id: Optional[int] = Query(None, description="Restrict to tickers held by this fund"),
+    db: AsyncSession = Depends(get_db)
+) -> DailyMovers:
+    """
+    Get the top gainers and losers for a trading day
+    """
+    if fund_id is not None:
+        if not await FundService(db).fund_exists(fund_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Fund with id {fund_id} not found"
+            )
+    
+    stock_service = StockPriceService(db)
+    return await stock_service.get_daily_gainers_losers(date, limit, fund_id)
+
+
+@router.get("/export")
+async def export_stock_prices(
+    request: Request,
+    tickers: Optional[List[str]] = Query(None, description="Tickers to export (all when omitted)"),
+    start_date: Optional[date] = Query(None, description="Start date for filtering"),
+    end_date: Optional[date] = Query(None, description="End date for filtering"),
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    compress: bool = Query(True, description="Gzip the stream when the client accepts it"),
+) -> StreamingResponse:
+    """
+    Stream price history as NDJSON or CSV, ordered by ticker and date
+    """
+    if tickers and len(tickers) > 1000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Maximum 1000 tickers allowed per export"
+        )
+    
+    use_gzip = compress and "gzip" in request.headers.get("accept-encoding", "")
+    headers = {"Content-Disposition": f'attachment; filename="stock_prices.{fmt}"'}
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    
+    return StreamingResponse(
+        stream_price_export(engine, tickers, start_date, end_date, fmt, use_gzip),
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
+    )
+
+
 @router.get("/{price_id}", response_model=StockPrice)
 async def get_stock_price(
     price_id: int,
@@ -161,7 +234,9 @@ async def get_latest_stock_price(
 @router.get("/ticker/{ticker}/history", response_model=StockPriceHistory)
 async def get_stock_price_history(
     ticker: str,
-    days: int = Query(30, ge=1, le=365, description="Number of days of history to return"),
+    days: int = Query(30, ge=1, le=3650, description="Number of days of history to return"),
+    max_points: Optional[int] = Query(None, ge=3, le=5000, description="Downsample to at most this many points"),
+    method: str = Query("ohlc", pattern="^(ohlc|lttb)$", description="ohlc buckets for candles, lttb for line charts"),
     db: AsyncSession = Depends(get_db)
 ) -> StockPriceHistory:
     """
@@ -172,23 +247,22 @@ async def get_stock_price_history(
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
-    prices = await stock_service.get_stock_prices_by_ticker(
-        ticker, start_date, end_date, days
+    history = await stock_service.get_price_history(
+        ticker, start_date, end_date, max_points, method
     )
     
-    if not prices:
+    if not history["total_records"]:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No stock price history found for ticker {ticker}"
         )
     
-    return StockPriceHistory(
-        ticker=ticker.upper(),
-        start_date=start_date,
-        end_date=end_date,
-        total_records=len(prices),
-        prices=prices
-    )
+    return HISTORY_SERIALIZER.response({
+        "ticker": ticker.upper(),
+        "start_date": start_date,
+        "end_date": end_date,
+        **history,
+    })
 
 
 @router.get("/ticker/{ticker}/summary")
@@ -234,4 +308,73 @@ async def get_batch_latest_prices(
     
     stock_service = StockPriceService(db)
     prices = await stock_service.get_latest_prices(tickers)
-    return prices
\ No newline at end of file
+    return prices
+
+
+def _bulk_response(result: dict, errors: Optional[List[str]] = None) -> BulkStockPriceResponse:
+    return BulkStockPriceResponse(
+        total_requested=result["total"],
+        successful_updates=result["inserted"] + result["updated"],
+        failed_updates=result["rejected"],
+        inserted=result["inserted"],
+        updated=result["updated"],
+        rejected=result["rejected"],
+        errors=errors or [],
+    )
+
+
+@router.post("/bulk", response_model=BulkStockPriceResponse)
+async def bulk_upsert_stock_prices(
+    request: BulkStockPriceRequest,
+    db: AsyncSession = Depends(get_db)
+) -> BulkStockPriceResponse:
+    """
+    Insert or update many stock price records keyed on ticker and date
+    """
+    stock_service = StockPriceService(db)
+    rows = (
+        (
+            price.ticker, price.date, price.open_price, price.high_price,
+            price.low_price, price.close_price, price.volume, price.adjusted_close,
+        )
+        for price in request.prices
+    )
+    result = await stock_service.bulk_upsert_prices(rows)
+    return _bulk_response(result)
+
+
+@router.post("/bulk/csv", response_model=BulkStockPriceResponse)
+async def bulk_upsert_stock_prices_csv(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> BulkStockPriceResponse:
+    """
+    Stream a CSV body (header: ticker,date,open_price,high_price,low_price,
+    close_price,volume[,adjusted_close]) into stock prices
+    """
+    stock_service = StockPriceService(db)
+    errors: List[str] = []
+    
+    try:
+        result = await stock_service.bulk_upsert_prices(parse_price_csv(request.stream(), errors))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return _bulk_response(result, errors)
+
+
+@router.post("/sync", response_model=MarketDataSyncResponse)
+async def sync_stock_prices(
+    tickers: Optional[List[str]] = Query(None, description="Held tickers to sync (all when omitted)"),
+    db: AsyncSession = Depends(get_db)
+) -> MarketDataSyncResponse:
+    """
+    Fetch prices newer than the last stored date for held tickers from the
+    market data provider and upsert them
+    """
+    service = MarketDataService(db, get_market_data_client())
+    result = await service.sync_prices([ticker.upper() for ticker in tickers] if tickers else None)
+    return MarketDataSyncResponse(**result)
@@ -0,0 +1,356 @@
+"""
+Application cache for service read methods
+"""
+import functools
+import inspect
+import sys
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+
+
+@dataclass
+class NamespaceStats:
+    """Hit/miss/eviction counters for one cache namespace"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "entries": self.entries,
+            "bytes": self.bytes,
+        }
+
+
+@dataclass
+class CacheEntry:
+    namespace: str
+    value: Any
+    expires_at: float
+    size: int
+    tags: Tuple[str, ...] = field(default_factory=tuple)
+
+
+class CacheBackend:
+    """Interface implemented by cache backends"""
+
+    def get(self, namespace: str, key: Hashable) -> Tuple[bool, Any]:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        raise NotImplementedError
+
+    def generations(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Opaque stamp that changes whenever any of ``tags`` is invalidated"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL and a byte-size budget.
+
+    Entries carry tags so writes can drop exactly the entries they affect.
+    Each worker process holds its own copy, so other workers only observe a
+    write once their entries expire.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: int):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Tuple[str, Hashable], CacheEntry]" = OrderedDict()
+        self._tag_index: Dict[str, Set[Tuple[str, Hashable]]] = defaultdict(set)
+        self._stats: Dict[str, NamespaceStats] = defaultdict(NamespaceStats)
+        self._bytes = 0
+        # Invalidations per tag, and clears, so a read that started before
+        # one can tell its result is stale
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._epoch = 0
+
+    def get(self, namespace: str, key: Hashable) -> Tuple[bool, Any]:
+        full_key = (namespace, key)
+        stats = self._stats[namespace]
+        entry = self._entries.get(full_key)
+
+        if entry is None:
+            stats.misses += 1
+            return False, None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(full_key)
+            stats.expirations += 1
+            stats.misses += 1
+            return False, None
+
+        self._entries.move_to_end(full_key)
+        stats.hits += 1
+        return True, entry.value
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        full_key = (namespace, key)
+        if full_key in self._entries:
+            self._remove(full_key)
+
+        entry = CacheEntry(
+            namespace=namespace,
+            value=value,
+            expires_at=time.monotonic() + (ttl if ttl is not None else self.default_ttl),
+            size=size,
+            tags=tuple(tags),
+        )
+        self._entries[full_key] = entry
+        for tag in entry.tags:
+            self._tag_index[tag].add(full_key)
+
+        stats = self._stats[namespace]
+        stats.entries += 1
+        stats.bytes += size
+        self._bytes += size
+
+        while self._bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._stats[oldest_key[0]].evictions += 1
+            self._remove(oldest_key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            self._generations[tag] += 1
+            for full_key in list(self._tag_index.pop(tag, ())):
+                if full_key in self._entries:
+                    self._stats[full_key[0]].invalidations += 1
+                    self._remove(full_key)
+                    removed += 1
+        return removed
+
+    def generations(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return (self._epoch, *(self._generations.get(tag, 0) for tag in tags))
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+        self._tag_index.clear()
+        for stats in self._stats.values():
+            stats.entries = 0
+            stats.bytes = 0
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "max_bytes": self.max_bytes,
+            "bytes": self._bytes,
+            "entries": len(self._entries),
+            "namespaces": {name: stats.as_dict() for name, stats in sorted(self._stats.items())},
+        }
+
+    def _remove(self, full_key: Tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(full_key)
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(full_key)
+                if not keys:
+                    del self._tag_index[tag]
+
+        stats = self._stats[entry.namespace]
+        stats.entries -= 1
+        stats.bytes -= entry.size
+        self._bytes -= entry.size
+
+
+def estimate_size(value: Any, _seen: Optional[Set[int]] = None) -> int:
+    """Approximate the memory footprint of a cached value in bytes"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, _seen) for item in value)
+    if hasattr(value, "__dict__"):
+        attributes = {k: v for k, v in vars(value).items() if not k.startswith("_sa_")}
+        return size + estimate_size(attributes, _seen)
+    return size
+
+
+def _copy(value: Any, _seen: Optional[Dict[int, Any]] = None) -> Any:
+    """
+    Copy of a cached value that shares nothing mutable with it: containers
+    and pydantic models are copied, and ORM instances (with their loaded
+    relationships) become new detached instances. The caller's own
+    instances stay in its session, and callers cannot alter what others
+    are served.
+    """
+    if _seen is None:
+        _seen = {}
+    if id(value) in _seen:
+        return _seen[id(value)]
+
+    if isinstance(value, dict):
+        copied = _seen[id(value)] = {}
+        copied.update((key, _copy(item, _seen)) for key, item in value.items())
+        return copied
+    if isinstance(value, list):
+        copied = _seen[id(value)] = []
+        copied.extend(_copy(item, _seen) for item in value)
+        return copied
+    if isinstance(value, (tuple, set, frozenset)):
+        return type(value)(_copy(item, _seen) for item in value)
+    if isinstance(value, BaseModel):
+        return value.model_copy(deep=True)
+
+    try:
+        state = sa_inspect(value)
+    except NoInspectionAvailable:
+        return value
+    if not hasattr(state, "mapper"):
+        return value
+
+    mapper = state.mapper
+    copied = _seen[id(value)] = mapper.class_manager.new_instance()
+    for attribute in mapper.column_attrs:
+        if attribute.key in state.dict:
+            set_committed_value(copied, attribute.key, state.dict[attribute.key])
+    for relationship in mapper.relationships:
+        if relationship.key in state.dict:
+            set_committed_value(copied, relationship.key, _copy(state.dict[relationship.key], _seen))
+    # Plain attributes, such as the price the valuation service marks holdings to
+    mapped = set(mapper.attrs.keys())
+    for name, item in vars(value).items():
+        if name not in mapped and not name.startswith("_sa_"):
+            setattr(copied, name, item)
+    # Attributes that were never loaded raise on access, as on any detached instance
+    make_transient_to_detached(copied)
+    return copied
+
+
+_backend: Optional[CacheBackend] = (
+    MemoryCache(max_bytes=settings.CACHE_MAX_BYTES, default_ttl=settings.CACHE_TTL)
+    if settings.CACHE_ENABLED else None
+)
+
+
+def get_cache() -> Optional[CacheBackend]:
+    """Get the active cache backend, or None when caching is disabled"""
+    return _backend
+
+
+def set_cache_backend(backend: Optional[CacheBackend]) -> None:
+    """Swap the cache backend (None disables caching)"""
+    global _backend
+    _backend = backend
+
+
+def invalidate(*tags: str) -> int:
+    """Drop every cached entry carrying any of the given tags"""
+    backend = get_cache()
+    if backend is None:
+        return 0
+    return backend.invalidate_tags(tags)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Per-namespace cache statistics"""
+    backend = get_cache()
+    if backend is None:
+        return {"backend": None}
+    return backend.stats()
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_freeze(v) for v in value]
+        return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def cached(
+    namespace: str,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    ttl: Optional[int] = None,
+):
+    """
+    Cache the result of an async service method.
+
+    The key is built from the method's arguments (excluding ``self``).
+    ``tags`` receives the same arguments by name and returns the tags used
+    for invalidation. Every caller gets its own copy of the value, and a
+    result whose tags were invalidated while it was being read is not stored.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            backend = get_cache()
+            if backend is None:
+                return await func(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(list(bound.arguments.items())[1:])
+            key = (func.__qualname__, _freeze(arguments))
+
+            hit, value = backend.get(namespace, key)
+            if hit:
+                return _copy(value)
+
+            entry_tags = tuple(tags(**arguments)) if tags else ()
+            generations = backend.generations(entry_tags)
+            value = await func(self, *args, **kwargs)
+            # A write invalidated these tags while the read was in flight, so
+            # the result may predate it: serve it to this caller only
+            if backend.generations(entry_tags) == generations:
+                backend.set(namespace, key, _copy(value), ttl=ttl, tags=entry_tags)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
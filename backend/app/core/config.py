@@ -25,6 +25,8 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DEBUG: bool = True
+    SQL_ECHO: bool = False  # log every statement through SQLAlchemy (very verbose)
+    WEB_CONCURRENCY: int = 1  # worker processes sharing the database
     
     # Security
     ALLOWED_HOSTS: List[str] = ["localhost", "127.0.0.1", "0.0.0.0"]
@@ -73,20 +75,59 @@ class Settings(BaseSettings):
     STOCK_API_KEY: str = ""
     STOCK_API_URL: str = "https://www.alphavantage.co/query"
     STOCK_API_RATE_LIMIT: int = 5  # requests per minute
+    STOCK_API_BURST: int = 1  # requests allowed back to back before the rate applies
+    STOCK_API_CONCURRENCY: int = 4  # tickers fetched at once
+    STOCK_API_TIMEOUT: float = 30.0  # seconds per provider request
+    STOCK_API_MAX_RETRIES: int = 4  # retries of throttled or failed requests
+    STOCK_API_RETRY_BASE_DELAY: float = 1.0  # seconds, doubled per retry before jitter
+    STOCK_API_RETRY_MAX_DELAY: float = 60.0
+    STOCK_API_BACKFILL_DAYS: int = 365  # history fetched for tickers with no stored prices
+    STOCK_API_WRITE_BATCH: int = 5000  # fetched rows upserted per statement batch
+    MARKET_DATA_SYNC_INTERVAL: int = 0  # seconds between background price syncs; 0 disables
     
     
     # Logging
     LOG_LEVEL: str = "INFO"
+    QUERY_INSTRUMENTATION_ENABLED: bool = True  # per-request query counts, Server-Timing and slow query log
+    SLOW_QUERY_MS: float = 100.0  # statements at least this slow go to the slow query log
+    SLOW_QUERY_LOG_SIZE: int = 200  # entries kept in the slow/repeated query ring buffers
+    REPEATED_QUERY_THRESHOLD: int = 5  # identical statement fingerprints per request flagged as N+1
+    METRICS_ENABLED: bool = True  # Prometheus text-format /metrics endpoint
+    EVENT_LOOP_LAG_INTERVAL: float = 0.5  # seconds between event loop lag probes
+    PROFILE_TOKEN: str = ""  # X-Profile-Token value that turns on profiling for a request; empty disables
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of all requests profiled without the header
+    PROFILE_INTERVAL_MS: float = 5.0  # stack sampling interval
+    PROFILE_HISTORY: int = 20  # profiles kept for download
     
     # Application Limits
     MAX_FUNDS_PER_USER: int = 100
     MAX_HOLDINGS_PER_FUND: int = 500
     CACHE_TTL: int = 300  # 5 minutes
+    FAST_SERIALIZATION: bool = True  # encode large listings through pre-built TypeAdapters / orjson
+    FAST_SERIALIZATION_EXCLUDE: List[str] = []  # route names that keep FastAPI's default serialization
+    CACHE_ENABLED: bool = True
+    CONDITIONAL_GET_ENABLED: bool = True  # ETags from data versions; If-None-Match answered with 304
+    HTTP_CACHE_MAX_AGE: int = 0  # seconds nginx/browsers may reuse a response unrevalidated; 0 sends no-cache
+    ETAG_SALT: str = ""  # mixed into every ETag; change it when a deploy alters response bodies
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # in-process cache memory budget
+    EXPORT_CHUNK_ROWS: int = 5000  # rows fetched and encoded per streamed export chunk
+    READ_MODELS_ENABLED: bool = True  # serve fund/holding listings from materialized views (PostgreSQL)
+    READ_MODEL_REFRESH_DELAY: float = 2.0  # seconds to coalesce writes before refreshing
+    READ_MODEL_RETRY_MAX_DELAY: float = 60.0  # longest backoff between retries of a failed refresh
+    SIMILARITY_TOP_K: int = 50  # most similar funds precomputed per fund and metric
+    SIMILARITY_CHUNK_PAIRS: int = 4_000_000  # position pairs expanded per chunk while building the index
+    PEER_RANKINGS_HOUR: int = 2  # UTC hour of the nightly peer ranking job; -1 disables the scheduler
+    TRIGRAM_SEARCH_ENABLED: bool = True  # fuzzy search through pg_trgm GIN indexes (PostgreSQL)
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.5  # minimum pg_trgm word similarity for a fuzzy match
     
     # Performance Settings
-    DB_POOL_SIZE: int = 20
-    DB_MAX_OVERFLOW: int = 30
-    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_SIZE: int = 20  # total across all workers
+    DB_MAX_OVERFLOW: int = 30  # total across all workers
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_USE_NULL_POOL: bool = False  # open a fresh connection per checkout
+    DB_STATEMENT_CACHE_SIZE: int = 256  # asyncpg prepared statements per connection
 
 
 # Global settings instance
@@ -1,20 +1,113 @@
 """
 Database configuration and connection management
 """
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 import asyncpg
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine, instrument_orm
+
+
+class PoolWaitStats:
+    """Accumulates how long checkouts waited for a pooled connection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_ms": round(self.total_wait * 1000, 3),
+                "avg_wait_ms": round(self.total_wait * 1000 / attempts, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records time spent waiting for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            pool_wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_wait_stats.record(time.perf_counter() - started)
+        return entry
+
+
+def _per_worker(total: int) -> int:
+    """Split a process-wide connection budget across worker processes"""
+    workers = max(settings.WEB_CONCURRENCY, 1)
+    return max(total // workers, 1)
+
+
+def build_engine_options(database_url: str) -> Dict[str, Any]:
+    """Build create_async_engine keyword arguments from settings"""
+    options: Dict[str, Any] = {
+        "echo": settings.SQL_ECHO,
+        "future": True,
+    }
+
+    if database_url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+
+    if settings.DB_USE_NULL_POOL:
+        options["poolclass"] = NullPool
+    elif not database_url.startswith("sqlite"):
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=_per_worker(settings.DB_POOL_SIZE),
+            max_overflow=_per_worker(settings.DB_MAX_OVERFLOW) if settings.DB_MAX_OVERFLOW else 0,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    return options
+
 
 # Create async engine
 engine = create_async_engine(
     str(settings.DATABASE_URL),
-    poolclass=NullPool,  # Use NullPool for async
-    echo=settings.DEBUG,
-    future=True,
+    **build_engine_options(str(settings.DATABASE_URL)),
 )
+if settings.QUERY_INSTRUMENTATION_ENABLED:
+    instrument_engine(engine)
+    instrument_orm()
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -54,6 +147,10 @@ async def init_db() -> None:
         from app.models.stock_price import StockPrice
         from app.models.peer_fund import PeerFund
         from app.models.fund_performance import FundPerformance
+        from app.models.daily_return import DailyReturn
+        from app.models.data_version import DataVersion
+        from app.models.peer_performance import PeerPerformance, PeerRanking
+        from app.models.return_ladder import FundReturnLadder, TickerReturnLadder
         
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
@@ -69,4 +166,25 @@ async def check_db_connection() -> bool:
             return result.scalar() == 1
     except Exception as e:
         print(f"Database connection failed: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Live connection pool statistics for sizing the pool
+    """
+    pool = engine.sync_engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout_seconds": pool.timeout(),
+        })
+
+    stats["wait"] = pool_wait_stats.snapshot()
+    return stats
@@ -0,0 +1,213 @@
+"""
+Per-request SQL instrumentation: query counts and timings, ORM objects
+loaded, repeated statement (N+1) detection and a slow query log
+"""
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Mapper
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+MAX_STATEMENT_LENGTH = 2000
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so executions that differ only in their values
+    (bound parameters, literals, IN list length) compare equal
+    """
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class RequestQueries:
+    """Statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.objects = 0
+        self.slowest: Optional[Tuple[float, str]] = None
+        self.fingerprints: Counter = Counter()
+        self.slow: List[Tuple[float, str]] = []
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if self.slowest is None or duration > self.slowest[0]:
+            self.slowest = (duration, statement)
+        self.fingerprints[fingerprint(statement)] += 1
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            self.slow.append((duration, statement))
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Fingerprints executed at least REPEATED_QUERY_THRESHOLD times"""
+        return [
+            (statement, count) for statement, count in self.fingerprints.most_common()
+            if count >= settings.REPEATED_QUERY_THRESHOLD
+        ]
+
+    def server_timing(self, elapsed: float) -> str:
+        """Server-Timing header value for this request"""
+        metrics = [
+            f'db;dur={self.total * 1000:.2f};desc="{self.count} queries"',
+            f'orm;desc="{self.objects} objects"',
+        ]
+        if self.slowest is not None:
+            metrics.append(f"db-slowest;dur={self.slowest[0] * 1000:.2f}")
+        metrics.append(f"app;dur={elapsed * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+class QueryLog:
+    """Bounded in-memory history of slow statements and N+1 suspects"""
+
+    def __init__(self, size: int):
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.repeated_queries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.requests = 0
+        self.queries = 0
+        self.objects = 0
+
+    def add_slow(self, route: Optional[str], duration: float, statement: str) -> None:
+        self.slow_queries.append({
+            "at": time.time(),
+            "route": route,
+            "duration_ms": round(duration * 1000, 3),
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+        })
+
+    def finish_request(self, route: str, queries: RequestQueries) -> None:
+        self.requests += 1
+        self.queries += queries.count
+        self.objects += queries.objects
+        for duration, statement in queries.slow:
+            self.add_slow(route, duration, statement)
+
+        repeated = queries.repeated()
+        if repeated:
+            logger.warning(
+                "%s executed %d statements; repeated: %s",
+                route, queries.count, "; ".join(f"{count}x {statement[:200]}" for statement, count in repeated),
+            )
+            self.repeated_queries.append({
+                "at": time.time(),
+                "route": route,
+                "query_count": queries.count,
+                "object_count": queries.objects,
+                "db_time_ms": round(queries.total * 1000, 3),
+                "statements": [
+                    {"fingerprint": statement[:MAX_STATEMENT_LENGTH], "count": count}
+                    for statement, count in repeated
+                ],
+            })
+
+    def clear(self) -> None:
+        self.slow_queries.clear()
+        self.repeated_queries.clear()
+
+
+query_log = QueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def current_queries() -> Optional[RequestQueries]:
+    """Statements recorded so far for the request being handled, if any"""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started"].pop()
+    queries = _current.get()
+    if queries is not None:
+        queries.record(statement, duration)
+    elif duration * 1000 >= settings.SLOW_QUERY_MS:
+        # Startup, background refreshes and other work outside a request
+        query_log.add_slow(None, duration, statement)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement executed through ``engine``"""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _on_load(target, context):
+    queries = _current.get()
+    if queries is not None:
+        queries.objects += 1
+
+
+def instrument_orm() -> None:
+    """Count the ORM instances each request loads, for every mapped class"""
+    event.listen(Mapper, "load", _on_load)
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Collect the statements run by each request, report them in a
+    ``Server-Timing`` header and feed the slow/repeated query log
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", queries.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            query_log.finish_request(_route_label(scope), queries)
@@ -0,0 +1,317 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import cache_stats
+from app.core.config import settings
+from app.core.database import get_pool_stats
+from app.core.instrumentation import query_log
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets in seconds, from a cached read to a pool timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    """A named family of samples keyed by label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples()
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, *label_values: str, value: float) -> None:
+        self._values[label_values] = value
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """
+    Fixed-bucket histogram. An observation is one bisect and two
+    increments; buckets are only made cumulative when rendered
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), values + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics owned by the app plus callbacks that sample gauges at scrape time"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template, method and status",
+    labels=("method", "route", "status"),
+))
+requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+))
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event loop wakeup and when it ran",
+    buckets=LOOP_LAG_BUCKETS,
+))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Record latency and in-flight count for every HTTP request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.dec()
+            # Route templates, never raw paths, keep label cardinality bounded
+            request_duration.observe(
+                time.perf_counter() - started, scope["method"], _route_template(scope), str(status),
+            )
+
+
+class EventLoopLagMonitor:
+    """Sleep for a fixed interval and record how late each wakeup was"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(loop.time() - scheduled, 0.0)
+            event_loop_lag.observe(self.last_lag)
+
+
+loop_monitor = EventLoopLagMonitor(settings.EVENT_LOOP_LAG_INTERVAL)
+
+
+def _loop_metrics() -> Iterable[Metric]:
+    gauge = Gauge("event_loop_lag_last_seconds", "Lag measured at the most recent event loop wakeup")
+    gauge.set(value=loop_monitor.last_lag)
+    return [gauge]
+
+
+def _pool_metrics() -> Iterable[Metric]:
+    stats = get_pool_stats()
+    metrics: List[Metric] = []
+    for key, documentation in (
+        ("pool_size", "Persistent connections in the pool"),
+        ("max_overflow", "Extra connections the pool may open under load"),
+        ("checked_out", "Connections currently in use"),
+        ("checked_in", "Idle connections in the pool"),
+        ("overflow", "Overflow connections currently open"),
+    ):
+        if key in stats:
+            gauge = Gauge(f"db_pool_{key}", documentation)
+            gauge.set(value=stats[key])
+            metrics.append(gauge)
+
+    wait = stats["wait"]
+    for key, documentation in (
+        ("checkouts", "Connections handed out by the pool"),
+        ("timeouts", "Checkouts that timed out waiting for a connection"),
+    ):
+        counter = Counter(f"db_pool_{key}_total", documentation)
+        counter.inc(amount=wait[key])
+        metrics.append(counter)
+    counter = Counter("db_pool_wait_seconds_total", "Time spent waiting for a pooled connection")
+    counter.inc(amount=wait["total_wait_ms"] / 1000)
+    metrics.append(counter)
+    return metrics
+
+
+def _cache_metrics() -> Iterable[Metric]:
+    stats = cache_stats()
+    namespaces = stats.get("namespaces")
+    if not namespaces:
+        return []
+
+    metrics: List[Metric] = []
+    for key, kind, documentation in (
+        ("hits", Counter, "Cache lookups that found a live entry"),
+        ("misses", Counter, "Cache lookups that found nothing"),
+        ("evictions", Counter, "Entries evicted to stay within the memory budget"),
+        ("expirations", Counter, "Entries dropped after their TTL"),
+        ("invalidations", Counter, "Entries dropped by tag invalidation"),
+        ("hit_ratio", Gauge, "Share of lookups that were hits"),
+        ("entries", Gauge, "Entries currently cached"),
+        ("bytes", Gauge, "Estimated bytes currently cached"),
+    ):
+        name = f"cache_{key}_total" if kind is Counter else f"cache_{key}"
+        metric = kind(name, documentation, labels=("namespace",))
+        for namespace, values in namespaces.items():
+            metric.inc(namespace, amount=values[key])
+        metrics.append(metric)
+    return metrics
+
+
+def _query_metrics() -> Iterable[Metric]:
+    counter = Counter("db_queries_total", "Statements executed while handling requests")
+    counter.inc(amount=query_log.queries)
+    return [counter]
+
+
+registry.add_collector(_loop_metrics)
+registry.add_collector(_pool_metrics)
+registry.add_collector(_cache_metrics)
+if settings.QUERY_INSTRUMENTATION_ENABLED:
+    registry.add_collector(_query_metrics)
+
+
+def render_metrics() -> str:
+    """Current metrics in the Prometheus text format"""
+    return registry.render()
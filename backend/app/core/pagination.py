@@ -0,0 +1,142 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import and_, func, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded for the requested listing"""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column of a listing's ordering; ``name`` is read from returned items"""
+    name: str
+    column: Any
+    descending: bool = False
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def _decode_value(column: Any, raw: Any) -> Any:
+    python_type = column.type.python_type
+    if raw is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw)
+    return python_type(raw)
+
+
+class Keyset:
+    """
+    Ordering plus cursor handling for one listing.
+
+    A cursor is the URL-safe base64 JSON of the sort key values of the last
+    item on a page. The next page starts strictly after that row, so the
+    database seeks straight to it through the ordering index instead of
+    reading and discarding every earlier row as OFFSET does. The last key
+    must be unique so the ordering is total.
+    """
+
+    def __init__(self, *keys: SortKey):
+        self.keys = keys
+
+    def order_by(self) -> List[Any]:
+        return [key.column.desc() if key.descending else key.column for key in self.keys]
+
+    def apply(self, query: Select, cursor: Optional[str]) -> Select:
+        """Order ``query`` by the keyset and start it after ``cursor``"""
+        query = query.order_by(*self.order_by())
+        if cursor:
+            query = query.where(self._after(self.decode(cursor)))
+        return query
+
+    def _after(self, values: Sequence[Any]):
+        directions = {key.descending for key in self.keys}
+        if len(directions) == 1:
+            # Uniform direction compares as a row value, which Postgres
+            # matches directly against a composite index
+            row = tuple_(*(key.column for key in self.keys))
+            return row < tuple_(*values) if self.keys[0].descending else row > tuple_(*values)
+
+        clauses = []
+        for i, key in enumerate(self.keys):
+            equal = [k.column == v for k, v in zip(self.keys[:i], values[:i])]
+            beyond = key.column < values[i] if key.descending else key.column > values[i]
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+    def encode(self, item: Any) -> str:
+        """Cursor pointing just after ``item`` (an ORM instance or dict)"""
+        get = item.get if isinstance(item, dict) else lambda name: getattr(item, name)
+        payload = json.dumps([_encode_value(get(key.name)) for key in self.keys], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(raw, list) or len(raw) != len(self.keys):
+                raise ValueError("wrong number of values")
+            return [_decode_value(key.column, value) for key, value in zip(self.keys, raw)]
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+    def next_cursor(self, items: Sequence[Any], limit: int) -> Optional[str]:
+        """Cursor for the page after ``items``, or None once a page comes back short"""
+        if not items or len(items) < limit:
+            return None
+        return self.encode(items[-1])
+
+
+async def estimate_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """
+    Cheap estimate of a table's row count.
+
+    Under PostgreSQL this reads the planner statistics in
+    ``pg_class.reltuples`` instead of scanning the table with COUNT(*), and
+    returns None when the table has never been analyzed. Other databases
+    fall back to an exact count.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        result = await db.execute(select(func.count()).select_from(text(table_name)))
+        return result.scalar()
+
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    estimate = result.scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Estimate"
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total_estimate: Optional[int] = None) -> None:
+    """Expose the next page cursor and the total estimate as response headers"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total_estimate is not None:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(total_estimate)
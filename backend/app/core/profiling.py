@@ -0,0 +1,267 @@
+"""
+Opt-in per-request profiling: a stack sampler (or cProfile) wrapped around
+selected requests, kept as flamegraph-compatible collapsed stacks
+"""
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+from fastapi import Header, HTTPException
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_MODE_HEADER = "X-Profile-Mode"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+MODES = ("sample", "cprofile")
+
+# Admin routes take the token too; reading a profile should not record another
+_UNPROFILED_PREFIX = "/health/"
+
+# Innermost match wins, so a service method waiting on SQLAlchemy counts as SQL
+_CATEGORIES = (
+    ("io_wait", ("selectors.py",)),
+    ("sqlalchemy", ("sqlalchemy", "asyncpg", "aiosqlite")),
+    ("serialization", ("pydantic", "fastapi/encoders.py", "fastapi/routing.py", "starlette/responses.py")),
+    ("service", (f"app{os.sep}services",)),
+    ("endpoint", (f"app{os.sep}api",)),
+)
+
+_PATH_PREFIXES = sorted({p for p in sys.path if p}, key=len, reverse=True)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):].lstrip(os.sep)
+    return filename
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _categorize(filenames: List[str]) -> str:
+    for filename in filenames:
+        for category, markers in _CATEGORIES:
+            if any(marker in filename for marker in markers):
+                return category
+    return "other"
+
+
+class StackSampler:
+    """
+    Statistical profiler: a daemon thread reads the event loop thread's
+    current stack every ``interval`` seconds. Costs nothing between samples
+    but also sees other requests interleaved on the same loop
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels: List[str] = []
+            filenames: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                filenames.append(frame.f_code.co_filename)
+                frame = frame.f_back
+            self.samples += 1
+            self.stacks[";".join(reversed(labels))] += 1
+            self.categories[_categorize(filenames)] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _cprofile_collapsed(profiler: cProfile.Profile) -> str:
+    """
+    cProfile only records caller/callee pairs, so each line is a two-frame
+    stack weighted by the callee's own time in microseconds
+    """
+    stats = pstats.Stats(profiler)
+    lines = []
+    for (filename, line, name), (_, _, tottime, _, callers) in stats.stats.items():
+        callee = f"{name} ({_short_path(filename)}:{line})"
+        if not callers:
+            lines.append((callee, tottime))
+            continue
+        total_calls = sum(caller[0] for caller in callers.values()) or 1
+        for (caller_file, caller_line, caller_name), caller_stats in callers.items():
+            caller = f"{caller_name} ({_short_path(caller_file)}:{caller_line})"
+            lines.append((f"{caller};{callee}", tottime * caller_stats[0] / total_calls))
+    lines.sort(key=lambda item: item[1], reverse=True)
+    return "".join(f"{stack} {round(weight * 1_000_000)}\n" for stack, weight in lines if weight > 0)
+
+
+def _cprofile_categories(profiler: cProfile.Profile) -> Dict[str, float]:
+    stats = pstats.Stats(profiler)
+    totals: Counter = Counter()
+    for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+        totals[_categorize([filename])] += tottime
+    return {category: round(seconds * 1000, 3) for category, seconds in totals.most_common()}
+
+
+def _cprofile_report(profiler: cProfile.Profile, limit: int = 60) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+class ProfileStore:
+    """The last ``size`` profiles, oldest dropped first"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._profiles: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def add(self, profile: Dict[str, Any]) -> int:
+        profile_id = next(self._ids)
+        profile["id"] = profile_id
+        self._profiles[profile_id] = profile
+        while len(self._profiles) > self.size:
+            self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(profile_id)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [
+            {key: value for key, value in profile.items() if key not in ("collapsed", "report")}
+            for profile in reversed(self._profiles.values())
+        ]
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+profile_store = ProfileStore(settings.PROFILE_HISTORY)
+
+_active = threading.Lock()
+
+
+def _token_matches(token: str) -> bool:
+    return bool(settings.PROFILE_TOKEN) and hmac.compare_digest(token.encode(), settings.PROFILE_TOKEN.encode())
+
+
+async def require_profile_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency for the routes serving profiles and the query log, which
+    expose file paths, stacks and statement text: they need the profiling
+    token, and do not exist when no token is configured
+    """
+    if not settings.PROFILE_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_profile_token is None or not _token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail=f"Missing or invalid {PROFILE_TOKEN_HEADER}")
+
+
+def _requested_mode(scope: Scope) -> Optional[str]:
+    """Profiling mode for this request, or None to run it unprofiled"""
+    if scope["path"].startswith(_UNPROFILED_PREFIX):
+        return None
+    headers = dict(scope.get("headers") or [])
+    token = headers.get(PROFILE_TOKEN_HEADER.lower().encode())
+    if token is not None and settings.PROFILE_TOKEN:
+        if not _token_matches(token.decode("latin-1")):
+            return None
+        mode = headers.get(PROFILE_MODE_HEADER.lower().encode(), b"sample").decode("latin-1")
+        return mode if mode in MODES else "sample"
+    if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests carrying a valid ``X-Profile-Token`` header, plus a
+    ``PROFILE_SAMPLE_RATE`` fraction of all traffic. One request is
+    profiled at a time; the profile id is returned in ``X-Profile-Id``
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = _requested_mode(scope)
+        if mode is None or not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile: Dict[str, Any] = {
+            "at": time.time(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "mode": mode,
+            "status": None,
+        }
+        # Reserve the id up front so it can go out with the response headers
+        profile_id = profile_store.add(profile)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile["status"] = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, str(profile_id))
+            await send(message)
+
+        sampler = profiler = None
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            sampler = StackSampler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000)
+            sampler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            if profiler is not None:
+                profiler.disable()
+                profile["categories_ms"] = _cprofile_categories(profiler)
+                profile["collapsed"] = _cprofile_collapsed(profiler)
+                profile["report"] = _cprofile_report(profiler)
+            else:
+                sampler.stop()
+                profile["samples"] = sampler.samples
+                profile["interval_ms"] = settings.PROFILE_INTERVAL_MS
+                profile["categories"] = dict(sampler.categories.most_common())
+                profile["collapsed"] = sampler.collapsed()
+            profile["route"] = getattr(scope.get("route"), "path", None)
+            _active.release()
@@ -0,0 +1,306 @@
+"""
+Materialized read models for the fund and holding listings
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import (
+    BigInteger, Column, Date, DateTime, Integer, MetaData, Numeric, String, Table, Text, text,
+)
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import invalidate
+from app.core.config import settings
+from app.core.versioning import bump
+from app.models.fund import FundStrategy
+
+logger = logging.getLogger(__name__)
+
+# Latest close per held ticker: one index probe on stock_prices(ticker, date)
+# per distinct ticker instead of a correlated MAX(date) per holding row.
+_VALUED_HOLDINGS_SQL = """
+    WITH latest_prices AS (
+        SELECT t.ticker, p.date, p.close_price
+        FROM (SELECT DISTINCT ticker FROM holdings) t
+        LEFT JOIN LATERAL (
+            SELECT sp.date, sp.close_price
+            FROM stock_prices sp
+            WHERE sp.ticker = t.ticker
+            ORDER BY sp.date DESC
+            LIMIT 1
+        ) p ON true
+    )
+    SELECT
+        h.*,
+        lp.close_price AS current_price,
+        lp.date AS price_date,
+        h.shares * h.purchase_price AS exact_cost_basis,
+        h.shares * COALESCE(lp.close_price, h.purchase_price) AS exact_current_value
+    FROM holdings h
+    LEFT JOIN latest_prices lp ON lp.ticker = h.ticker
+"""
+
+HOLDING_DETAILS_SQL = f"""
+    CREATE MATERIALIZED VIEW holding_details AS
+    WITH valued AS ({_VALUED_HOLDINGS_SQL})
+    SELECT
+        v.id, v.fund_id, f.name AS fund_name, v.ticker, v.company_name, v.shares,
+        v.purchase_price, v.purchase_date, v.sector, v.market_cap, v.created_at, v.updated_at,
+        v.current_price, v.price_date,
+        ROUND(v.exact_cost_basis, 2) AS cost_basis,
+        ROUND(v.exact_current_value, 2) AS current_value,
+        ROUND(v.exact_current_value - v.exact_cost_basis, 2) AS unrealized_gain_loss,
+        ROUND(CASE WHEN v.exact_cost_basis > 0
+              THEN (v.exact_current_value - v.exact_cost_basis) / v.exact_cost_basis * 100
+              ELSE 0 END, 4) AS unrealized_gain_loss_percent,
+        ROUND(CASE WHEN SUM(v.exact_current_value) OVER fund_window > 0
+              THEN v.exact_current_value / SUM(v.exact_current_value) OVER fund_window * 100
+              ELSE 0 END, 4) AS weight_in_fund
+    FROM valued v
+    JOIN funds f ON f.id = v.fund_id
+    WINDOW fund_window AS (PARTITION BY v.fund_id)
+"""
+
+FUND_SUMMARY_SQL = f"""
+    CREATE MATERIALIZED VIEW fund_summary AS
+    WITH valued AS ({_VALUED_HOLDINGS_SQL}),
+    totals AS (
+        SELECT
+            fund_id,
+            COUNT(*) AS holdings_count,
+            SUM(exact_cost_basis) AS total_cost_basis,
+            SUM(exact_current_value) AS total_market_value
+        FROM valued
+        GROUP BY fund_id
+    )
+    SELECT
+        f.id, f.name, f.strategy, f.inception_date, f.total_aum, f.manager_name,
+        f.expense_ratio, f.description, f.created_at, f.updated_at,
+        COALESCE(t.holdings_count, 0) AS holdings_count,
+        COALESCE(t.total_cost_basis, 0) AS total_cost_basis,
+        COALESCE(t.total_market_value, 0) AS total_market_value,
+        fp.date AS performance_date,
+        fp.nav_price AS latest_nav,
+        fp.total_return AS latest_total_return,
+        fp.daily_return AS latest_daily_return,
+        fp.assets_under_management AS latest_aum
+    FROM funds f
+    LEFT JOIN totals t ON t.fund_id = f.id
+    LEFT JOIN LATERAL (
+        SELECT date, nav_price, total_return, daily_return, assets_under_management
+        FROM fund_performance
+        WHERE fund_id = f.id
+        ORDER BY date DESC
+        LIMIT 1
+    ) fp ON true
+"""
+
+# REFRESH ... CONCURRENTLY requires a unique index on each view
+READ_MODEL_INDEXES = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_holding_details_id ON holding_details (id)",
+    "CREATE INDEX IF NOT EXISTS idx_holding_details_fund_ticker ON holding_details (fund_id, ticker)",
+    "CREATE INDEX IF NOT EXISTS idx_holding_details_ticker_id ON holding_details (ticker, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_fund_summary_id ON fund_summary (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_fund_summary_name ON fund_summary (name)",
+)
+
+READ_MODELS = {
+    "holding_details": HOLDING_DETAILS_SQL,
+    "fund_summary": FUND_SUMMARY_SQL,
+}
+
+_metadata = MetaData()
+
+fund_summary = Table(
+    "fund_summary", _metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(255)),
+    Column("strategy", SAEnum(FundStrategy, name="fund_strategy", create_type=False)),
+    Column("inception_date", Date),
+    Column("total_aum", Numeric(15, 2)),
+    Column("manager_name", String(255)),
+    Column("expense_ratio", Numeric(5, 4)),
+    Column("description", Text),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("holdings_count", BigInteger),
+    Column("total_cost_basis", Numeric),
+    Column("total_market_value", Numeric),
+    Column("performance_date", Date),
+    Column("latest_nav", Numeric(10, 4)),
+    Column("latest_total_return", Numeric(8, 4)),
+    Column("latest_daily_return", Numeric(8, 4)),
+    Column("latest_aum", Numeric(15, 2)),
+)
+
+holding_details = Table(
+    "holding_details", _metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fund_id", Integer),
+    Column("fund_name", String(255)),
+    Column("ticker", String(10)),
+    Column("company_name", String(255)),
+    Column("shares", Numeric(15, 4)),
+    Column("purchase_price", Numeric(10, 4)),
+    Column("purchase_date", Date),
+    Column("sector", String(100)),
+    Column("market_cap", BigInteger),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("current_price", Numeric(10, 4)),
+    Column("price_date", Date),
+    Column("cost_basis", Numeric),
+    Column("current_value", Numeric),
+    Column("unrealized_gain_loss", Numeric),
+    Column("unrealized_gain_loss_percent", Numeric),
+    Column("weight_in_fund", Numeric),
+)
+
+
+class ReadModels:
+    """
+    Owns the fund_summary and holding_details materialized views.
+
+    Every write schedules a debounced refresh, so a burst of writes costs
+    one refresh and no write waits for one. Until a refresh that started
+    after a fund or holding write has finished, this process reads the
+    written fund (and the listings, which include it) through the live
+    queries, so the writer reads its own change. Services only read the
+    views while ``serves()`` and use their live queries otherwise (e.g.
+    under SQLite, or while a failed refresh is being retried).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._bind: Optional[AsyncEngine] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._pending: Optional[asyncio.Task] = None
+        # Fund ID -> refresh generation it was written in; the views hold the
+        # write once a refresh of a later generation has succeeded
+        self._stale: Dict[int, int] = {}
+        self._generation = 0
+        # Consecutive failed refreshes; the views are behind while non-zero
+        self.failures = 0
+        self.refreshes = 0
+        self.last_refresh_at: Optional[float] = None
+        self.last_refresh_ms: Optional[float] = None
+
+    async def setup(self, bind: AsyncEngine) -> bool:
+        """Create any missing views and enable them (PostgreSQL only)"""
+        self.enabled = False
+        if not settings.READ_MODELS_ENABLED or bind.dialect.name != "postgresql":
+            return False
+
+        async with bind.begin() as conn:
+            for name, ddl in READ_MODELS.items():
+                kind = (await conn.execute(
+                    text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+                )).scalar()
+                if kind == "v":
+                    # Plain view from an older schema.sql
+                    await conn.execute(text(f"DROP VIEW {name}"))
+                    kind = None
+                if kind is None:
+                    await conn.execute(text(ddl))
+            for ddl in READ_MODEL_INDEXES:
+                await conn.execute(text(ddl))
+
+        self._bind = bind
+        self.enabled = True
+        return True
+
+    def serves(self, fund_id: Optional[int] = None) -> bool:
+        """
+        Whether reads of ``fund_id`` (of every fund when None) may use the
+        views: they are enabled, up to date after any failed refresh, and
+        hold this process's writes to the fund
+        """
+        if not self.enabled or self.failures:
+            return False
+        return fund_id not in self._stale if fund_id is not None else not self._stale
+
+    def written(self, *fund_ids: int) -> None:
+        """
+        Record committed writes to ``fund_ids`` and schedule a refresh;
+        their reads go live until it has finished
+        """
+        if not self.enabled:
+            return
+        for fund_id in fund_ids:
+            self._stale[fund_id] = self._generation
+        self.schedule_refresh()
+
+    async def refresh(self) -> None:
+        """Refresh both views now; a no-op when read models are disabled"""
+        if not self.enabled:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            started = time.perf_counter()
+            # Writes recorded before this point committed before the refresh
+            # reads the base tables, so a successful refresh covers them
+            generation = self._generation
+            self._generation += 1
+            try:
+                if self.failures:
+                    # A view may have been dropped or left invalid
+                    await self.setup(self._bind)
+                async with self._bind.begin() as conn:
+                    for name in READ_MODELS:
+                        await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+                    await bump(conn, "read_models")
+            except Exception:
+                # Reads go live while the views are behind; retry with backoff
+                self.failures += 1
+                self.enabled = True
+                logger.exception("Read model refresh failed (%d in a row); retrying", self.failures)
+                self.schedule_refresh()
+                return
+            finally:
+                # Entries cached from the previous contents are now stale
+                invalidate("read_models")
+            self._stale = {fund_id: marked for fund_id, marked in self._stale.items() if marked > generation}
+            self.failures = 0
+            self.refreshes += 1
+            self.last_refresh_at = time.time()
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def schedule_refresh(self) -> None:
+        """Refresh after READ_MODEL_REFRESH_DELAY seconds, coalescing repeated calls"""
+        if not self.enabled or (self._pending is not None and not self._pending.done()):
+            return
+        self._pending = asyncio.get_running_loop().create_task(self._delayed_refresh())
+
+    async def _delayed_refresh(self) -> None:
+        delay = settings.READ_MODEL_REFRESH_DELAY
+        if self.failures:
+            delay = min(max(delay, 1.0) * 2 ** self.failures, settings.READ_MODEL_RETRY_MAX_DELAY)
+        await asyncio.sleep(delay)
+        self._pending = None
+        await self.refresh()
+
+    async def close(self) -> None:
+        """Cancel a scheduled refresh (application shutdown)"""
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "serving": self.serves(),
+            "stale_funds": len(self._stale),
+            "failures": self.failures,
+            "refreshes": self.refreshes,
+            "last_refresh_at": self.last_refresh_at,
+            "last_refresh_ms": self.last_refresh_ms,
+            "refresh_pending": self._pending is not None and not self._pending.done(),
+        }
+
+
+read_models = ReadModels()
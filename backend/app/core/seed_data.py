@@ -6,6 +6,7 @@ from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.core.versioning import BULK_LOAD_KEYS, bump
 from app.models.fund import Fund, FundStrategy
 from app.models.holding import Holding
 from app.models.stock_price import StockPrice
@@ -152,5 +153,6 @@ async def seed_database(db: AsyncSession) -> None:
         db.add(peer_fund)
     
     # Commit all changes
+    await bump(db, *BULK_LOAD_KEYS)
     await db.commit()
     print("✅ Database seeded successfully with sample data")
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Fast response serialization.
+
+FastAPI validates a route's return value against its response_model,
+converts it back to JSON-compatible Python objects and then encodes them
+with the stdlib json module, three passes per row. The services build
+these payloads from database rows, so a ResponseSerializer trusts them:
+it picks each model's fields off the ORM objects or dicts, coerces only
+numbers the model types differently, and encodes the result with orjson
+in one pass. orjson handles dates and enums natively, and Decimals are
+emitted as strings the way pydantic does. Untrusted payloads are
+validated and dumped through a pre-built TypeAdapter instead.
+"""
+import collections.abc
+import enum
+import json
+import types
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        """Encode ``content`` as compact UTF-8 JSON"""
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        """Encode ``content`` as compact UTF-8 JSON"""
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+        ).encode("utf-8")
+
+
+Shaper = Callable[[Any], Any]
+
+
+class UnsupportedShape(TypeError):
+    """The annotation uses a feature the trusted path does not reproduce"""
+
+
+def _to_decimal(value: Any) -> Any:
+    # Strings are dumped as they are, which is what the Decimal would print
+    if isinstance(value, (Decimal, str)):
+        return value
+    return Decimal(str(value))
+
+
+def _to_float(value: Any) -> Any:
+    return value if isinstance(value, float) else float(value)
+
+
+def _to_int(value: Any) -> Any:
+    return value if type(value) is int else int(value)
+
+
+_SCALARS: Dict[Any, Optional[Shaper]] = {
+    Decimal: _to_decimal, float: _to_float, int: _to_int,
+    str: None, bool: None, date: None, datetime: None, time: None, Any: None,
+}
+
+
+def _model_shaper(model: type) -> Shaper:
+    decorators = model.__pydantic_decorators__
+    if model.model_computed_fields or decorators.field_serializers or decorators.model_serializers:
+        raise UnsupportedShape(f"{model.__name__} customises its serialization")
+    fields = []
+    for name, field in model.model_fields.items():
+        if field.alias or field.serialization_alias or field.exclude:
+            raise UnsupportedShape(f"{model.__name__}.{name} is aliased or excluded")
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        fields.append((name, _shaper(field.annotation), default))
+
+    def shape(value: Any) -> dict:
+        if isinstance(value, dict):
+            get = value.get
+        else:
+            get = lambda name, default: getattr(value, name, default)  # noqa: E731
+        data = {}
+        for name, shaper, default in fields:
+            item = get(name, default)
+            data[name] = item if shaper is None or item is None else shaper(item)
+        return data
+
+    return shape
+
+
+def _shaper(annotation: Any) -> Optional[Shaper]:
+    """
+    A function turning a trusted value into plain data that dumps to the
+    JSON pydantic would produce for ``annotation``, or None when the value
+    can be dumped as it is
+    """
+    if annotation in _SCALARS:
+        return _SCALARS[annotation]
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _model_shaper(annotation)
+
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin in (Union, types.UnionType):
+        members = [arg for arg in args if arg is not type(None)]
+        if len(members) != 1:
+            raise UnsupportedShape(f"{annotation} is a union")
+        # None is passed through by the callers
+        return _shaper(members[0])
+    if origin in (list, collections.abc.Sequence) or (origin is tuple and args[-1:] == (Ellipsis,)):
+        item = _shaper(args[0]) if args else None
+        if item is None:
+            return None
+        return lambda value: [None if element is None else item(element) for element in value]
+    if origin in (dict, collections.abc.Mapping):
+        item = _shaper(args[1]) if args else None
+        if item is None:
+            return None
+        return lambda value: {key: None if element is None else item(element) for key, element in value.items()}
+    raise UnsupportedShape(f"{annotation} is not a supported response type")
+
+
+class ResponseSerializer:
+    """
+    Per-route fast path producing the same JSON as the route's
+    response_model. The payload is trusted and shaped by ``annotation``
+    without validation; with ``validate`` (or an annotation the shaping
+    does not cover) it is validated and dumped by a TypeAdapter built once
+    at import. Without an annotation it is encoded as it is. Disabled
+    routes (FAST_SERIALIZATION off, or the route name in
+    FAST_SERIALIZATION_EXCLUDE) fall back to FastAPI
+    """
+
+    def __init__(self, name: str, annotation: Any = None, validate: bool = False):
+        self.name = name
+        self.adapter = None
+        self.shape: Optional[Shaper] = None
+        if annotation is not None and not validate:
+            try:
+                self.shape = _shaper(annotation)
+            except UnsupportedShape:
+                validate = True
+        if validate:
+            self.adapter = TypeAdapter(annotation)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.FAST_SERIALIZATION and self.name not in settings.FAST_SERIALIZATION_EXCLUDE
+
+    def encode(self, content: Any) -> bytes:
+        if self.adapter is not None:
+            return self.adapter.dump_json(self.adapter.validate_python(content, from_attributes=True))
+        if self.shape is not None:
+            content = self.shape(content)
+        return dumps(content)
+
+    def response(self, content: Any, response: Optional[Response] = None) -> Any:
+        """
+        A ready JSON response for ``content``, or ``content`` itself when
+        the fast path is disabled. Headers and status set on the route's
+        injected ``response`` are carried over
+        """
+        if not self.enabled:
+            return content
+        fast = Response(self.encode(content), media_type=JSON_MEDIA_TYPE)
+        if response is not None:
+            if response.status_code:
+                fast.status_code = response.status_code
+            fast.raw_headers.extend(
+                (key, value) for key, value in response.raw_headers
+                if key not in (b"content-length", b"content-type")
+            )
+        return fast
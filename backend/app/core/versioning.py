@@ -0,0 +1,169 @@
+"""
+Data versions and conditional GET.
+
+Writes bump a monotonic counter per table or per fund in the same
+transaction (keys are named like cache tags: ``funds``, ``holdings``,
+``fund:42``). A read endpoint derives a strong ETag from the versions it
+depends on, so a matching ``If-None-Match`` is answered with 304 after one
+primary-key lookup instead of the listing's queries. The counters live in
+the database, so every worker and the ingestion jobs agree on them.
+"""
+import hashlib
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Sequence, Union
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.cache import invalidate
+from app.core.config import settings
+from app.models.data_version import DataVersion
+
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+Executor = Union[AsyncSession, AsyncConnection]
+
+# Advanced by seeding and bulk loads, which rewrite whole tables. Every
+# versioned endpoint depends on at least one of them, so per-fund keys left
+# over from before a reload cannot produce a stale match
+BULK_LOAD_KEYS = ("funds", "holdings", "stock_prices", "tickers", "daily_returns", "performance", "peers")
+
+# Table keys that every single-row write advances. One counter row would
+# serialise concurrent writers on its lock until they commit, so each is
+# spread over stripe rows (``holdings#0`` ... ``holdings#7``). A write takes
+# the stripe its entity keys hash to and readers sum the stripes, together
+# with the plain row left by versions written before striping
+STRIPED_KEYS = frozenset({"funds", "holdings", "stock_prices", "tickers", "daily_returns", "performance"})
+STRIPES = 8
+
+
+def _dialect(db: Executor) -> str:
+    bind = db.get_bind() if isinstance(db, AsyncSession) else db
+    return bind.dialect.name
+
+
+async def bump(db: Executor, *keys: str) -> None:
+    """
+    Increment the version of each key (creating it at 1). Runs inside the
+    caller's transaction, so the new versions become visible with the write
+    """
+    if not keys:
+        return
+    # Writes to different funds or tickers land on different stripes
+    entity = ",".join(sorted(key for key in keys if key not in STRIPED_KEYS))
+    stripe = zlib.crc32(entity.encode()) % STRIPES
+    rows = {f"{key}#{stripe}" if key in STRIPED_KEYS else key for key in keys}
+    if _dialect(db) == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    now = datetime.utcnow()
+    statement = insert(DataVersion)
+    statement = statement.on_conflict_do_update(
+        index_elements=[DataVersion.key],
+        set_={"version": DataVersion.version + 1, "updated_at": statement.excluded.updated_at},
+    )
+    # Sorted so concurrent writers lock the rows in the same order
+    await db.execute(statement, [{"key": key, "version": 1, "updated_at": now} for key in sorted(rows)])
+
+
+def _rows(key: str) -> Sequence[str]:
+    """The data_versions rows whose sum is the version of ``key``"""
+    if key not in STRIPED_KEYS:
+        return (key,)
+    return (key, *(f"{key}#{stripe}" for stripe in range(STRIPES)))
+
+
+class VersionTracker:
+    """
+    Remembers the last version seen per key in this process. A key that
+    moved since (or is seen for the first time) may have been written
+    elsewhere, by another worker or an ingestion job, so the local cache
+    entries tagged with it are dropped
+    """
+
+    def __init__(self):
+        self.seen: Dict[str, int] = {}
+        self.invalidations = 0
+
+    async def get(self, db: AsyncSession, keys: Sequence[str]) -> Dict[str, int]:
+        """Current version per key; keys never written are at 0"""
+        rows = {row: key for key in keys for row in _rows(key)}
+        result = await db.execute(select(DataVersion.key, DataVersion.version).where(DataVersion.key.in_(rows)))
+        versions = dict.fromkeys(keys, 0)
+        for row, version in result.all():
+            versions[rows[row]] += version
+
+        moved = [key for key, version in versions.items() if self.seen.get(key) != version]
+        if moved:
+            invalidate(*moved)
+            self.invalidations += len(moved)
+        self.seen.update(versions)
+        return versions
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys_seen": len(self.seen), "invalidations": self.invalidations}
+
+
+version_tracker = VersionTracker()
+
+
+def make_etag(request: Request, versions: Dict[str, int], extra: Sequence[Any] = ()) -> str:
+    """Strong ETag for the request's URL at the given data versions"""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(settings.ETAG_SALT.encode())
+    # Windows such as ``days=30`` end today, so bodies move with the date too
+    digest.update(date.today().isoformat().encode())
+    digest.update(request.url.path.encode())
+    digest.update(str(sorted(request.query_params.multi_items())).encode())
+    for key in sorted(versions):
+        digest.update(f"\0{key}={versions[key]}".encode())
+    for item in extra:
+        digest.update(f"\0{item}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as RFC 9110 prescribes for If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def cache_control() -> str:
+    # nginx and browsers may store versioned responses; with no max-age they
+    # revalidate every use, which costs a 304 while the data is unchanged
+    if settings.HTTP_CACHE_MAX_AGE > 0:
+        return f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, must-revalidate"
+    return "public, no-cache"
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    keys: Iterable[str],
+    extra: Sequence[Any] = (),
+) -> Optional[Response]:
+    """
+    Set ETag and Cache-Control on ``response`` for data depending on
+    ``keys``, and on ``extra`` values for data the versions do not cover.
+    Returns a 304 response when the client's copy is current, otherwise
+    None and the endpoint builds its body as usual
+    """
+    if not settings.CONDITIONAL_GET_ENABLED:
+        return None
+
+    versions = await version_tracker.get(db, sorted(set(keys)))
+    etag = make_etag(request, versions, extra)
+    headers = {ETAG_HEADER: etag, "Cache-Control": cache_control()}
+    if etag_matches(request.headers.get(IF_NONE_MATCH_HEADER), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
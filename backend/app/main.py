@@ -2,14 +2,23 @@
 Portfolio Monitoring Dashboard - FastAPI Main Application
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import uvicorn
 
+from app.core.cache import cache_stats
 from app.core.config import settings
-from app.core.database import engine, Base, get_db
+from app.core.database import engine, Base, get_db, get_pool_stats
+from app.core.instrumentation import QueryInstrumentationMiddleware, query_log
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, loop_monitor, render_metrics
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER
+from app.core.profiling import PROFILE_ID_HEADER, ProfilingMiddleware, profile_store, require_profile_token
+from app.core.read_models import read_models
 from app.core.seed_data import seed_database
+from app.services.market_data_service import close_market_data_client, market_data_scheduler
+from app.services.peer_service import peer_ranking_scheduler, setup_peer_categories
+from app.services.search_service import autocomplete_index, trigram_search
 from app.api.api_v1.api import api_router
 
 
@@ -18,10 +27,13 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("Starting up Portfolio Monitoring Dashboard API...")
+    if settings.METRICS_ENABLED:
+        loop_monitor.start()
     
     # Create database tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await setup_peer_categories(engine)
     
     # Seed database with sample data
     from sqlalchemy.ext.asyncio import AsyncSession
@@ -31,10 +43,24 @@ async def lifespan(app: FastAPI):
     finally:
         await async_session.close()
     
+    # Materialized read models (PostgreSQL only), refreshed after seeding
+    if await read_models.setup(engine):
+        await read_models.refresh()
+    # After the read models, so the holding_details view is indexed too
+    await trigram_search.setup(engine)
+    
+    market_data_scheduler.start()
+    peer_ranking_scheduler.start()
+    
     yield
     
     # Shutdown
     print("Shutting down Portfolio Monitoring Dashboard API...")
+    await market_data_scheduler.stop()
+    await peer_ranking_scheduler.stop()
+    await close_market_data_client()
+    await loop_monitor.stop()
+    await read_models.close()
     await engine.dispose()
 
 
@@ -62,8 +88,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER, PROFILE_ID_HEADER, "Server-Timing"],
 )
 
+# Opt-in request profiling behind X-Profile-Token or a sampling rate
+if settings.PROFILE_TOKEN or settings.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware)
+
+# Route latency histograms and in-flight requests for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Per-request SQL counts and timings, reported as Server-Timing
+if settings.QUERY_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryInstrumentationMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -84,6 +123,89 @@ async def health_check():
     return {"status": "healthy", "service": "portfolio-dashboard-api"}
 
 
+@app.get("/health/pool")
+async def pool_status():
+    """Database connection pool statistics"""
+    return get_pool_stats()
+
+
+@app.get("/health/cache")
+async def cache_status():
+    """Application cache hit/miss/eviction counters per namespace"""
+    return cache_stats()
+
+
+@app.get("/health/read-models")
+async def read_model_status():
+    """Materialized read model state and refresh timings"""
+    return read_models.stats()
+
+
+@app.get("/health/search")
+async def search_status():
+    """Autocomplete index size and build time, and whether trigram search is on"""
+    return autocomplete_index.stats()
+
+
+@app.get("/health/queries", dependencies=[Depends(require_profile_token)])
+async def query_status():
+    """Recent slow statements and requests flagged for repeated (N+1) queries"""
+    return {
+        "enabled": settings.QUERY_INSTRUMENTATION_ENABLED,
+        "slow_query_ms": settings.SLOW_QUERY_MS,
+        "requests": query_log.requests,
+        "queries": query_log.queries,
+        "objects": query_log.objects,
+        "slow_queries": list(reversed(query_log.slow_queries)),
+        "repeated_queries": list(reversed(query_log.repeated_queries)),
+    }
+
+
+@app.delete("/health/queries", status_code=204, dependencies=[Depends(require_profile_token)])
+async def clear_query_log():
+    """Empty the slow and repeated query log"""
+    query_log.clear()
+
+
+@app.get("/health/profiles", dependencies=[Depends(require_profile_token)])
+async def list_profiles():
+    """Recent request profiles, newest first, without their stacks"""
+    return profile_store.summaries()
+
+
+@app.get("/health/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def download_profile(
+    profile_id: int,
+    format: str = Query("collapsed", pattern="^(collapsed|report)$", description="collapsed stacks or cProfile report"),
+):
+    """Download a profile as collapsed stacks for flamegraph.pl / speedscope"""
+    profile = profile_store.get(profile_id)
+    if profile is None or "collapsed" not in profile:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    if format == "report":
+        if "report" not in profile:
+            raise HTTPException(status_code=404, detail=f"Profile {profile_id} has no cProfile report")
+        return Response(profile["report"], media_type="text/plain")
+    return Response(
+        profile["collapsed"],
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'},
+    )
+
+
+@app.delete("/health/profiles", status_code=204, dependencies=[Depends(require_profile_token)])
+async def clear_profiles():
+    """Drop all stored profiles"""
+    profile_store.clear()
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus text-format metrics"""
+        return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
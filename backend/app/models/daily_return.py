@@ -0,0 +1,28 @@
+"""
+Daily return model derived from consecutive stock price closes
+"""
+from sqlalchemy import Column, String, Date, Numeric, BigInteger, Index
+
+from app.core.database import Base
+
+
+class DailyReturn(Base):
+    """Close-to-close return per ticker and trading day, maintained on price ingestion"""
+    
+    __tablename__ = "daily_returns"
+    
+    ticker = Column(String(10), primary_key=True)
+    date = Column(Date, primary_key=True)
+    close_price = Column(Numeric(10, 4), nullable=False)
+    previous_close = Column(Numeric(10, 4), nullable=False)
+    change = Column(Numeric(10, 4), nullable=False)
+    change_percent = Column(Numeric(12, 4), nullable=False)
+    volume = Column(BigInteger, nullable=False)
+    
+    # Top movers for a date are read straight off this index in either direction
+    __table_args__ = (
+        Index('idx_daily_returns_date_change', 'date', 'change_percent'),
+    )
+    
+    def __repr__(self):
+        return f"<DailyReturn(ticker='{self.ticker}', date='{self.date}', change_percent={self.change_percent})>"
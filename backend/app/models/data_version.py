@@ -0,0 +1,21 @@
+"""
+Data version model backing ETags and cross-worker cache invalidation
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, DateTime
+
+from app.core.database import Base
+
+
+class DataVersion(Base):
+    """Monotonic counter per table or per fund, bumped in the writing transaction"""
+    
+    __tablename__ = "data_versions"
+    
+    # Keys are named like cache tags: "funds", "holdings", "fund:42", ...
+    key = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<DataVersion(key='{self.key}', version={self.version})>"
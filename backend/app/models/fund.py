@@ -3,8 +3,9 @@ Fund model representing investment funds
 """
 from datetime import datetime
 from decimal import Decimal
+from typing import Optional
 from sqlalchemy import Column, Integer, String, Enum, Date, Numeric, Text, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import query_expression, relationship
 import enum
 
 from app.core.database import Base
@@ -39,21 +40,34 @@ class Fund(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    holdings = relationship("Holding", back_populates="fund", cascade="all, delete-orphan", lazy="selectin")
+    # Relationships. Holdings are loaded only when a loader profile asks
+    # for them (app/services/load_profiles.py); touching them otherwise raises
+    holdings = relationship("Holding", back_populates="fund", cascade="all, delete-orphan", lazy="raise_on_sql")
     performance_records = relationship("FundPerformance", back_populates="fund", cascade="all, delete-orphan")
+    # Maintained by ReturnLadderService; loaded by the "returns" profile
+    return_ladder = relationship("FundReturnLadder", uselist=False, viewonly=True, lazy="raise_on_sql")
+    
+    # Filled by the "aggregates" loader profile in place of the holdings
+    aggregate_holdings_count = query_expression()
+    aggregate_cost_basis = query_expression()
     
     def __repr__(self):
         return f"<Fund(id={self.id}, name='{self.name}', strategy='{self.strategy}')>"
     
+    def _loaded_holdings(self) -> Optional[list]:
+        """The holdings if a loader profile loaded them, else None"""
+        return self.__dict__.get("holdings")
+    
     @property
     def current_value(self) -> Decimal:
         """Calculate current market value from holdings"""
-        if not self.holdings:
-            return Decimal('0.00')
+        holdings = self._loaded_holdings()
+        if holdings is None:
+            # Aggregates carry no marks; unmarked holdings are valued at cost
+            return self.total_cost_basis
         
         total_value = Decimal('0.00')
-        for holding in self.holdings:
+        for holding in holdings:
             if holding.current_price:
                 total_value += holding.shares * holding.current_price
             else:
@@ -65,10 +79,13 @@ class Fund(Base):
     @property
     def total_cost_basis(self) -> Decimal:
         """Calculate total cost basis from holdings"""
-        if not self.holdings:
+        holdings = self._loaded_holdings()
+        if holdings is None:
+            return Decimal(self.aggregate_cost_basis or '0.00')
+        if not holdings:
             return Decimal('0.00')
         
-        return sum(holding.shares * holding.purchase_price for holding in self.holdings)
+        return sum(holding.shares * holding.purchase_price for holding in holdings)
     
     @property
     def unrealized_gain_loss(self) -> Decimal:
@@ -86,4 +103,7 @@ class Fund(Base):
     @property
     def holdings_count(self) -> int:
         """Get number of holdings in the fund"""
-        return len(self.holdings) if self.holdings else 0
\ No newline at end of file
+        holdings = self._loaded_holdings()
+        if holdings is None:
+            return self.aggregate_holdings_count or 0
+        return len(holdings)
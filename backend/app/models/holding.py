@@ -3,7 +3,8 @@ Holding model representing individual stock positions within funds
 """
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, Date, DateTime, BigInteger
+from typing import Optional
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, Date, DateTime, BigInteger, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -31,6 +32,11 @@ class Holding(Base):
     # Relationships
     fund = relationship("Fund", back_populates="holdings")
     
+    # Keyset pagination order for holdings listings
+    __table_args__ = (
+        Index('idx_holdings_ticker_id', 'ticker', 'id'),
+    )
+    
     def __repr__(self):
         return f"<Holding(id={self.id}, ticker='{self.ticker}', shares={self.shares})>"
     
@@ -39,13 +45,14 @@ class Holding(Base):
         """Calculate cost basis (shares * purchase_price)"""
         return self.shares * self.purchase_price
     
+    def mark_to_market(self, price: Optional[Decimal]) -> None:
+        """Attach the latest market price resolved by the valuation service"""
+        self._mark_price = price
+    
     @property
-    def current_price(self) -> Decimal:
-        """Get current stock price from latest stock_prices record"""
-        # This would typically query the stock_prices table
-        # For now, return None to indicate no current price available
-        # In a full implementation, this would involve a database query
-        return None
+    def current_price(self) -> Optional[Decimal]:
+        """Latest stock price, once marked to market by the valuation service"""
+        return getattr(self, "_mark_price", None)
     
     @property
     def current_value(self) -> Decimal:
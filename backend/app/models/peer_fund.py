@@ -2,10 +2,12 @@
 Peer fund model for benchmark and competitor data
 """
 from datetime import datetime, date
+from typing import Dict, Optional
 from sqlalchemy import Column, Integer, String, Enum, Numeric, Text, DateTime, Date
 import enum
 
 from app.core.database import Base
+from app.models.fund import FundStrategy
 
 
 class PeerCategory(str, enum.Enum):
@@ -21,6 +23,36 @@ class PeerCategory(str, enum.Enum):
     sector_technology = "sector_technology"
     sector_healthcare = "sector_healthcare"
     sector_financial = "sector_financial"
+    balanced = "balanced"
+
+
+# Peer category each fund strategy is ranked in. Sector funds have no fixed
+# category; they are matched on the sector holding most of their value
+STRATEGY_PEER_CATEGORIES: Dict[FundStrategy, Optional[PeerCategory]] = {
+    FundStrategy.growth: PeerCategory.large_cap_growth,
+    FundStrategy.value: PeerCategory.large_cap_value,
+    FundStrategy.blend: PeerCategory.balanced,
+    FundStrategy.income: PeerCategory.large_cap_value,
+    FundStrategy.sector_specific: None,
+    FundStrategy.international: PeerCategory.international_developed,
+    FundStrategy.emerging_markets: PeerCategory.emerging_markets,
+}
+
+# Holding sector names (matched by prefix, case-insensitively) to sector categories
+SECTOR_PEER_CATEGORIES = (
+    ("tech", PeerCategory.sector_technology),
+    ("health", PeerCategory.sector_healthcare),
+    ("financ", PeerCategory.sector_financial),
+)
+
+
+def peer_category_for(strategy: FundStrategy, dominant_sector: Optional[str] = None) -> Optional[PeerCategory]:
+    """Peer category a fund is ranked in, None when it has no comparable group"""
+    category = STRATEGY_PEER_CATEGORIES.get(FundStrategy(strategy))
+    if category is None and dominant_sector:
+        sector = dominant_sector.lower()
+        category = next((c for prefix, c in SECTOR_PEER_CATEGORIES if sector.startswith(prefix)), None)
+    return category
 
 
 class PeerFund(Base):
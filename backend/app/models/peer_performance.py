@@ -0,0 +1,70 @@
+"""
+Peer fund NAV history and the precomputed peer rankings read model
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Date, Numeric, DateTime, Index, CheckConstraint
+
+from app.core.database import Base
+from app.models.peer_fund import PeerCategory
+
+
+class PeerPerformance(Base):
+    """Daily NAV of a peer fund, as delivered by the benchmark data vendor"""
+    
+    __tablename__ = "peer_performance"
+    
+    peer_fund_id = Column(Integer, ForeignKey("peer_funds.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    nav_price = Column(Numeric(10, 4), nullable=False)
+    
+    # The ranking job reads the few days before each window boundary for all peers
+    __table_args__ = (
+        CheckConstraint('nav_price > 0', name='ck_peer_positive_nav'),
+        Index('idx_peer_performance_date', 'date'),
+    )
+    
+    def __repr__(self):
+        return f"<PeerPerformance(peer_fund_id={self.peer_fund_id}, date='{self.date}', nav={self.nav_price})>"
+
+
+class PeerRanking(Base):
+    """
+    Trailing returns and percentile ranks of one fund or peer within its
+    category, rewritten as a whole by the nightly ranking job
+    """
+    
+    __tablename__ = "peer_rankings"
+    
+    entity_type = Column(String(4), primary_key=True)  # "fund" or "peer"
+    entity_id = Column(Integer, primary_key=True)
+    category = Column(Enum(PeerCategory, name='peer_category'), nullable=True)
+    name = Column(String(255), nullable=False)
+    total_aum = Column(Numeric(15, 2), nullable=True)
+    expense_ratio = Column(Numeric(5, 4), nullable=True)
+    as_of = Column(Date, nullable=True)
+    
+    # Percent; 3y and 5y are annualized
+    return_1m = Column(Numeric(12, 4), nullable=True)
+    return_3m = Column(Numeric(12, 4), nullable=True)
+    return_ytd = Column(Numeric(12, 4), nullable=True)
+    return_1y = Column(Numeric(12, 4), nullable=True)
+    return_3y = Column(Numeric(12, 4), nullable=True)
+    return_5y = Column(Numeric(12, 4), nullable=True)
+    
+    # Percent of the category's peers with a lower return over the window
+    percentile_1m = Column(Numeric(5, 2), nullable=True)
+    percentile_3m = Column(Numeric(5, 2), nullable=True)
+    percentile_ytd = Column(Numeric(5, 2), nullable=True)
+    percentile_1y = Column(Numeric(5, 2), nullable=True)
+    percentile_3y = Column(Numeric(5, 2), nullable=True)
+    percentile_5y = Column(Numeric(5, 2), nullable=True)
+    
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # A fund's peer group is read with one range scan on this index
+    __table_args__ = (
+        Index('idx_peer_rankings_category_type', 'category', 'entity_type'),
+    )
+    
+    def __repr__(self):
+        return f"<PeerRanking({self.entity_type}={self.entity_id}, category='{self.category}', return_1y={self.return_1y})>"
@@ -0,0 +1,51 @@
+"""
+Precomputed trailing-return ladders of funds (from NAVs) and tickers (from
+adjusted closes)
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Numeric, DateTime
+
+from app.core.database import Base
+
+
+class ReturnLadderColumns:
+    """Columns shared by the fund and ticker ladders"""
+
+    # Last observation of the series; every window ends on it
+    as_of = Column(Date, nullable=False)
+    # First observation, where the inception-to-date window starts
+    first_date = Column(Date, nullable=False)
+
+    # Percent; 3y is annualized, itd is cumulative since first_date
+    return_1d = Column(Numeric(12, 4), nullable=True)
+    return_1w = Column(Numeric(12, 4), nullable=True)
+    return_1m = Column(Numeric(12, 4), nullable=True)
+    return_3m = Column(Numeric(12, 4), nullable=True)
+    return_ytd = Column(Numeric(12, 4), nullable=True)
+    return_1y = Column(Numeric(12, 4), nullable=True)
+    return_3y = Column(Numeric(12, 4), nullable=True)
+    return_itd = Column(Numeric(12, 4), nullable=True)
+
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class FundReturnLadder(ReturnLadderColumns, Base):
+    """Trailing returns of one fund's NAV, rewritten when its NAV history changes"""
+
+    __tablename__ = "fund_return_ladders"
+
+    fund_id = Column(Integer, ForeignKey("funds.id", ondelete="CASCADE"), primary_key=True)
+
+    def __repr__(self):
+        return f"<FundReturnLadder(fund_id={self.fund_id}, as_of='{self.as_of}', return_1y={self.return_1y})>"
+
+
+class TickerReturnLadder(ReturnLadderColumns, Base):
+    """Trailing returns of one ticker's adjusted close, rewritten on price writes"""
+
+    __tablename__ = "ticker_return_ladders"
+
+    ticker = Column(String(10), primary_key=True)
+
+    def __repr__(self):
+        return f"<TickerReturnLadder(ticker='{self.ticker}', as_of='{self.as_of}', return_1y={self.return_1y})>"
@@ -2,7 +2,7 @@
 Stock price model for historical and current stock data
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, Numeric, DateTime, BigInteger, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, Integer, String, Date, Numeric, DateTime, BigInteger, UniqueConstraint, CheckConstraint, Index
 
 from app.core.database import Base
 
@@ -37,6 +37,8 @@ class StockPrice(Base):
         CheckConstraint('low_price <= close_price', name='ck_low_le_close'),
         CheckConstraint('open_price <= high_price', name='ck_open_le_high'),
         CheckConstraint('close_price <= high_price', name='ck_close_le_high'),
+        # Keyset pagination order for price listings (date DESC, ticker)
+        Index('idx_stock_prices_date_desc_ticker', date.desc(), ticker),
     )
     
     def __repr__(self):
@@ -0,0 +1,125 @@
+"""
+Pydantic schemas for firm-wide exposure API responses
+"""
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class FundExposure(BaseModel):
+    """Schema for one fund's share of a ticker or sector exposure"""
+    fund_id: int
+    fund_name: str
+    market_value: float
+    weight_in_fund: float = Field(..., description="Percentage of the fund's market value")
+    share_of_exposure: float = Field(..., description="Percentage of the firm-wide exposure held by this fund")
+
+
+class TickerExposureResponse(BaseModel):
+    """Schema for firm-wide exposure to one ticker"""
+    ticker: str
+    sector: str
+    market_value: float
+    firm_weight: float = Field(..., description="Percentage of the firm's total market value")
+    funds_count: int
+    priced_at: Optional[date] = Field(None, description="Latest price date used for marking")
+    funds: List[FundExposure]
+
+
+class SectorSummary(BaseModel):
+    """Schema for exposure to one sector"""
+    sector: str
+    market_value: float
+    weight: float = Field(..., description="Percentage of the total across the selected funds")
+    funds_count: int
+    tickers_count: int
+
+
+class SectorExposuresResponse(BaseModel):
+    """Schema for exposure per sector"""
+    market_value: float
+    funds_count: int
+    priced_at: Optional[date] = None
+    sectors: List[SectorSummary]
+
+
+class SectorTicker(BaseModel):
+    """Schema for a ticker's weight within a sector"""
+    ticker: str
+    market_value: float
+    weight: float = Field(..., description="Percentage of the sector's market value")
+
+
+class SectorExposureResponse(BaseModel):
+    """Schema for firm-wide exposure to one sector"""
+    sector: str
+    market_value: float
+    firm_weight: float
+    funds_count: int
+    priced_at: Optional[date] = None
+    top_tickers: List[SectorTicker]
+    funds: List[FundExposure]
+
+
+class Concentration(BaseModel):
+    """Schema for one ticker or sector concentration"""
+    key: str = Field(..., description="Ticker or sector")
+    market_value: float
+    weight: float = Field(..., description="Percentage of the total across the selected funds")
+    funds_count: int
+    max_fund_weight: float = Field(..., description="Largest percentage any single fund holds in it")
+
+
+class ConcentrationResponse(BaseModel):
+    """Schema for the largest concentrations"""
+    by: str
+    market_value: float
+    funds_count: int
+    priced_at: Optional[date] = None
+    concentrations: List[Concentration]
+
+
+class FundOverlap(BaseModel):
+    """Schema for the overlap between two funds"""
+    fund_id: int
+    fund_name: str
+    weighted_overlap: float = Field(..., description="Sum of the smaller portfolio weight over common tickers, in percent")
+    common_holdings: int
+
+
+class FundOverlapResponse(BaseModel):
+    """Schema for the funds overlapping most with one fund"""
+    fund_id: int
+    fund_name: str
+    holdings_count: int
+    priced_at: Optional[date] = None
+    overlaps: List[FundOverlap]
+
+
+class SimilarFund(BaseModel):
+    """Schema for one fund's similarity to another"""
+    fund_id: int
+    fund_name: str
+    weighted_overlap: float = Field(..., description="Sum of the smaller portfolio weight over common tickers, in percent")
+    cosine_similarity: float = Field(..., description="Cosine of the two market value vectors, 0 to 1")
+    common_holdings: int
+
+
+class SimilarFundsResponse(BaseModel):
+    """Schema for the funds most similar to one fund"""
+    fund_id: int
+    fund_name: str
+    metric: str = Field(..., description="Metric the funds are ranked by")
+    holdings_count: int
+    priced_at: Optional[date] = None
+    similar: List[SimilarFund]
+
+
+class SimilarityMatrixResponse(BaseModel):
+    """Schema for pairwise similarity among selected funds"""
+    fund_ids: List[int]
+    fund_names: List[str]
+    priced_at: Optional[date] = None
+    weighted_overlap: List[List[float]] = Field(..., description="Percent, rows and columns in fund_ids order")
+    cosine_similarity: List[List[float]]
+    common_holdings: List[List[int]]
@@ -3,7 +3,7 @@ Pydantic schemas for fund-related API requests and responses
 """
 from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, validator
 
 from app.models.fund import FundStrategy
@@ -49,6 +49,8 @@ class FundSummary(FundBase):
     current_value: Optional[Decimal] = Field(None, description="Current market value")
     total_return_percent: Optional[Decimal] = Field(None, description="Total return percentage")
     daily_return_percent: Optional[Decimal] = Field(None, description="Daily return percentage")
+    returns_as_of: Optional[date] = Field(None, description="Date of the last NAV the trailing returns end on")
+    trailing_returns: Optional[Dict[str, Optional[Decimal]]] = Field(None, description="Return percentage per window (1d, 1w, 1m, 3m, ytd, 1y, 3y annualized, itd)")
     
     class Config:
         from_attributes = True
@@ -79,6 +81,13 @@ class FundPerformanceResponse(BaseModel):
     fund_name: str
     performance_data: List[FundPerformanceData]
     period_days: int = Field(..., description="Number of days of performance data")
+
+
+class FundPerformanceWriteResponse(BaseModel):
+    """Schema for the result of loading NAVs for a fund"""
+    fund_id: int
+    written: int = Field(..., description="NAV rows inserted or replaced")
+    returns_as_of: Optional[date] = Field(None, description="Date the fund's trailing returns now end on")
     
     
 class PeerComparisonData(BaseModel):
@@ -88,7 +97,9 @@ class PeerComparisonData(BaseModel):
     benchmark_category: str
     total_aum: Optional[Decimal] = None
     expense_ratio: Optional[Decimal] = None
-    total_return: Optional[Decimal] = None
+    total_return: Optional[Decimal] = Field(None, description="Trailing one-year return percentage")
+    trailing_returns: Optional[Dict[str, Optional[Decimal]]] = Field(None, description="Return percentage per window (1m, 3m, ytd, 1y, 3y and 5y annualized)")
+    percentile_ranks: Optional[Dict[str, Optional[Decimal]]] = Field(None, description="Percent of category peers beaten per window")
     
     class Config:
         from_attributes = True
@@ -99,5 +110,45 @@ class PeerComparisonResponse(BaseModel):
     fund_id: int
     fund_name: str
     fund_strategy: FundStrategy
-    fund_performance: Optional[Decimal] = None
-    peers: List[PeerComparisonData]
\ No newline at end of file
+    peer_category: Optional[str] = Field(None, description="Category the fund is ranked in")
+    as_of: Optional[date] = Field(None, description="Date the trailing returns end on")
+    fund_performance: Optional[Decimal] = Field(None, description="Trailing one-year return percentage")
+    trailing_returns: Optional[Dict[str, Optional[Decimal]]] = Field(None, description="Return percentage per window (1m, 3m, ytd, 1y, 3y and 5y annualized)")
+    percentile_ranks: Optional[Dict[str, Optional[Decimal]]] = Field(None, description="Percent of category peers the fund beat per window")
+    peer_count: int = Field(0, description="Peers in the category")
+    peers: List[PeerComparisonData]
+
+
+class PeerRankingRefreshResponse(BaseModel):
+    """Schema for the result of a peer ranking run"""
+    skipped: bool = Field(False, description="Another worker was already running the job")
+    as_of: Optional[date] = None
+    funds: int = 0
+    peers: int = 0
+    ranked: int = Field(0, description="Funds and peers with a one-year percentile rank")
+    categories: int = 0
+    duration_ms: Optional[float] = None
+
+
+class FundRiskMetrics(BaseModel):
+    """Schema for risk metrics of one fund over the analytics window"""
+    fund_id: int
+    fund_name: Optional[str] = None
+    observations: int = Field(..., description="Number of daily returns in the window")
+    annualized_return: Optional[float] = Field(None, description="Mean daily return x 252")
+    cumulative_return: Optional[float] = Field(None, description="NAV change over the window")
+    volatility: Optional[float] = Field(None, description="Annualized standard deviation of daily returns")
+    sharpe_ratio: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    max_drawdown: Optional[float] = Field(None, description="Largest peak-to-trough NAV decline (negative fraction)")
+    tracking_error: Optional[float] = Field(None, description="Annualized standard deviation of returns over the benchmark")
+    beta: Optional[float] = Field(None, description="Beta against the benchmark ticker")
+
+
+class FundAnalyticsResponse(BaseModel):
+    """Schema for batch fund analytics API response"""
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    benchmark: Optional[str] = None
+    risk_free_rate: float
+    funds: List[FundRiskMetrics]
@@ -3,7 +3,7 @@ Pydantic schemas for holding-related API requests and responses
 """
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import BaseModel, Field, validator
 
 
@@ -86,4 +86,13 @@ class FundHoldingsResponse(BaseModel):
     total_cost_basis: Decimal
     total_current_value: Optional[Decimal]
     total_unrealized_gain_loss: Optional[Decimal]
-    holdings: list[HoldingSummary]
\ No newline at end of file
+    holdings: list[HoldingSummary]
+
+
+class TickerReturns(BaseModel):
+    """Schema for the trailing-return ladder of one held ticker"""
+    ticker: str
+    company_name: Optional[str] = None
+    as_of: Optional[date] = Field(None, description="Date of the last price the returns end on")
+    first_date: Optional[date] = Field(None, description="Date of the first price, where itd starts")
+    trailing_returns: Optional[Dict[str, Optional[Decimal]]] = Field(None, description="Return percentage per window (1d, 1w, 1m, 3m, ytd, 1y, 3y annualized, itd)")
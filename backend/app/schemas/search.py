@@ -0,0 +1,48 @@
+"""
+Pydantic schemas for search API responses
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.models.fund import FundStrategy
+
+
+class FundMatch(BaseModel):
+    """Schema for a fund matching a search"""
+    fund_id: int
+    name: str
+    manager_name: Optional[str] = None
+    strategy: FundStrategy
+    score: float = Field(..., description="Relevance from 0 to 1")
+
+
+class SecurityMatch(BaseModel):
+    """Schema for a held security matching a search"""
+    ticker: str
+    company_name: Optional[str] = None
+    fund_count: int = Field(..., description="Number of funds holding the ticker")
+    score: float = Field(..., description="Relevance from 0 to 1")
+
+
+class SearchResponse(BaseModel):
+    """Schema for ranked fund and security search results"""
+    query: str
+    funds: List[FundMatch]
+    securities: List[SecurityMatch]
+
+
+class Suggestion(BaseModel):
+    """Schema for one autocomplete suggestion"""
+    kind: str = Field(..., description="fund or security")
+    fund_id: Optional[int] = None
+    ticker: Optional[str] = None
+    label: str
+    detail: Optional[str] = Field(None, description="Manager for a fund, company name for a security")
+    fund_count: Optional[int] = None
+    match: str = Field(..., description="Field the prefix matched: name, manager, ticker or company")
+
+
+class AutocompleteResponse(BaseModel):
+    """Schema for prefix autocomplete suggestions"""
+    query: str
+    suggestions: List[Suggestion]
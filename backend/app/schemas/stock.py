@@ -74,29 +74,6 @@ class CurrentStockPrice(BaseModel):
         from_attributes = True
 
 
-class BulkStockPriceRequest(BaseModel):
-    """Schema for bulk stock price update request"""
-    prices: List[StockPriceCreate] = Field(..., min_items=1, max_items=100)
-    
-    @validator('prices')
-    def validate_unique_ticker_dates(cls, v):
-        seen = set()
-        for price in v:
-            key = (price.ticker, price.date)
-            if key in seen:
-                raise ValueError(f'Duplicate ticker-date combination: {price.ticker} on {price.date}')
-            seen.add(key)
-        return v
-
-
-class BulkStockPriceResponse(BaseModel):
-    """Schema for bulk stock price update response"""
-    total_requested: int
-    successful_updates: int
-    failed_updates: int
-    errors: List[str] = Field(default_factory=list)
-
-
 class StockHistoryRequest(BaseModel):
     """Schema for stock price history request"""
     ticker: str = Field(..., min_length=1, max_length=10)
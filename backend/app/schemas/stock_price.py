@@ -3,7 +3,7 @@ Pydantic schemas for stock price-related API requests and responses
 """
 from datetime import date as DateType, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, validator
 
 
@@ -71,6 +71,33 @@ class StockPrice(StockPriceBase):
         from_attributes = True
 
 
+class BulkStockPriceRequest(BaseModel):
+    """Schema for bulk stock price upsert request"""
+    prices: List[StockPriceCreate] = Field(..., min_length=1, max_length=100_000)
+
+
+class BulkStockPriceResponse(BaseModel):
+    """Schema for bulk stock price upsert response"""
+    total_requested: int
+    successful_updates: int
+    failed_updates: int
+    inserted: int = Field(0, description="Rows inserted as new (ticker, date) records")
+    updated: int = Field(0, description="Rows that replaced an existing (ticker, date) record")
+    rejected: int = Field(0, description="Rows dropped as invalid or superseded duplicates")
+    errors: List[str] = Field(default_factory=list)
+
+
+class MarketDataSyncResponse(BaseModel):
+    """Schema for a market data sync run"""
+    tickers_requested: int = Field(..., description="Held tickers considered")
+    tickers_up_to_date: int = Field(..., description="Tickers skipped because their prices are current")
+    tickers_fetched: int
+    tickers_failed: Dict[str, str] = Field(default_factory=dict, description="Error per ticker that could not be fetched")
+    inserted: int
+    updated: int
+    rejected: int
+
+
 class StockPriceSummary(BaseModel):
     """Summary stock price information"""
     ticker: str
@@ -84,6 +111,26 @@ class StockPriceSummary(BaseModel):
         from_attributes = True
 
 
+class DailyMovers(BaseModel):
+    """Schema for the top gainers and losers of one trading day"""
+    date: Optional[DateType] = Field(None, description="Trading date, None when no returns exist yet")
+    fund_id: Optional[int] = Field(None, description="Fund whose holdings the movers were restricted to")
+    top_gainers: List[StockPriceSummary]
+    top_losers: List[StockPriceSummary]
+
+
+class StockPriceBar(BaseModel):
+    """Schema for an OHLC bar aggregated from consecutive daily prices"""
+    date: DateType = Field(..., description="Date of the first daily price in the bar")
+    end_date: DateType = Field(..., description="Date of the last daily price in the bar")
+    open_price: Decimal
+    high_price: Decimal
+    low_price: Decimal
+    close_price: Decimal
+    volume: int
+    records: int = Field(..., description="Number of daily prices aggregated")
+
+
 class StockPriceHistory(BaseModel):
     """Schema for stock price history response"""
     ticker: str
@@ -91,6 +138,8 @@ class StockPriceHistory(BaseModel):
     end_date: DateType
     total_records: int
     prices: List[StockPrice]
+    bars: Optional[List[StockPriceBar]] = Field(None, description="OHLC buckets when downsampled with method=ohlc")
+    downsampled: Optional[str] = Field(None, description="Downsampling method applied, if any")
 
 
 class MarketSummary(BaseModel):
@@ -0,0 +1,263 @@
+"""
+Risk analytics computed across many funds from fund_performance history
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cached
+from app.core.versioning import version_tracker
+from app.models.daily_return import DailyReturn
+from app.models.fund import Fund
+from app.models.fund_performance import FundPerformance
+
+TRADING_DAYS = 252
+
+# (data version key, version) for everything a result depends on
+Watermark = Tuple[Tuple[str, int], ...]
+
+
+def _optional(values: np.ndarray, places: int = 6) -> List[Optional[float]]:
+    """Round a float array for output, mapping NaN and inf to None"""
+    return [round(v, places) if np.isfinite(v) else None for v in values.tolist()]
+
+
+def compute_risk_metrics(
+    returns: np.ndarray,
+    nav: np.ndarray,
+    benchmark: Optional[np.ndarray],
+    risk_free_rate: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute per-fund risk metrics from aligned date x fund matrices.
+
+    ``returns`` holds daily returns as fractions and ``nav`` the NAV series,
+    both with NaN where a fund has no observation. ``benchmark`` is the
+    benchmark's daily return per date (NaN where missing). Every metric is
+    computed for all funds at once along axis 0.
+    """
+    daily_rf = risk_free_rate / TRADING_DAYS
+    observed = ~np.isnan(returns)
+    n = observed.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.nansum(returns, axis=0) / n
+        centered = np.where(observed, returns - mean, 0.0)
+        std = np.where(n > 1, np.sqrt((centered ** 2).sum(axis=0) / (n - 1)), np.nan)
+
+        excess = mean - daily_rf
+        volatility = std * np.sqrt(TRADING_DAYS)
+        sharpe = excess / std * np.sqrt(TRADING_DAYS)
+
+        shortfall = np.where(observed, np.minimum(returns - daily_rf, 0.0), 0.0)
+        downside = np.sqrt((shortfall ** 2).sum(axis=0) / n)
+        sortino = excess / downside * np.sqrt(TRADING_DAYS)
+
+        # NaN gaps are ignored by fmax, so the running peak carries across them
+        peak = np.fmax.accumulate(nav, axis=0)
+        drawdown = nav / peak - 1.0
+        max_drawdown = np.fmin.reduce(drawdown, axis=0, initial=np.nan)
+
+        first_nav = _first_valid(nav)
+        last_nav = _first_valid(nav[::-1])
+        cumulative_return = last_nav / first_nav - 1.0
+
+        if benchmark is None:
+            tracking_error = np.full(returns.shape[1], np.nan)
+            beta = np.full(returns.shape[1], np.nan)
+        else:
+            paired = observed & ~np.isnan(benchmark)[:, None]
+            m = paired.sum(axis=0)
+            fund = np.where(paired, returns, 0.0)
+            bench = np.where(paired, benchmark[:, None], 0.0)
+
+            active = np.where(paired, fund - bench, 0.0)
+            active_mean = active.sum(axis=0) / m
+            active_centered = np.where(paired, active - active_mean, 0.0)
+            tracking_error = np.where(
+                m > 1, np.sqrt((active_centered ** 2).sum(axis=0) / (m - 1)) * np.sqrt(TRADING_DAYS), np.nan
+            )
+
+            fund_centered = np.where(paired, fund - fund.sum(axis=0) / m, 0.0)
+            bench_centered = np.where(paired, bench - bench.sum(axis=0) / m, 0.0)
+            covariance = (fund_centered * bench_centered).sum(axis=0) / (m - 1)
+            variance = (bench_centered ** 2).sum(axis=0) / (m - 1)
+            beta = np.where(m > 1, covariance / variance, np.nan)
+
+    return {
+        "observations": n,
+        "annualized_return": mean * TRADING_DAYS,
+        "cumulative_return": cumulative_return,
+        "volatility": volatility,
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "max_drawdown": max_drawdown,
+        "tracking_error": tracking_error,
+        "beta": beta,
+    }
+
+
+def _first_valid(matrix: np.ndarray) -> np.ndarray:
+    """First non-NaN value of each column (NaN for empty columns)"""
+    if not matrix.shape[0]:
+        return np.full(matrix.shape[1], np.nan)
+    valid = ~np.isnan(matrix)
+    index = valid.argmax(axis=0)
+    values = matrix[index, np.arange(matrix.shape[1])]
+    return np.where(valid.any(axis=0), values, np.nan)
+
+
+class AnalyticsService:
+    """Batch risk analytics over fund performance history"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_risk_metrics(
+        self,
+        fund_ids: Optional[Sequence[int]] = None,
+        days: int = 365,
+        benchmark: Optional[str] = "SPY",
+        risk_free_rate: float = 0.0,
+    ) -> dict:
+        """
+        Get risk metrics for the given funds (all funds by default) over the
+        trailing ``days`` calendar days of performance history
+        """
+        requested = tuple(sorted(set(fund_ids))) if fund_ids is not None else None
+        # NAV loads bump "performance" and benchmark loads "daily_returns";
+        # fund creates, renames and deletes bump "funds" and the fund's key
+        keys = ["performance", "daily_returns"]
+        keys += ["funds"] if requested is None else [f"fund:{fund_id}" for fund_id in requested]
+        versions = await version_tracker.get(self.db, keys)
+
+        # The versions are part of the cache key, so a write anywhere
+        # produces a fresh result, and a hit costs one primary-key lookup
+        watermark: Watermark = tuple(sorted(versions.items()))
+        return await self._risk_metrics(
+            requested, watermark, days, benchmark.upper() if benchmark else None, risk_free_rate
+        )
+
+    @cached(
+        "analytics",
+        tags=lambda fund_ids, **_: (
+            ["funds"] if fund_ids is None else [f"fund:{fund_id}" for fund_id in fund_ids]
+        ) + ["performance", "daily_returns"],
+    )
+    async def _risk_metrics(
+        self,
+        fund_ids: Optional[Tuple[int, ...]],
+        watermark: Watermark,
+        days: int,
+        benchmark: Optional[str],
+        risk_free_rate: float,
+    ) -> dict:
+        funds_query = select(Fund.id, Fund.name).order_by(Fund.id)
+        end_query = select(func.max(FundPerformance.date))
+        if fund_ids is not None:
+            funds_query = funds_query.where(Fund.id.in_(fund_ids))
+            end_query = end_query.where(FundPerformance.fund_id.in_(fund_ids))
+        fund_names = dict((await self.db.execute(funds_query)).all())
+        fund_ids = list(fund_names)
+
+        end_date = (await self.db.execute(end_query)).scalar() if fund_ids else None
+        start_date = end_date - timedelta(days=days) if end_date else None
+
+        response = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "benchmark": benchmark,
+            "risk_free_rate": risk_free_rate,
+            "funds": [],
+        }
+        if not fund_ids:
+            return response
+
+        if end_date is None:
+            metrics = compute_risk_metrics(
+                np.full((0, len(fund_ids)), np.nan), np.full((0, len(fund_ids)), np.nan), None
+            )
+        else:
+            returns, nav, dates = await self._performance_matrix(fund_ids, start_date, end_date)
+            bench = await self._benchmark_returns(benchmark, dates) if benchmark else None
+            metrics = compute_risk_metrics(returns, nav, bench, risk_free_rate)
+
+        columns = {
+            name: _optional(values) for name, values in metrics.items() if name != "observations"
+        }
+        observations = metrics["observations"].tolist()
+        for i, fund_id in enumerate(fund_ids):
+            entry = {"fund_id": fund_id, "fund_name": fund_names.get(fund_id), "observations": observations[i]}
+            entry.update({name: values[i] for name, values in columns.items()})
+            response["funds"].append(entry)
+        return response
+
+    async def _performance_matrix(
+        self, fund_ids: List[int], start_date: date, end_date: date
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Load every fund's window in one query and pivot it into date x fund
+        matrices of daily returns (fractions) and NAV
+        """
+        query = (
+            select(
+                FundPerformance.fund_id,
+                FundPerformance.date,
+                FundPerformance.nav_price,
+                FundPerformance.daily_return,
+            )
+            .where(
+                FundPerformance.fund_id.in_(fund_ids),
+                FundPerformance.date >= start_date,
+                FundPerformance.date <= end_date,
+            )
+            .order_by(FundPerformance.date)
+        )
+        rows = (await self.db.execute(query)).all()
+
+        column_of = {fund_id: i for i, fund_id in enumerate(fund_ids)}
+        dates, row_index = np.unique(
+            np.array([row.date for row in rows], dtype="datetime64[D]"), return_inverse=True
+        )
+        col_index = np.array([column_of[row.fund_id] for row in rows], dtype=np.intp)
+
+        nav = np.full((len(dates), len(fund_ids)), np.nan)
+        reported = np.full((len(dates), len(fund_ids)), np.nan)
+        nav[row_index, col_index] = [float(row.nav_price) for row in rows]
+        reported[row_index, col_index] = [
+            np.nan if row.daily_return is None else float(row.daily_return) / 100.0 for row in rows
+        ]
+
+        # Fall back to the NAV change where no daily return was reported
+        with np.errstate(divide="ignore", invalid="ignore"):
+            previous = np.vstack([np.full((1, len(fund_ids)), np.nan), nav[:-1]])
+            derived = nav / previous - 1.0
+        returns = np.where(np.isnan(reported), derived, reported)
+        return returns, nav, dates
+
+    async def _benchmark_returns(self, ticker: str, dates: np.ndarray) -> np.ndarray:
+        """Benchmark daily returns aligned to ``dates`` (NaN where missing)"""
+        if not len(dates):
+            return np.full(0, np.nan)
+
+        query = (
+            select(DailyReturn.date, DailyReturn.change_percent)
+            .where(
+                DailyReturn.ticker == ticker,
+                DailyReturn.date >= dates[0].item(),
+                DailyReturn.date <= dates[-1].item(),
+            )
+        )
+        rows = (await self.db.execute(query)).all()
+
+        aligned = np.full(len(dates), np.nan)
+        if rows:
+            bench_dates = np.array([row.date for row in rows], dtype="datetime64[D]")
+            positions = np.searchsorted(dates, bench_dates)
+            found = (positions < len(dates)) & (dates[np.minimum(positions, len(dates) - 1)] == bench_dates)
+            values = np.array([float(row.change_percent) / 100.0 for row in rows])
+            aligned[positions[found]] = values[found]
+        return aligned
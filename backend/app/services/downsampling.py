@@ -0,0 +1,84 @@
+"""
+Downsampling of chart series to a bounded number of points
+"""
+from typing import Dict
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Select at most ``max_points`` indices of an ascending series with the
+    Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are always kept. Every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the average of the next bucket, which preserves peaks
+    and troughs that plain striding would drop.
+    """
+    n = len(x)
+    if max_points < 3 or n <= max_points:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Interior points [1, n - 1) split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    counts = np.diff(edges)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    avg_x = (cum_x[edges[1:]] - cum_x[edges[:-1]]) / counts
+    avg_y = (cum_y[edges[1:]] - cum_y[edges[:-1]]) / counts
+    # The "next bucket" of the last interior bucket is the final point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(max_points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - next_x[bucket]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[bucket] - ay))
+        anchor = lo + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def ohlc_buckets(
+    open_price: np.ndarray,
+    high_price: np.ndarray,
+    low_price: np.ndarray,
+    close_price: np.ndarray,
+    volume: np.ndarray,
+    max_points: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate ascending OHLC bars into at most ``max_points`` buckets of
+    consecutive bars: first open, highest high, lowest low, last close and
+    total volume.
+
+    ``start`` and ``end`` hold the index of the first and last bar of each
+    bucket so callers can map them back to dates.
+    """
+    n = len(close_price)
+    if n <= max_points:
+        start = np.arange(n)
+    else:
+        start = np.linspace(0, n, max_points + 1).astype(np.intp)[:-1]
+    end = np.append(start[1:], n) - 1
+
+    if not n:
+        empty = np.empty(0)
+        return {"start": start, "end": end, "open": empty, "high": empty, "low": empty, "close": empty, "volume": empty}
+
+    return {
+        "start": start,
+        "end": end,
+        "open": np.asarray(open_price)[start],
+        "high": np.maximum.reduceat(np.asarray(high_price), start),
+        "low": np.minimum.reduceat(np.asarray(low_price), start),
+        "close": np.asarray(close_price)[end],
+        "volume": np.add.reduceat(np.asarray(volume), start),
+    }
@@ -0,0 +1,107 @@
+"""
+Streaming export of stock price history
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.models.stock_price import StockPrice
+
+EXPORT_COLUMNS = (
+    "ticker", "date", "open_price", "high_price", "low_price",
+    "close_price", "volume", "adjusted_close",
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _encode_ndjson(rows: Sequence) -> bytes:
+    # Numeric values are written as JSON numbers from their exact decimal text
+    lines = [
+        '{"ticker":%s,"date":"%s","open_price":%s,"high_price":%s,"low_price":%s,'
+        '"close_price":%s,"volume":%d,"adjusted_close":%s}\n' % (
+            json.dumps(row.ticker), row.date.isoformat(), row.open_price, row.high_price,
+            row.low_price, row.close_price, row.volume,
+            "null" if row.adjusted_close is None else row.adjusted_close,
+        )
+        for row in rows
+    ]
+    return "".join(lines).encode()
+
+
+def _encode_csv(rows: Sequence) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        (row.ticker, row.date.isoformat(), row.open_price, row.high_price, row.low_price,
+         row.close_price, row.volume, "" if row.adjusted_close is None else row.adjusted_close)
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+def export_query(
+    tickers: Optional[List[str]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """Select the exported columns in (ticker, date) order, which the unique index serves"""
+    query = select(*(getattr(StockPrice, column) for column in EXPORT_COLUMNS))
+    if tickers:
+        query = query.where(StockPrice.ticker.in_([t.upper() for t in tickers]))
+    if start_date:
+        query = query.where(StockPrice.date >= start_date)
+    if end_date:
+        query = query.where(StockPrice.date <= end_date)
+    return query.order_by(StockPrice.ticker, StockPrice.date)
+
+
+async def stream_price_export(
+    bind: AsyncEngine,
+    tickers: Optional[List[str]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    fmt: str = "ndjson",
+    compress: bool = False,
+    chunk_rows: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield an export of stock prices as NDJSON or CSV chunks.
+
+    Rows are read through a server-side cursor on a dedicated connection
+    (the request's session is closed before a streamed body is sent), a
+    fixed number of rows at a time, so memory stays flat however large the
+    result. With ``compress`` the chunks form one gzip stream, flushed after
+    every chunk so clients receive data as it is produced.
+    """
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if fmt == "csv":
+        # The header goes out before the query runs
+        yield emit((",".join(EXPORT_COLUMNS) + "\n").encode())
+
+    query = export_query(tickers, start_date, end_date).execution_options(yield_per=chunk_rows)
+    async with bind.connect() as conn:
+        result = await conn.stream(query)
+        async for rows in result.partitions(chunk_rows):
+            yield emit(encode(rows))
+
+    if compressor is not None:
+        yield compressor.flush()
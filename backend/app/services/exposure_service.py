@@ -0,0 +1,364 @@
+"""
+Firm-wide look-through exposure from a sparse fund x ticker matrix of
+market values
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.versioning import version_tracker
+from app.models.fund import Fund
+from app.models.holding import Holding
+from app.models.stock_price import StockPrice
+from app.services.loaders import latest_rows_query
+
+# The matrix is rebuilt whenever any of these data versions moves
+MATRIX_VERSIONS = ("funds", "holdings", "stock_prices")
+
+UNCLASSIFIED = "Unclassified"
+
+
+def _pct(part: np.ndarray, whole: float) -> np.ndarray:
+    return part / whole * 100.0 if whole > 0 else np.zeros_like(part)
+
+
+def _column_max(matrix: sparse.csc_matrix, row_scale: np.ndarray) -> np.ndarray:
+    """Per-column maximum of the stored values scaled by ``row_scale[row]``"""
+    scaled = matrix.data * row_scale[matrix.indices]
+    result = np.zeros(matrix.shape[1])
+    filled = np.flatnonzero(np.diff(matrix.indptr))
+    if len(filled):
+        result[filled] = np.maximum.reduceat(scaled, matrix.indptr[filled])
+    return result
+
+
+@dataclass
+class PositionMatrix:
+    """
+    Market value of every fund's position in every ticker, marked at the
+    latest close (cost where a ticker has no price). Rows are funds, columns
+    tickers; lots of the same ticker within a fund are summed
+    """
+    values: sparse.csr_matrix
+    fund_ids: np.ndarray
+    fund_names: List[str]
+    tickers: List[str]
+    sector_codes: np.ndarray
+    sectors: List[str]
+    priced_at: Optional[date]
+    versions: Dict[str, int]
+    build_ms: float
+
+    def __post_init__(self):
+        self.fund_index = {fund_id: i for i, fund_id in enumerate(self.fund_ids.tolist())}
+        self.ticker_index = {ticker: j for j, ticker in enumerate(self.tickers)}
+        # Column access (one ticker, or the tickers one fund holds) reads CSC
+        self.values_csc = self.values.tocsc()
+        self.fund_totals = np.asarray(self.values.sum(axis=1)).ravel()
+        self.ticker_totals = np.asarray(self.values.sum(axis=0)).ravel()
+        self.firm_total = float(self.fund_totals.sum())
+        with np.errstate(divide="ignore"):
+            self.inverse_totals = np.where(self.fund_totals > 0, 1.0 / self.fund_totals, 0.0)
+        self.value_norms = np.sqrt(np.asarray(self.values.multiply(self.values).sum(axis=1)).ravel())
+        self.ticker_holders = np.diff(self.values_csc.indptr)
+        self.ticker_peak = _column_max(self.values_csc, self.inverse_totals * 100.0)
+        # Fund x sector values are small enough to keep dense
+        self.sector_map = sparse.csr_matrix(
+            (np.ones(len(self.tickers)), (np.arange(len(self.tickers)), self.sector_codes)),
+            shape=(len(self.tickers), len(self.sectors)),
+        )
+        self.by_sector = np.asarray((self.values @ self.sector_map).todense())
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    def rows(self, fund_ids: Optional[Sequence[int]]) -> Optional[np.ndarray]:
+        """Matrix rows of ``fund_ids``, unknown ids skipped; None selects every fund"""
+        if fund_ids is None:
+            return None
+        return np.array([self.fund_index[f] for f in fund_ids if f in self.fund_index], dtype=np.int64)
+
+    def stats(self) -> dict:
+        return {
+            "funds": self.shape[0],
+            "tickers": self.shape[1],
+            "sectors": len(self.sectors),
+            "positions": int(self.values.nnz),
+            "priced_at": self.priced_at,
+            "build_ms": self.build_ms,
+        }
+
+
+class PositionMatrixCache:
+    """
+    Holds the current matrix per process. Every lookup compares the data
+    versions it was built at with the database's (one primary-key query),
+    so a write from any worker or ingestion job triggers a rebuild
+    """
+
+    def __init__(self):
+        self.matrix: Optional[PositionMatrix] = None
+        self.builds = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def get(self, db: AsyncSession) -> PositionMatrix:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        versions = await version_tracker.get(db, MATRIX_VERSIONS)
+        if self.matrix is not None and self.matrix.versions == versions:
+            return self.matrix
+        async with self._lock:
+            # Another request may have rebuilt it while this one waited
+            if self.matrix is None or self.matrix.versions != versions:
+                self.matrix = await build_position_matrix(db, versions)
+                self.builds += 1
+        return self.matrix
+
+    def clear(self) -> None:
+        self.matrix = None
+
+    def stats(self) -> dict:
+        return {"builds": self.builds, "matrix": self.matrix.stats() if self.matrix else None}
+
+
+position_matrix = PositionMatrixCache()
+
+
+async def build_position_matrix(db: AsyncSession, versions: Dict[str, int]) -> PositionMatrix:
+    """Load every holding with its latest close and assemble the sparse matrix"""
+    started = time.perf_counter()
+    latest_prices = latest_rows_query(
+        db, StockPrice, StockPrice.ticker, StockPrice.date, select(Holding.ticker).distinct()
+    ).cte("latest_prices")
+    query = (
+        select(
+            Holding.fund_id,
+            Holding.ticker,
+            Holding.sector,
+            Holding.shares * func.coalesce(latest_prices.c.close_price, Holding.purchase_price),
+            latest_prices.c.date,
+        )
+        .outerjoin(latest_prices, latest_prices.c.ticker == Holding.ticker)
+    )
+    rows = (await db.execute(query)).all()
+    funds = (await db.execute(select(Fund.id, Fund.name).order_by(Fund.id))).all()
+
+    fund_ids = np.array([fund_id for fund_id, _ in funds], dtype=np.int64)
+    fund_names = [name for _, name in funds]
+    if rows:
+        row_fund, row_ticker, row_sector, row_value, row_date = zip(*rows)
+    else:
+        row_fund, row_ticker, row_sector, row_value, row_date = (), (), (), (), ()
+
+    tickers, columns = np.unique(np.array(row_ticker, dtype=object).astype(str), return_inverse=True)
+    rows_index = np.searchsorted(fund_ids, np.array(row_fund, dtype=np.int64))
+    values = sparse.csr_matrix(
+        (np.array(row_value, dtype=float), (rows_index, columns)),
+        shape=(len(fund_ids), len(tickers)),
+    )
+    values.sum_duplicates()
+
+    # One sector per ticker: the first lot that names one
+    sector_labels = np.array([s or UNCLASSIFIED for s in row_sector], dtype=object).astype(str)
+    named = sector_labels != UNCLASSIFIED
+    order = np.lexsort((~named, columns))
+    first = order[np.unique(columns[order], return_index=True)[1]]
+    sectors, sector_codes = np.unique(sector_labels[first], return_inverse=True)
+
+    dates = [d for d in row_date if d is not None]
+    return PositionMatrix(
+        values=values,
+        fund_ids=fund_ids,
+        fund_names=fund_names,
+        tickers=tickers.tolist(),
+        sector_codes=sector_codes,
+        sectors=sectors.tolist(),
+        priced_at=max(dates) if dates else None,
+        versions=versions,
+        build_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+class ExposureService:
+    """Aggregate exposure, concentration and overlap as matrix operations"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_matrix(self) -> PositionMatrix:
+        return await position_matrix.get(self.db)
+
+    def _fund_rows(self, matrix: PositionMatrix, values: np.ndarray) -> List[dict]:
+        """Per-fund breakdown of ``values`` (one entry per fund), largest first"""
+        held = np.flatnonzero(values > 0)
+        order = held[np.argsort(-values[held], kind="stable")]
+        total = float(values[order].sum())
+        return [{
+            "fund_id": int(matrix.fund_ids[i]),
+            "fund_name": matrix.fund_names[i],
+            "market_value": round(float(values[i]), 2),
+            "weight_in_fund": round(float(_pct(values[i], matrix.fund_totals[i])), 4),
+            "share_of_exposure": round(float(_pct(values[i], total)), 4),
+        } for i in order]
+
+    async def get_ticker_exposure(self, ticker: str) -> Optional[dict]:
+        """Firm-wide exposure to one ticker and its split across funds"""
+        matrix = await self.get_matrix()
+        column = matrix.ticker_index.get(ticker.upper())
+        if column is None:
+            return None
+        values = matrix.values_csc[:, column].toarray().ravel()
+        funds = self._fund_rows(matrix, values)
+        return {
+            "ticker": ticker.upper(),
+            "sector": matrix.sectors[matrix.sector_codes[column]],
+            "market_value": round(float(matrix.ticker_totals[column]), 2),
+            "firm_weight": round(float(_pct(matrix.ticker_totals[column], matrix.firm_total)), 4),
+            "funds_count": len(funds),
+            "priced_at": matrix.priced_at,
+            "funds": funds,
+        }
+
+    async def get_sector_exposures(self, fund_ids: Optional[Sequence[int]] = None) -> dict:
+        """Exposure per sector for the firm, or for ``fund_ids`` only"""
+        matrix = await self.get_matrix()
+        rows = matrix.rows(fund_ids)
+        if rows is None:
+            block, ticker_values = matrix.by_sector, matrix.ticker_totals
+        else:
+            block = matrix.by_sector[rows]
+            ticker_values = np.asarray(matrix.values[rows].sum(axis=0)).ravel()
+        totals = block.sum(axis=0)
+        holders = np.count_nonzero(block, axis=0)
+        tickers_per_sector = np.bincount(
+            matrix.sector_codes[ticker_values > 0], minlength=len(matrix.sectors),
+        )
+        whole = float(totals.sum())
+        order = np.argsort(-totals, kind="stable")
+        return {
+            "market_value": round(whole, 2),
+            "funds_count": len(block),
+            "priced_at": matrix.priced_at,
+            "sectors": [{
+                "sector": matrix.sectors[k],
+                "market_value": round(float(totals[k]), 2),
+                "weight": round(float(_pct(totals[k], whole)), 4),
+                "funds_count": int(holders[k]),
+                "tickers_count": int(tickers_per_sector[k]),
+            } for k in order if totals[k] > 0],
+        }
+
+    async def get_sector_exposure(self, sector: str, limit: int = 10) -> Optional[dict]:
+        """Firm-wide exposure to one sector, its largest tickers and its split across funds"""
+        matrix = await self.get_matrix()
+        lookup = {name.lower(): k for k, name in enumerate(matrix.sectors)}
+        code = lookup.get(sector.lower())
+        if code is None:
+            return None
+        values = matrix.by_sector[:, code]
+        columns = np.flatnonzero(matrix.sector_codes == code)
+        top = columns[np.argsort(-matrix.ticker_totals[columns], kind="stable")][:limit]
+        total = float(values.sum())
+        return {
+            "sector": matrix.sectors[code],
+            "market_value": round(total, 2),
+            "firm_weight": round(float(_pct(total, matrix.firm_total)), 4),
+            "funds_count": int(np.count_nonzero(values)),
+            "priced_at": matrix.priced_at,
+            "top_tickers": [{
+                "ticker": matrix.tickers[j],
+                "market_value": round(float(matrix.ticker_totals[j]), 2),
+                "weight": round(float(_pct(matrix.ticker_totals[j], total)), 4),
+            } for j in top],
+            "funds": self._fund_rows(matrix, values),
+        }
+
+    async def get_concentrations(
+        self, by: str = "ticker", limit: int = 20, fund_ids: Optional[Sequence[int]] = None,
+    ) -> dict:
+        """
+        Largest tickers or sectors by market value across ``fund_ids`` (all
+        funds when omitted), with the largest weight any one fund gives them
+        """
+        matrix = await self.get_matrix()
+        rows = matrix.rows(fund_ids)
+        scale = matrix.inverse_totals * 100.0
+        if by == "sector":
+            block = matrix.by_sector if rows is None else matrix.by_sector[rows]
+            row_scale = scale if rows is None else scale[rows]
+            totals = block.sum(axis=0)
+            holders = np.count_nonzero(block, axis=0)
+            peak = (block * row_scale[:, None]).max(axis=0, initial=0.0)
+            names = matrix.sectors
+        elif rows is None:
+            totals, holders, peak = matrix.ticker_totals, matrix.ticker_holders, matrix.ticker_peak
+            names = matrix.tickers
+        else:
+            block = matrix.values[rows].tocsc()
+            totals = np.asarray(block.sum(axis=0)).ravel()
+            holders = np.diff(block.indptr)
+            peak = _column_max(block, scale[rows])
+            names = matrix.tickers
+
+        whole = float(totals.sum())
+        count = min(limit, int(np.count_nonzero(totals)))
+        top = np.argpartition(-totals, count - 1)[:count] if count else np.array([], dtype=np.int64)
+        top = top[np.argsort(-totals[top], kind="stable")]
+        return {
+            "by": by,
+            "market_value": round(whole, 2),
+            "funds_count": matrix.shape[0] if rows is None else len(rows),
+            "priced_at": matrix.priced_at,
+            "concentrations": [{
+                "key": names[j],
+                "market_value": round(float(totals[j]), 2),
+                "weight": round(float(_pct(totals[j], whole)), 4),
+                "funds_count": int(holders[j]),
+                "max_fund_weight": round(float(peak[j]), 4),
+            } for j in top],
+        }
+
+    async def get_fund_overlap(self, fund_id: int, limit: int = 10) -> Optional[dict]:
+        """
+        Funds sharing the most exposure with ``fund_id``. Overlap is the sum
+        over common tickers of the smaller of the two portfolio weights, so
+        100% means identical books. Only the columns the fund holds are read
+        """
+        matrix = await self.get_matrix()
+        row = matrix.fund_index.get(fund_id)
+        if row is None:
+            return None
+        own = matrix.values[row]
+        columns = own.indices
+        own_weights = own.data * matrix.inverse_totals[row]
+
+        shared = matrix.values_csc[:, columns].tocoo()
+        weights = shared.data * matrix.inverse_totals[shared.row]
+        overlap = np.bincount(
+            shared.row, weights=np.minimum(weights, own_weights[shared.col]), minlength=matrix.shape[0],
+        )
+        common = np.bincount(shared.row, minlength=matrix.shape[0])
+        overlap[row] = common[row] = 0
+
+        candidates = np.flatnonzero(common)
+        top = candidates[np.argsort(-overlap[candidates], kind="stable")][:limit]
+        return {
+            "fund_id": fund_id,
+            "fund_name": matrix.fund_names[row],
+            "holdings_count": int(len(columns)),
+            "priced_at": matrix.priced_at,
+            "overlaps": [{
+                "fund_id": int(matrix.fund_ids[i]),
+                "fund_name": matrix.fund_names[i],
+                "weighted_overlap": round(float(overlap[i]) * 100.0, 4),
+                "common_holdings": int(common[i]),
+            } for i in top],
+        }
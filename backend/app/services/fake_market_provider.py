@@ -0,0 +1,101 @@
+"""
+Offline stand-in for the market data provider.
+
+Serves deterministic ``TIME_SERIES_DAILY`` responses in the provider's
+format so ingestion can be exercised without network access, in-process
+through ``httpx.ASGITransport`` or as a server:
+
+    uvicorn app.services.fake_market_provider:app --port 9001
+    STOCK_API_URL=http://localhost:9001/query
+
+Symbols starting with ``ZZ`` are unknown and those starting with ``BAD``
+get a series with an unparseable date, while a per-minute request limit
+and a random failure rate can be set to exercise throttling and retries.
+"""
+import random
+import time
+import zlib
+from collections import deque
+from datetime import date, timedelta
+from typing import Deque, Optional
+
+import numpy as np
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+UNKNOWN_PREFIX = "ZZ"
+MALFORMED_PREFIX = "BAD"
+HISTORY_DAYS = 365 * 5
+
+
+def daily_series(symbol: str, end: date, days: int = HISTORY_DAYS) -> dict:
+    """Deterministic daily bars for ``symbol`` ending at ``end``, newest first"""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    calendar = [end - timedelta(days=n) for n in range(days)]
+    trading = sorted(day for day in calendar if day.weekday() < 5)
+    closes = rng.uniform(20, 400) * np.exp(np.cumsum(rng.normal(0.0003, 0.018, len(trading))))
+    series = {}
+    for day, close, gap, wick, volume in zip(
+        trading, closes, rng.normal(0, 0.006, len(trading)), np.abs(rng.normal(0, 0.008, len(trading))),
+        rng.lognormal(14, 0.8, len(trading)).astype(int),
+    ):
+        open_ = close * (1 + gap)
+        series[day.isoformat()] = {
+            "1. open": f"{open_:.4f}",
+            "2. high": f"{max(open_, close) * (1 + wick):.4f}",
+            "3. low": f"{min(open_, close) * (1 - wick):.4f}",
+            "4. close": f"{close:.4f}",
+            "5. volume": str(volume),
+        }
+    return dict(sorted(series.items(), reverse=True))
+
+
+def create_app(rate_limit: Optional[int] = None, failure_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    """
+    Fake provider app. ``rate_limit`` requests per minute are answered
+    before throttle notes are returned; ``failure_rate`` of requests fail
+    with 503
+    """
+    app = FastAPI(title="Fake market data provider")
+    failures = random.Random(seed)
+    recent: Deque[float] = deque()
+
+    @app.get("/query")
+    async def query(
+        function: str = Query(...),
+        symbol: str = Query(...),
+        outputsize: str = Query("compact"),
+        apikey: str = Query(""),
+    ):
+        now = time.monotonic()
+        while recent and now - recent[0] > 60:
+            recent.popleft()
+        if rate_limit is not None and len(recent) >= rate_limit:
+            return {"Note": f"Thank you for using the fake provider. Our standard API rate limit is {rate_limit} requests per minute."}
+        recent.append(now)
+
+        if failure_rate and failures.random() < failure_rate:
+            return JSONResponse({"detail": "Service unavailable"}, status_code=503, headers={"Retry-After": "0"})
+        if function != "TIME_SERIES_DAILY":
+            return {"Error Message": f"Invalid API call: unsupported function {function}"}
+        if symbol.upper().startswith(UNKNOWN_PREFIX):
+            return {"Error Message": f"Invalid API call. Unknown symbol {symbol}"}
+
+        series = daily_series(symbol.upper(), date.today())
+        if outputsize == "compact":
+            series = dict(list(series.items())[:100])
+        if symbol.upper().startswith(MALFORMED_PREFIX):
+            series["bad-date"] = next(iter(series.values()))
+        return {
+            "Meta Data": {
+                "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+                "2. Symbol": symbol.upper(),
+                "4. Output Size": "Compact" if outputsize == "compact" else "Full size",
+            },
+            "Time Series (Daily)": series,
+        }
+
+    return app
+
+
+app = create_app()
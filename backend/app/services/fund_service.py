@@ -2,48 +2,76 @@
 Fund service layer for database operations
 """
 from datetime import date, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, desc, and_, delete
 
+from app.core.cache import cached, invalidate
+from app.core.pagination import Keyset, SortKey
+from app.core.read_models import fund_summary, read_models
+from app.core.versioning import bump
 from app.models.fund import Fund
 from app.models.holding import Holding
 from app.models.fund_performance import FundPerformance
-from app.models.peer_fund import PeerFund
+from app.models.return_ladder import FundReturnLadder
+from app.services.downsampling import lttb_indices
+from app.services.load_profiles import AGGREGATES, HEADER, LIST, RETURNS, select_funds
+from app.services.loaders import get_loaders
+from app.services.return_ladder_service import ReturnLadderService, ladder_returns
+from app.services.search_service import SearchService
+from app.services.valuation_service import ValuationService
 from app.schemas.fund import (
     FundCreate, 
     FundUpdate, 
     FundSummary, 
-    FundPerformanceData, 
-    PeerComparisonData
+    FundPerformanceData
 )
 
 
+# Fund names are unique, so the name alone orders listings totally
+FUND_KEYSET = Keyset(SortKey("name", Fund.name))
+FUND_SUMMARY_KEYSET = Keyset(SortKey("name", fund_summary.c.name))
+
+# List views leave out the description, the one unbounded text column
+FUND_SUMMARY_LIST_COLUMNS = [column for column in fund_summary.c if column.name != "description"]
+
+
 class FundService:
     """Service class for fund-related database operations"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.loaders = get_loaders(db)
 
-    async def get_funds(self, skip: int = 0, limit: int = 100) -> List[dict]:
-        """Get all funds with summary information and latest performance"""
-        query = (
-            select(Fund)
-            .options(selectinload(Fund.holdings))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Fund.name)
-        )
+    @cached("funds", tags=lambda **_: ["funds", "performance", "read_models"])
+    async def get_funds(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        """Get all funds with summary information, latest performance and trailing returns"""
+        if read_models.serves():
+            query = FUND_SUMMARY_KEYSET.apply(
+                select(*FUND_SUMMARY_LIST_COLUMNS, FundReturnLadder).outerjoin(
+                    FundReturnLadder, FundReturnLadder.fund_id == fund_summary.c.id
+                ),
+                cursor,
+            ).offset(skip).limit(limit)
+            result = await self.db.execute(query)
+            return [self._summary_data(row) for row in result.mappings()]
+        
+        query = FUND_KEYSET.apply(select_funds(LIST, AGGREGATES, RETURNS), cursor).offset(skip).limit(limit)
         
         result = await self.db.execute(query)
         funds = result.scalars().all()
         
+        return await self._list_data(funds)
+
+    async def _list_data(self, funds: List[Fund]) -> List[dict]:
+        """List view dicts for funds loaded with the LIST, AGGREGATES and RETURNS profiles"""
+        # Resolve latest performance for every fund in one batched query
+        latest_perfs = await self.loaders.latest_performance.load_many(fund.id for fund in funds)
+        
         # Build enriched fund data
         enriched_funds = []
-        for fund in funds:
-            latest_perf = await self._get_latest_performance(fund.id)
-            
+        for fund, latest_perf in zip(funds, latest_perfs):
             fund_data = {
                 "id": fund.id,
                 "name": fund.name,
@@ -52,10 +80,11 @@ class FundService:
                 "total_aum": str(fund.total_aum),
                 "manager_name": fund.manager_name,
                 "expense_ratio": str(fund.expense_ratio) if fund.expense_ratio else None,
-                "description": fund.description,
+                "description": None,
                 "created_at": fund.created_at,
                 "updated_at": fund.updated_at,
-                "holdings_count": len(fund.holdings) if fund.holdings else 0,
+                "holdings_count": fund.holdings_count,
+                **self._returns_data(fund.return_ladder),
             }
             
             if latest_perf:
@@ -77,23 +106,58 @@ class FundService:
 
     async def _get_latest_performance(self, fund_id: int) -> Optional[FundPerformance]:
         """Get the latest performance record for a fund"""
-        query = (
-            select(FundPerformance)
-            .where(FundPerformance.fund_id == fund_id)
-            .order_by(desc(FundPerformance.date))
-            .limit(1)
-        )
-        
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        return await self.loaders.latest_performance.load(fund_id)
 
+    @staticmethod
+    def _returns_data(ladder: Optional[FundReturnLadder]) -> dict:
+        """Trailing-return fields from the fund's ladder, empty before its first NAV"""
+        return {
+            "returns_as_of": ladder.as_of if ladder else None,
+            "trailing_returns": ladder_returns(ladder),
+        }
+
+    @staticmethod
+    def _summary_data(row, valuation: bool = False) -> dict:
+        """Build the enriched fund dict from a fund_summary row"""
+        fund_data = {
+            "id": row["id"],
+            "name": row["name"],
+            "strategy": row["strategy"],
+            "inception_date": row["inception_date"],
+            "total_aum": str(row["total_aum"]),
+            "manager_name": row["manager_name"],
+            "expense_ratio": str(row["expense_ratio"]) if row["expense_ratio"] else None,
+            "description": row.get("description"),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "holdings_count": row["holdings_count"],
+            "total_return_percent": float(row["latest_total_return"]) if row["latest_total_return"] else 0.0,
+            "daily_return_percent": float(row["latest_daily_return"]) if row["latest_daily_return"] else 0.0,
+            "current_value": str(row["latest_aum"]) if row["latest_aum"] else str(row["total_aum"]),
+            **FundService._returns_data(row["FundReturnLadder"]),
+        }
+        if valuation:
+            total_cost = float(row["total_cost_basis"])
+            gain_loss = float(row["total_market_value"]) - total_cost
+            fund_data.update({
+                "unrealized_gain_loss": f"{gain_loss:.2f}",
+                "unrealized_gain_loss_percent": (gain_loss / total_cost * 100) if total_cost > 0 else 0.0,
+            })
+        return fund_data
+
+    @cached("funds", tags=lambda fund_id: [f"fund:{fund_id}", "stock_prices", "performance", "read_models"])
     async def get_fund_by_id(self, fund_id: int) -> Optional[dict]:
         """Get fund by ID with all related data and performance"""
-        query = (
-            select(Fund)
-            .options(selectinload(Fund.holdings))
-            .where(Fund.id == fund_id)
-        )
+        if read_models.serves(fund_id):
+            result = await self.db.execute(
+                select(fund_summary, FundReturnLadder)
+                .outerjoin(FundReturnLadder, FundReturnLadder.fund_id == fund_summary.c.id)
+                .where(fund_summary.c.id == fund_id)
+            )
+            row = result.mappings().first()
+            return self._summary_data(row, valuation=True) if row else None
+        
+        query = select_funds(RETURNS).where(Fund.id == fund_id)
         
         result = await self.db.execute(query)
         fund = result.scalar_one_or_none()
@@ -104,15 +168,8 @@ class FundService:
         # Get latest performance data
         latest_perf = await self._get_latest_performance(fund.id)
         
-        # Calculate unrealized gain/loss from holdings
-        total_cost_basis = sum(
-            float(holding.shares) * float(holding.purchase_price) 
-            for holding in fund.holdings
-        ) if fund.holdings else 0.0
-        
-        current_market_value = float(latest_perf.assets_under_management) if latest_perf and latest_perf.assets_under_management else float(fund.total_aum)
-        unrealized_gain_loss = current_market_value - total_cost_basis
-        unrealized_gain_loss_percent = (unrealized_gain_loss / total_cost_basis * 100) if total_cost_basis > 0 else 0.0
+        # Mark all holdings to market in one query
+        valuation = await ValuationService(self.db).value_fund(fund.id)
         
         # Build enriched fund data
         fund_data = {
@@ -126,9 +183,10 @@ class FundService:
             "description": fund.description,
             "created_at": fund.created_at,
             "updated_at": fund.updated_at,
-            "holdings_count": len(fund.holdings) if fund.holdings else 0,
-            "unrealized_gain_loss": str(unrealized_gain_loss),
-            "unrealized_gain_loss_percent": unrealized_gain_loss_percent,
+            "holdings_count": valuation["holdings_count"],
+            "unrealized_gain_loss": f"{valuation['unrealized_gain_loss']:.2f}",
+            "unrealized_gain_loss_percent": valuation["unrealized_gain_loss_percent"],
+            **self._returns_data(fund.return_ladder),
         }
         
         if latest_perf:
@@ -146,9 +204,21 @@ class FundService:
         
         return fund_data
 
+    @cached("funds", tags=lambda fund_id: [f"fund:{fund_id}", "funds"])
+    async def get_fund_header(self, fund_id: int) -> Optional[dict]:
+        """
+        Fund identity columns (name, strategy, manager, AUM, ...) without
+        holdings, valuation or performance; None if the fund does not exist
+        """
+        return await self.loaders.fund_header.load(fund_id)
+
+    async def fund_exists(self, fund_id: int) -> bool:
+        """Whether the fund exists, for endpoint guards"""
+        return await self.get_fund_header(fund_id) is not None
+
     async def get_fund_by_name(self, name: str) -> Optional[Fund]:
-        """Get fund by name"""
-        query = select(Fund).where(Fund.name == name)
+        """Get fund by name (identity columns only)"""
+        query = select_funds(HEADER).where(Fund.name == name)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
@@ -165,14 +235,19 @@ class FundService:
         )
         
         self.db.add(db_fund)
+        await self.db.flush()
+        await bump(self.db, "funds", f"fund:{db_fund.id}")
         await self.db.commit()
         await self.db.refresh(db_fund)
+        read_models.written(db_fund.id)
+        self.loaders.clear()
+        invalidate("funds")
         
         return db_fund
 
     async def update_fund(self, fund_id: int, fund_data: FundUpdate) -> Optional[Fund]:
         """Update an existing fund"""
-        query = select(Fund).where(Fund.id == fund_id)
+        query = select_funds(AGGREGATES).where(Fund.id == fund_id)
         result = await self.db.execute(query)
         db_fund = result.scalar_one_or_none()
         
@@ -184,27 +259,90 @@ class FundService:
         for field, value in update_data.items():
             setattr(db_fund, field, value)
         
+        await bump(self.db, "funds", f"fund:{fund_id}")
         await self.db.commit()
-        await self.db.refresh(db_fund)
+        # Re-read rather than refresh(), which would drop the aggregates
+        await self.db.execute(query.execution_options(populate_existing=True))
+        read_models.written(fund_id)
+        self.loaders.clear()
+        invalidate("funds", f"fund:{fund_id}")
         
         return db_fund
 
     async def delete_fund(self, fund_id: int) -> bool:
-        """Delete a fund"""
-        query = select(Fund).where(Fund.id == fund_id)
-        result = await self.db.execute(query)
-        db_fund = result.scalar_one_or_none()
-        
-        if not db_fund:
+        """Delete a fund with its holdings and performance history"""
+        exists = await self.db.scalar(select(Fund.id).where(Fund.id == fund_id))
+        if exists is None:
             return False
         
-        await self.db.delete(db_fund)
+        # Bulk deletes instead of loading every child row for the ORM cascade;
+        # children first, as SQLite does not enforce ON DELETE CASCADE
+        await self.db.execute(delete(FundPerformance).where(FundPerformance.fund_id == fund_id))
+        await self.db.execute(delete(FundReturnLadder).where(FundReturnLadder.fund_id == fund_id))
+        await self.db.execute(delete(Holding).where(Holding.fund_id == fund_id))
+        await self.db.execute(delete(Fund).where(Fund.id == fund_id))
+        await bump(self.db, "funds", f"fund:{fund_id}", "holdings")
         await self.db.commit()
+        read_models.written(fund_id)
+        self.loaders.clear()
+        invalidate("funds", f"fund:{fund_id}", "holdings")
         
         return True
 
-    async def get_fund_performance(self, fund_id: int, days: int = 30) -> List[FundPerformanceData]:
-        """Get fund performance data for specified number of days (or all available data if none in range)"""
+    async def record_performance(self, fund_id: int, points: Sequence[FundPerformanceData]) -> dict:
+        """
+        Insert or replace NAV rows of a fund keyed on date, refresh its
+        return ladder and advance its data versions in the same transaction
+        """
+        # Later points for the same date win, as they would row by row
+        rows = {
+            point.date: {"fund_id": fund_id, **point.model_dump()}
+            for point in points
+        }
+        if rows:
+            if self.db.get_bind().dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            statement = insert(FundPerformance)
+            statement = statement.on_conflict_do_update(
+                index_elements=[FundPerformance.fund_id, FundPerformance.date],
+                set_={
+                    name: statement.excluded[name]
+                    for name in ("nav_price", "total_return", "daily_return", "assets_under_management")
+                },
+            )
+            await self.db.execute(statement, list(rows.values()))
+            await ReturnLadderService(self.db).refresh_fund_ladders([fund_id])
+            await bump(self.db, "performance", f"fund:{fund_id}")
+        await self.db.commit()
+        if rows:
+            read_models.written(fund_id)
+            self.loaders.clear()
+            invalidate("performance", f"fund:{fund_id}")
+        
+        as_of = await self.db.scalar(select(FundReturnLadder.as_of).where(FundReturnLadder.fund_id == fund_id))
+        return {"fund_id": fund_id, "written": len(rows), "returns_as_of": as_of}
+
+    async def get_performance_watermark(self, fund_id: int) -> Tuple[Optional[date], int]:
+        """
+        Latest NAV date and NAV count of a fund. Unlike the data versions
+        these also move when NAVs are loaded outside the services
+        """
+        result = await self.db.execute(
+            select(func.max(FundPerformance.date), func.count()).where(FundPerformance.fund_id == fund_id)
+        )
+        latest, count = result.one()
+        return latest, count
+
+    @cached("performance", tags=lambda fund_id, **_: [f"fund:{fund_id}", "performance"])
+    async def get_fund_performance(
+        self, fund_id: int, days: int = 30, max_points: Optional[int] = None
+    ) -> List[FundPerformanceData]:
+        """
+        Get fund performance data for specified number of days (or all available data if none in range).
+        With ``max_points`` the NAV series is reduced to that many rows with LTTB.
+        """
         start_date = date.today() - timedelta(days=days)
         
         query = (
@@ -229,9 +367,17 @@ class FundService:
                 .order_by(desc(FundPerformance.date))
                 .limit(90)  # Limit to last 90 records
             )
-        
-        result = await self.db.execute(query)
-        performances = result.scalars().all()
+            result = await self.db.execute(query)
+            performances = result.scalars().all()
+        
+        if max_points and len(performances) > max_points:
+            ascending = performances[::-1]
+            keep = lttb_indices(
+                np.array([perf.date.toordinal() for perf in ascending], dtype=float),
+                np.array([float(perf.nav_price) for perf in ascending]),
+                max_points,
+            )
+            performances = [ascending[i] for i in keep[::-1]]
         
         return [
             FundPerformanceData(
@@ -244,38 +390,10 @@ class FundService:
             for perf in performances
         ]
 
-    async def get_peer_comparison(self, fund_id: int) -> List[PeerComparisonData]:
-        """Get peer comparison data for a fund"""
-        # First get the fund to determine its strategy
-        fund = await self.get_fund_by_id(fund_id)
-        if not fund:
-            return []
-        
-        # Get peer funds (for now, we'll get all peer funds)
-        # In a real implementation, we'd match by strategy/category
-        query = select(PeerFund).limit(10)
-        result = await self.db.execute(query)
-        peer_funds = result.scalars().all()
-        
-        # Add some realistic performance data for demo purposes
-        # In a real system, this would come from actual performance calculations
-        demo_returns = [8.5, 12.3, -2.1, 15.7, 6.8, 9.2, 4.3, 11.1, -1.5, 7.9]
-        
-        return [
-            PeerComparisonData(
-                fund_id=peer.id,
-                fund_name=peer.name,
-                benchmark_category=peer.benchmark_category,
-                total_aum=peer.total_aum,
-                expense_ratio=peer.expense_ratio,
-                total_return=demo_returns[i % len(demo_returns)]  # Cycle through demo returns
-            )
-            for i, peer in enumerate(peer_funds)
-        ]
-
+    @cached("funds", tags=lambda fund_id: [f"fund:{fund_id}"])
     async def get_fund_statistics(self, fund_id: int) -> dict:
         """Get fund statistics and metrics"""
-        fund = await self.get_fund_by_id(fund_id)
+        fund = await self.get_fund_header(fund_id)
         if not fund:
             return {}
         
@@ -293,26 +411,18 @@ class FundService:
         
         return {
             'fund_id': fund_id,
-            'fund_name': fund.name,
-            'total_aum': fund.total_aum,
+            'fund_name': fund['name'],
+            'total_aum': fund['total_aum'],
             'holdings_count': stats.total_holdings or 0,
             'total_cost_basis': stats.total_cost_basis or 0,
-            'inception_date': fund.inception_date,
-            'strategy': fund.strategy,
-            'manager_name': fund.manager_name,
-            'expense_ratio': fund.expense_ratio
+            'inception_date': fund['inception_date'],
+            'strategy': fund['strategy'],
+            'manager_name': fund['manager_name'],
+            'expense_ratio': fund['expense_ratio']
         }
 
-    async def search_funds(self, query: str, limit: int = 10) -> List[Fund]:
-        """Search funds by name or manager"""
-        search_query = (
-            select(Fund)
-            .where(
-                func.lower(Fund.name).contains(query.lower()) |
-                func.lower(Fund.manager_name).contains(query.lower())
-            )
-            .limit(limit)
-        )
-        
-        result = await self.db.execute(search_query)
-        return result.scalars().all()
\ No newline at end of file
+    @cached("funds", tags=lambda **_: ["funds", "performance"])
+    async def search_funds(self, query: str, limit: int = 10) -> List[dict]:
+        """Search funds by name, manager or description, most relevant first"""
+        funds = await SearchService(self.db).search_funds(query, limit)
+        return await self._list_data(funds)
@@ -4,14 +4,56 @@ Holding service for database operations
 from datetime import date
 from decimal import Decimal
 from typing import List, Optional
-from sqlalchemy import select, func, and_, desc
+from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import cached, invalidate
+from app.core.pagination import Keyset, SortKey
+from app.core.read_models import holding_details, read_models
+from app.core.versioning import bump
 from app.models.holding import Holding
 from app.models.fund import Fund
+from app.models.return_ladder import TickerReturnLadder
 from app.models.stock_price import StockPrice
 from app.schemas.holding import HoldingCreate, HoldingUpdate
+from app.services.loaders import get_loaders
+from app.services.return_ladder_service import ladder_returns
+from app.services.search_service import SearchService
+from app.services.valuation_service import ValuationService
+
+
+# Listing order shared by offset and cursor pagination
+HOLDING_KEYSET = Keyset(SortKey("ticker", Holding.ticker), SortKey("id", Holding.id))
+HOLDING_DETAILS_KEYSET = Keyset(SortKey("ticker", holding_details.c.ticker), SortKey("id", holding_details.c.id))
+
+
+def _format_decimal(value: Optional[Decimal], places: int) -> Optional[str]:
+    return None if value is None else f"{value:.{places}f}"
+
+
+def _valued_holding(row) -> dict:
+    """Valued holding dict, as built by ValuationService, from a holding_details row"""
+    return {
+        "id": row["id"],
+        "fund_id": row["fund_id"],
+        "ticker": row["ticker"],
+        "company_name": row["company_name"],
+        "shares": str(row["shares"]),
+        "purchase_price": str(row["purchase_price"]),
+        "purchase_date": row["purchase_date"].isoformat(),
+        "sector": row["sector"],
+        "market_cap": row["market_cap"],
+        "created_at": row["created_at"].isoformat(),
+        "updated_at": row["updated_at"].isoformat(),
+        "cost_basis": _format_decimal(row["cost_basis"], 2),
+        "current_price": _format_decimal(row["current_price"], 4),
+        "price_date": row["price_date"].isoformat() if row["price_date"] else None,
+        "current_value": _format_decimal(row["current_value"], 2),
+        "unrealized_gain_loss": _format_decimal(row["unrealized_gain_loss"], 2),
+        "unrealized_gain_loss_percent": _format_decimal(row["unrealized_gain_loss_percent"], 4),
+        "weight_in_fund": _format_decimal(row["weight_in_fund"], 4),
+    }
 
 
 class HoldingService:
@@ -19,34 +61,72 @@ class HoldingService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.loaders = get_loaders(db)
     
-    async def get_holdings(self, skip: int = 0, limit: int = 100) -> List[Holding]:
-        """Get all holdings with pagination"""
-        query = (
-            select(Holding)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Holding.ticker)
-        )
+    @cached("holdings", tags=lambda **_: ["holdings"])
+    async def get_holdings(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Holding]:
+        """Get all holdings with pagination, starting after ``cursor`` when given"""
+        query = HOLDING_KEYSET.apply(select(Holding), cursor).offset(skip).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()
     
+    def build_list_query(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        ticker: Optional[str] = None,
+        fund_id: Optional[int] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        read_model: bool = False,
+    ):
+        """
+        Build the holdings query behind the list endpoint's filters.
+        ``cursor`` applies to the paginated listings (unfiltered or search);
+        ticker and fund filters return their complete, bounded result.
+        With ``read_model`` the query selects from the holding_details view.
+        """
+        if read_model:
+            columns, keyset, query = holding_details.c, HOLDING_DETAILS_KEYSET, select(holding_details)
+        else:
+            columns, keyset, query = Holding, HOLDING_KEYSET, select(Holding)
+        if search:
+            search_pattern = f"%{search.upper()}%"
+            query = query.where(columns.ticker.ilike(search_pattern) | columns.company_name.ilike(search_pattern))
+            return keyset.apply(query, cursor).limit(limit)
+        if ticker:
+            return query.where(columns.ticker == ticker.upper()).order_by(columns.fund_id)
+        if fund_id:
+            return query.where(columns.fund_id == fund_id).order_by(columns.ticker)
+        return keyset.apply(query, cursor).offset(skip).limit(limit)
+    
+    @cached("holdings", tags=lambda **_: ["holdings", "stock_prices", "read_models"])
+    async def get_valued_holdings(self, **filters) -> List[dict]:
+        """Get holdings marked to market with P&L and fund weights"""
+        # Search and ticker listings span funds; a fund listing needs only its own fund current
+        fund_id = None if filters.get("search") or filters.get("ticker") else filters.get("fund_id")
+        if read_models.serves(fund_id):
+            result = await self.db.execute(self.build_list_query(**filters, read_model=True))
+            return [_valued_holding(row) for row in result.mappings()]
+        return await ValuationService(self.db).value_holdings(self.build_list_query(**filters))
+    
     async def get_holding_by_id(self, holding_id: int) -> Optional[Holding]:
         """Get a specific holding by ID"""
         query = select(Holding).where(Holding.id == holding_id)
         result = await self.db.execute(query)
         return result.scalars().first()
     
+    @cached("holdings", tags=lambda fund_id: [f"fund:{fund_id}"])
     async def get_holdings_by_fund(self, fund_id: int) -> List[Holding]:
         """Get all holdings for a specific fund"""
-        query = (
-            select(Holding)
-            .where(Holding.fund_id == fund_id)
-            .order_by(Holding.ticker)
-        )
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        return await self.loaders.holdings_by_fund.load(fund_id)
     
+    async def get_holdings_by_funds(self, fund_ids: List[int]) -> dict:
+        """Get holdings for several funds, keyed by fund ID"""
+        holdings = await self.loaders.holdings_by_fund.load_many(fund_ids)
+        return dict(zip(fund_ids, holdings))
+    
+    @cached("holdings", tags=lambda **_: ["holdings"])
     async def get_holdings_by_ticker(self, ticker: str) -> List[Holding]:
         """Get all holdings for a specific ticker across all funds"""
         query = (
@@ -64,8 +144,12 @@ class HoldingService:
         holding = Holding(**holding_dict)
         
         self.db.add(holding)
+        await self._bump(holding.fund_id)
         await self.db.commit()
         await self.db.refresh(holding)
+        read_models.written(holding.fund_id)
+        self.loaders.clear()
+        self._invalidate(holding.fund_id)
         return holding
     
     async def update_holding(self, holding_id: int, holding_data: HoldingUpdate) -> Optional[Holding]:
@@ -78,8 +162,12 @@ class HoldingService:
         for field, value in update_data.items():
             setattr(holding, field, value)
         
+        await self._bump(holding.fund_id)
         await self.db.commit()
         await self.db.refresh(holding)
+        read_models.written(holding.fund_id)
+        self.loaders.clear()
+        self._invalidate(holding.fund_id)
         return holding
     
     async def delete_holding(self, holding_id: int) -> bool:
@@ -88,10 +176,25 @@ class HoldingService:
         if not holding:
             return False
         
+        fund_id = holding.fund_id
         await self.db.delete(holding)
+        await self._bump(fund_id)
         await self.db.commit()
+        read_models.written(fund_id)
+        self.loaders.clear()
+        self._invalidate(fund_id)
         return True
     
+    async def _bump(self, fund_id: int) -> None:
+        """Advance the data versions a change to one fund's holdings affects"""
+        await bump(self.db, "holdings", "funds", f"fund:{fund_id}")
+    
+    @staticmethod
+    def _invalidate(fund_id: int) -> None:
+        """Drop cached reads affected by a change to one fund's holdings"""
+        invalidate("holdings", "funds", f"fund:{fund_id}")
+    
+    @cached("holdings", tags=lambda fund_id: [f"fund:{fund_id}"])
     async def get_fund_holdings_summary(self, fund_id: int) -> dict:
         """Get summary statistics for fund holdings"""
         query = (
@@ -114,6 +217,7 @@ class HoldingService:
             'unique_sectors': row.unique_sectors or 0
         }
     
+    @cached("holdings", tags=lambda fund_id: [f"fund:{fund_id}"])
     async def get_sector_breakdown(self, fund_id: int) -> List[dict]:
         """Get sector breakdown for fund holdings"""
         query = (
@@ -138,6 +242,7 @@ class HoldingService:
         
         return sectors
     
+    @cached("holdings", tags=lambda fund_id, **_: [f"fund:{fund_id}"])
     async def get_top_holdings(self, fund_id: int, limit: int = 10) -> List[Holding]:
         """Get top holdings by value for a fund"""
         query = (
@@ -149,20 +254,32 @@ class HoldingService:
         result = await self.db.execute(query)
         return result.scalars().all()
     
-    async def search_holdings(self, query_str: str, limit: int = 50) -> List[Holding]:
-        """Search holdings by ticker or company name"""
-        search_pattern = f"%{query_str.upper()}%"
+    @cached("holdings", tags=lambda fund_id: [f"fund:{fund_id}", "daily_returns"])
+    async def get_ticker_returns(self, fund_id: int) -> List[dict]:
+        """Trailing-return ladder of each ticker the fund holds, from the ticker ladders"""
         query = (
-            select(Holding)
-            .options(selectinload(Holding.fund))
-            .where(
-                and_(
-                    (Holding.ticker.ilike(search_pattern)) |
-                    (Holding.company_name.ilike(search_pattern))
-                )
-            )
-            .order_by(Holding.ticker, Holding.fund_id)
-            .limit(limit)
+            select(Holding.ticker, Holding.company_name, TickerReturnLadder)
+            .outerjoin(TickerReturnLadder, TickerReturnLadder.ticker == Holding.ticker)
+            .where(Holding.fund_id == fund_id)
+            .order_by(Holding.ticker, Holding.id)
         )
         result = await self.db.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        
+        # One row per ticker however many lots the fund holds
+        tickers = {}
+        for row in result:
+            if row.ticker not in tickers:
+                ladder = row.TickerReturnLadder
+                tickers[row.ticker] = {
+                    "ticker": row.ticker,
+                    "company_name": row.company_name,
+                    "as_of": ladder.as_of if ladder else None,
+                    "first_date": ladder.first_date if ladder else None,
+                    "trailing_returns": ladder_returns(ladder),
+                }
+        return list(tickers.values())
+    
+    @cached("holdings", tags=lambda **_: ["holdings"])
+    async def search_holdings(self, query_str: str, limit: int = 50) -> List[Holding]:
+        """Search holdings by ticker or company name, most relevant first"""
+        return await SearchService(self.db).search_holdings(query_str, limit)
\ No newline at end of file
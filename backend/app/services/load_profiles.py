@@ -0,0 +1,67 @@
+"""
+Named loader profiles for Fund queries. ``Fund.holdings`` is never loaded
+implicitly, so every service call picks the profiles for what it reads
+"""
+from typing import Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import defer, joinedload, load_only, selectinload, with_expression
+from sqlalchemy.sql import Select
+
+from app.models.fund import Fund
+from app.models.holding import Holding
+from app.models.return_ladder import FundReturnLadder
+
+# Identity columns only: existence checks and name lookups
+HEADER = "header"
+# Every column but the description, which list views do not show
+LIST = "list"
+# Holdings as ORM objects, for code that iterates them
+WITH_HOLDINGS = "with_holdings"
+# Holdings count and cost basis computed in SQL instead of loading holdings
+AGGREGATES = "aggregates"
+# The trailing-return ladder, joined into the same statement
+RETURNS = "returns"
+
+
+def _holdings_count():
+    return (
+        select(func.count(Holding.id))
+        .where(Holding.fund_id == Fund.id)
+        .correlate(Fund)
+        .scalar_subquery()
+    )
+
+
+def _cost_basis():
+    return (
+        select(func.coalesce(func.sum(Holding.shares * Holding.purchase_price), 0))
+        .where(Holding.fund_id == Fund.id)
+        .correlate(Fund)
+        .scalar_subquery()
+    )
+
+
+FUND_PROFILES = {
+    HEADER: lambda: (load_only(Fund.id, Fund.name, Fund.strategy, Fund.manager_name),),
+    LIST: lambda: (defer(Fund.description),),
+    WITH_HOLDINGS: lambda: (selectinload(Fund.holdings),),
+    AGGREGATES: lambda: (
+        with_expression(Fund.aggregate_holdings_count, _holdings_count()),
+        with_expression(Fund.aggregate_cost_basis, _cost_basis()),
+    ),
+    RETURNS: lambda: (joinedload(Fund.return_ladder.of_type(FundReturnLadder)),),
+}
+
+
+def fund_options(*profiles: str) -> Tuple:
+    """Loader options for the named profiles, combined"""
+    unknown = set(profiles) - FUND_PROFILES.keys()
+    if unknown:
+        raise ValueError(f"Unknown fund loader profile(s): {', '.join(sorted(unknown))}")
+    return tuple(option for profile in profiles for option in FUND_PROFILES[profile]())
+
+
+def select_funds(*profiles: str) -> Select:
+    """``select(Fund)`` loading what the named profiles ask for"""
+    return select(Fund).options(*fund_options(*profiles))
@@ -0,0 +1,195 @@
+"""
+Request-scoped batching loaders for service layer lookups
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.fund import Fund
+from app.models.fund_performance import FundPerformance
+from app.models.holding import Holding
+from app.models.stock_price import StockPrice
+
+# What guards and headers need: no description, holdings or valuation
+FUND_HEADER_COLUMNS = (
+    Fund.id, Fund.name, Fund.strategy, Fund.manager_name,
+    Fund.inception_date, Fund.total_aum, Fund.expense_ratio,
+)
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class DataLoader:
+    """
+    Collects keys requested within the same event loop tick and resolves
+    them with a single call to the batch function.
+
+    Results are memoised for the lifetime of the loader, which is bound to
+    one request's database session. Keys the batch function leaves out
+    resolve to ``default_factory()``, or None without one.
+    """
+
+    def __init__(self, batch_fn: BatchFn, lock: asyncio.Lock, default_factory: Optional[Callable[[], Any]] = None):
+        self._batch_fn = batch_fn
+        self._lock = lock
+        self._default_factory = default_factory
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._dispatch_scheduled = False
+        # asyncio keeps only weak references to tasks; hold running dispatches
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """Load a single key, batching with any other pending keys"""
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+            self._queue.append(key)
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._start_dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """Load several keys with one batch call"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Seed the loader with an already known value"""
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self) -> None:
+        """Forget all memoised results"""
+        self._cache = {key: fut for key, fut in self._cache.items() if not fut.done()}
+
+    def _start_dispatch(self) -> None:
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        if not keys:
+            return
+
+        try:
+            # A session cannot run statements concurrently, so batches from
+            # different loaders on the same session take turns.
+            async with self._lock:
+                results = await self._batch_fn(keys)
+            for key in keys:
+                future = self._cache.get(key)
+                if future is not None and not future.done():
+                    if key in results:
+                        future.set_result(results[key])
+                    else:
+                        # A fresh value per key, so callers cannot share a mutable default
+                        future.set_result(self._default_factory() if self._default_factory else None)
+        except BaseException as e:
+            # Including cancellation: no caller may be left awaiting a key
+            for key in keys:
+                future = self._cache.pop(key, None)
+                if future is not None and not future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+            # Errors reach the callers through their futures; cancellation propagates
+            if not isinstance(e, Exception):
+                raise
+
+
+def latest_rows_query(session: AsyncSession, model, key_column, order_column, keys: Sequence[Hashable]):
+    """
+    Build a query returning the latest row per key.
+
+    Uses DISTINCT ON under PostgreSQL and a ROW_NUMBER() window elsewhere.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return (
+            select(model)
+            .distinct(key_column)
+            .where(key_column.in_(keys))
+            .order_by(key_column, desc(order_column))
+        )
+
+    ranked = (
+        select(
+            model,
+            func.row_number()
+            .over(partition_by=key_column, order_by=desc(order_column))
+            .label("row_rank"),
+        )
+        .where(key_column.in_(keys))
+        .subquery()
+    )
+    latest = aliased(model, ranked)
+    return select(latest).where(ranked.c.row_rank == 1)
+
+
+class ServiceLoaders:
+    """Batching loaders shared by all services within one request"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        lock = asyncio.Lock()
+        self.latest_performance = DataLoader(self._batch_latest_performance, lock)
+        self.latest_price = DataLoader(self._batch_latest_price, lock)
+        self.holdings_by_fund = DataLoader(self._batch_holdings_by_fund, lock, default_factory=list)
+        # Identity map of fund headers: each fund is read at most once per request
+        self.fund_header = DataLoader(self._batch_fund_headers, lock)
+
+    def clear(self) -> None:
+        """Drop memoised results after a write"""
+        self.latest_performance.clear()
+        self.latest_price.clear()
+        self.holdings_by_fund.clear()
+        self.fund_header.clear()
+
+    async def _batch_latest_performance(self, fund_ids: List[int]) -> Dict[int, FundPerformance]:
+        query = latest_rows_query(
+            self.db, FundPerformance, FundPerformance.fund_id, FundPerformance.date, fund_ids
+        )
+        result = await self.db.execute(query)
+        return {perf.fund_id: perf for perf in result.scalars().all()}
+
+    async def _batch_fund_headers(self, fund_ids: List[int]) -> Dict[int, dict]:
+        result = await self.db.execute(select(*FUND_HEADER_COLUMNS).where(Fund.id.in_(fund_ids)))
+        return {row["id"]: dict(row) for row in result.mappings()}
+
+    async def _batch_latest_price(self, tickers: List[str]) -> Dict[str, StockPrice]:
+        query = latest_rows_query(self.db, StockPrice, StockPrice.ticker, StockPrice.date, tickers)
+        result = await self.db.execute(query)
+        return {price.ticker: price for price in result.scalars().all()}
+
+    async def _batch_holdings_by_fund(self, fund_ids: List[int]) -> Dict[int, List[Holding]]:
+        query = (
+            select(Holding)
+            .where(Holding.fund_id.in_(fund_ids))
+            .order_by(Holding.fund_id, Holding.ticker)
+        )
+        result = await self.db.execute(query)
+
+        grouped: Dict[int, List[Holding]] = defaultdict(list)
+        for holding in result.scalars().all():
+            grouped[holding.fund_id].append(holding)
+        return dict(grouped)
+
+
+def get_loaders(db: AsyncSession) -> ServiceLoaders:
+    """Get the loaders bound to this session, creating them on first use"""
+    loaders: Optional[ServiceLoaders] = db.info.get("service_loaders")
+    if loaders is None:
+        loaders = ServiceLoaders(db)
+        db.info["service_loaders"] = loaders
+    return loaders
@@ -0,0 +1,344 @@
+"""
+Market data ingestion: incremental daily price fetches from the configured
+provider (Alpha Vantage compatible) for every held ticker
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+import httpx
+from sqlalchemy import distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.holding import Holding
+from app.models.stock_price import StockPrice
+from app.services.stock_price_service import PriceRow, StockPriceService
+
+logger = logging.getLogger(__name__)
+
+SERIES_KEY = "Time Series (Daily)"
+
+# The provider's compact output covers the last 100 trading days
+COMPACT_WINDOW_DAYS = 100
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MarketDataError(Exception):
+    """A ticker could not be fetched"""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Allows ``rate`` acquisitions per ``period`` seconds with bursts of up to
+    ``capacity``. Waiters are served in arrival order
+    """
+
+    def __init__(self, rate: float, period: float = 60.0, capacity: float = 1.0):
+        self.fill_rate = rate / period
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+def _decimal(value: Optional[str]) -> Optional[Decimal]:
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def parse_daily_series(ticker: str, payload: dict, since: date) -> List[PriceRow]:
+    """Price rows on or after ``since`` from a TIME_SERIES_DAILY response"""
+    if "Error Message" in payload:
+        raise MarketDataError(payload["Error Message"])
+    # Throttled responses come back as 200 with an explanatory note
+    for key in ("Note", "Information"):
+        if key in payload and SERIES_KEY not in payload:
+            raise MarketDataError(payload[key], retryable=True)
+    series = payload.get(SERIES_KEY)
+    if series is None:
+        raise MarketDataError(f"Response has no '{SERIES_KEY}'")
+
+    rows: List[PriceRow] = []
+    for day, bar in series.items():
+        try:
+            bar_date = date.fromisoformat(day)
+        except (TypeError, ValueError):
+            raise MarketDataError(f"Malformed date {day!r} in '{SERIES_KEY}'")
+        if bar_date < since:
+            continue
+        # Keys look like "1. open"; adjusted series add "5. adjusted close"
+        fields = {key.split(". ", 1)[-1]: value for key, value in bar.items()}
+        try:
+            volume = int(fields.get("volume", 0))
+        except ValueError:
+            volume = 0
+        rows.append((
+            ticker,
+            bar_date,
+            _decimal(fields.get("open")),
+            _decimal(fields.get("high")),
+            _decimal(fields.get("low")),
+            _decimal(fields.get("close")),
+            volume,
+            _decimal(fields.get("adjusted close")),
+        ))
+    rows.sort(key=lambda row: row[1])
+    return rows
+
+
+def last_trading_day(today: date) -> date:
+    """Most recent weekday on or before ``today``"""
+    while today.weekday() >= 5:
+        today -= timedelta(days=1)
+    return today
+
+
+class MarketDataClient:
+    """
+    Pooled, rate-limited HTTP client for the price provider. Every attempt,
+    retries included, spends a token from the shared bucket
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limiter: Optional[TokenBucket] = None,
+        concurrency: Optional[int] = None,
+    ):
+        concurrency = concurrency or settings.STOCK_API_CONCURRENCY
+        self.limiter = limiter or TokenBucket(settings.STOCK_API_RATE_LIMIT, capacity=settings.STOCK_API_BURST)
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=settings.STOCK_API_TIMEOUT,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "MarketDataClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def fetch_daily(self, ticker: str, since: date) -> List[PriceRow]:
+        """Daily bars for ``ticker`` from ``since`` onwards, retried with jittered backoff"""
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": ticker,
+            "outputsize": "compact" if (date.today() - since).days <= COMPACT_WINDOW_DAYS else "full",
+            "apikey": settings.STOCK_API_KEY,
+        }
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            try:
+                return parse_daily_series(ticker, await self._get(params), since)
+            except MarketDataError as e:
+                attempt += 1
+                if not e.retryable or attempt > settings.STOCK_API_MAX_RETRIES:
+                    raise
+                # Full jitter: a random delay up to the exponential ceiling
+                ceiling = min(settings.STOCK_API_RETRY_MAX_DELAY, settings.STOCK_API_RETRY_BASE_DELAY * 2 ** attempt)
+                delay = max(e.retry_after or 0.0, random.uniform(0, ceiling))
+                logger.info("Retrying %s in %.2fs (attempt %d): %s", ticker, delay, attempt, e)
+                await asyncio.sleep(delay)
+
+    async def _get(self, params: dict) -> dict:
+        try:
+            response = await self.client.get(settings.STOCK_API_URL, params=params)
+        except httpx.TransportError as e:
+            raise MarketDataError(f"{type(e).__name__}: {e}", retryable=True)
+
+        if response.status_code in RETRY_STATUS_CODES:
+            retry_after = response.headers.get("Retry-After")
+            raise MarketDataError(
+                f"HTTP {response.status_code}",
+                retryable=True,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        if response.status_code >= 400:
+            raise MarketDataError(f"HTTP {response.status_code}")
+        try:
+            return response.json()
+        except ValueError:
+            raise MarketDataError("Response is not JSON", retryable=True)
+
+
+class MarketDataService:
+    """Bring stored prices of held tickers up to date"""
+
+    def __init__(self, db: AsyncSession, client: MarketDataClient):
+        self.db = db
+        self.client = client
+
+    async def get_last_stored_dates(self, tickers: Optional[Sequence[str]] = None) -> Dict[str, Optional[date]]:
+        """Latest stored price date per held ticker (None when it has no prices)"""
+        held = select(distinct(Holding.ticker).label("ticker"))
+        if tickers:
+            held = held.where(Holding.ticker.in_(tickers))
+        held = held.subquery()
+        query = (
+            select(held.c.ticker, func.max(StockPrice.date))
+            .select_from(held.outerjoin(StockPrice, StockPrice.ticker == held.c.ticker))
+            .group_by(held.c.ticker)
+        )
+        result = await self.db.execute(query)
+        return {ticker: last for ticker, last in result.all()}
+
+    async def sync_prices(self, tickers: Optional[Sequence[str]] = None) -> dict:
+        """
+        Fetch prices newer than the last stored date for each held ticker
+        (or ``STOCK_API_BACKFILL_DAYS`` for tickers without prices) and
+        upsert them. Fetches run ``STOCK_API_CONCURRENCY`` at a time while
+        completed tickers stream into the batched upsert
+        """
+        last_dates = await self.get_last_stored_dates(tickers)
+        up_to_date = last_trading_day(date.today())
+        pending: Dict[str, date] = {}
+        skipped: List[str] = []
+        for ticker, last in sorted(last_dates.items()):
+            if last is not None and last >= up_to_date:
+                skipped.append(ticker)
+            else:
+                pending[ticker] = last + timedelta(days=1) if last else date.today() - timedelta(days=settings.STOCK_API_BACKFILL_DAYS)
+
+        failed: Dict[str, str] = {}
+        fetched: List[str] = []
+        queue: "asyncio.Queue[Optional[List[PriceRow]]]" = asyncio.Queue()
+        semaphore = asyncio.Semaphore(settings.STOCK_API_CONCURRENCY)
+
+        async def fetch(ticker: str, since: date) -> None:
+            async with semaphore:
+                try:
+                    rows = await self.client.fetch_daily(ticker, since)
+                except MarketDataError as e:
+                    failed[ticker] = str(e)
+                    logger.warning("Fetching prices for %s failed: %s", ticker, e)
+                    return
+                except Exception as e:
+                    # One malformed response must not cost the other tickers their rows
+                    failed[ticker] = f"{type(e).__name__}: {e}"
+                    logger.exception("Fetching prices for %s failed", ticker)
+                    return
+            fetched.append(ticker)
+            await queue.put(rows)
+
+        async def fetch_all() -> None:
+            # Waits for every fetch, so the end of the stream is queued only
+            # once nothing more can arrive
+            results = await asyncio.gather(
+                *(fetch(ticker, since) for ticker, since in pending.items()), return_exceptions=True,
+            )
+            await queue.put(None)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+        async def rows() -> AsyncIterator[PriceRow]:
+            while (batch := await queue.get()) is not None:
+                for row in batch:
+                    yield row
+
+        fetcher = asyncio.create_task(fetch_all())
+        try:
+            totals = await StockPriceService(self.db).bulk_upsert_prices(
+                rows(), chunk_size=settings.STOCK_API_WRITE_BATCH,
+            )
+        except BaseException:
+            fetcher.cancel()
+            await asyncio.gather(fetcher, return_exceptions=True)
+            raise
+        # The stream has ended, so the fetcher is done; this raises whatever
+        # escaped the per-ticker handling instead of dropping it
+        await fetcher
+
+        return {
+            "tickers_requested": len(last_dates),
+            "tickers_up_to_date": len(skipped),
+            "tickers_fetched": len(fetched),
+            "tickers_failed": failed,
+            "inserted": totals["inserted"],
+            "updated": totals["updated"],
+            "rejected": totals["rejected"],
+        }
+
+
+_client: Optional[MarketDataClient] = None
+
+
+def get_market_data_client() -> MarketDataClient:
+    """Process-wide client, so every sync shares one pool and one rate limit"""
+    global _client
+    if _client is None:
+        _client = MarketDataClient()
+    return _client
+
+
+async def close_market_data_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+class MarketDataScheduler:
+    """Run sync_prices every ``interval`` seconds in the background"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_result: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    self.last_result = await MarketDataService(session, get_market_data_client()).sync_prices()
+            except Exception:
+                logger.exception("Scheduled market data sync failed")
+            await asyncio.sleep(self.interval)
+
+
+market_data_scheduler = MarketDataScheduler(settings.MARKET_DATA_SYNC_INTERVAL)
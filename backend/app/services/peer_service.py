@@ -0,0 +1,361 @@
+"""
+Peer engine: trailing returns for every fund and peer fund, ranked within
+peer categories by a nightly job and served from the peer_rankings table
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.cache import cached, invalidate
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.versioning import bump
+from app.models.fund import Fund, FundStrategy
+from app.models.fund_performance import FundPerformance
+from app.models.holding import Holding
+from app.models.peer_fund import PeerCategory, PeerFund, peer_category_for
+from app.models.peer_performance import PeerPerformance, PeerRanking
+from app.services.loaders import get_loaders
+from app.services.return_ladder_service import NAV_LOOKBACK_DAYS, ReturnLadderService, months_before
+
+logger = logging.getLogger(__name__)
+
+# Window name -> months back from the as-of date; "ytd" starts at the previous year end
+TRAILING_WINDOWS = {"1m": 1, "3m": 3, "ytd": None, "1y": 12, "3y": 36, "5y": 60}
+ANNUALIZED_YEARS = {"3y": 3, "5y": 5}
+
+# Held for the ranking transaction so only one worker runs the job (PostgreSQL)
+RANKING_LOCK_ID = 5_407_321
+
+
+def window_starts(as_of: date) -> Dict[str, date]:
+    return {
+        window: date(as_of.year - 1, 12, 31) if months is None else months_before(as_of, months)
+        for window, months in TRAILING_WINDOWS.items()
+    }
+
+
+def navs_at(entities: np.ndarray, days: np.ndarray, navs: np.ndarray, size: int, day: int) -> np.ndarray:
+    """NAV of each entity at its last observation within the lookback before ``day`` (an ordinal), NaN if none"""
+    mask = (days <= day) & (days > day - NAV_LOOKBACK_DAYS)
+    entities, days, navs = entities[mask], days[mask], navs[mask]
+    order = np.lexsort((days, entities))
+    entities, navs = entities[order], navs[order]
+    last = np.flatnonzero(np.append(entities[1:] != entities[:-1], True)) if len(entities) else entities
+    result = np.full(size, np.nan)
+    result[entities[last]] = navs[last]
+    return result
+
+
+def compute_trailing_returns(
+    entities: np.ndarray, days: np.ndarray, navs: np.ndarray, size: int, as_of: date,
+) -> Dict[str, np.ndarray]:
+    """
+    Trailing return in percent per window for ``size`` entities at once,
+    from NAV observations given as parallel arrays (entity index, date
+    ordinal, NAV). 3y and 5y are annualized; NaN where a window has no
+    starting or ending NAV
+    """
+    end = navs_at(entities, days, navs, size, as_of.toordinal())
+    returns = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for window, start in window_starts(as_of).items():
+            growth = end / navs_at(entities, days, navs, size, start.toordinal())
+            years = ANNUALIZED_YEARS.get(window)
+            if years:
+                growth = np.power(growth, 1.0 / years)
+            returns[window] = (growth - 1.0) * 100.0
+    return returns
+
+
+def percentile_ranks(values: np.ndarray, categories: np.ndarray, is_peer: np.ndarray) -> np.ndarray:
+    """
+    Percent of the category's peers (other than the entity itself) with a
+    lower value, ties counting half. ``categories`` holds integer codes, -1
+    for none; NaN where the entity has no value or the category no peers
+    """
+    result = np.full(len(values), np.nan)
+    valid = np.isfinite(values) & (categories >= 0)
+    for category in np.unique(categories[valid]):
+        members = np.flatnonzero(valid & (categories == category))
+        peers = np.sort(values[members[is_peer[members]]])
+        below = np.searchsorted(peers, values[members], side="left")
+        equal = np.searchsorted(peers, values[members], side="right") - below
+        own = is_peer[members].astype(int)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ranks = (below + 0.5 * (equal - own)) / (len(peers) - own) * 100.0
+        result[members] = np.where(len(peers) - own > 0, ranks, np.nan)
+    return result
+
+
+def _optional(value: float, places: int) -> Optional[float]:
+    return round(value, places) if np.isfinite(value) else None
+
+
+def _windows(row: PeerRanking, prefix: str) -> Dict[str, Optional[float]]:
+    return {window: getattr(row, f"{prefix}_{window}") for window in TRAILING_WINDOWS}
+
+
+class PeerRankingService:
+    """Computes the peer_rankings table and reads peer groups from it"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def last_computed_at(self) -> Optional[datetime]:
+        return (await self.db.execute(select(func.max(PeerRanking.computed_at)))).scalar()
+
+    async def refresh_rankings(self, as_of: Optional[date] = None) -> dict:
+        """
+        Recompute trailing returns for every fund and peer and their
+        percentile ranks within each category, then replace the table in
+        one transaction. Only the NAVs around each window boundary are read
+        """
+        started = time.perf_counter()
+        if self.db.get_bind().dialect.name == "postgresql":
+            locked = (await self.db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": RANKING_LOCK_ID})).scalar()
+            if not locked:
+                await self.db.rollback()
+                return {"skipped": True}
+
+        funds = (await self.db.execute(
+            select(Fund.id, Fund.name, Fund.strategy, Fund.total_aum, Fund.expense_ratio).order_by(Fund.id)
+        )).all()
+        peers = (await self.db.execute(
+            select(PeerFund.id, PeerFund.name, PeerFund.benchmark_category, PeerFund.total_aum, PeerFund.expense_ratio)
+            .order_by(PeerFund.id)
+        )).all()
+        fund_categories = await self._fund_categories(funds)
+
+        if as_of is None:
+            today = date.today()
+            latest = [
+                (await self.db.execute(select(func.max(model.date)).where(model.date <= today))).scalar()
+                for model in (FundPerformance, PeerPerformance)
+            ]
+            as_of = max((day for day in latest if day is not None), default=today)
+
+        # Entities are indexed funds first, then peers
+        fund_ids = np.array([row.id for row in funds], dtype=np.int64)
+        peer_ids = np.array([row.id for row in peers], dtype=np.int64)
+        size = len(funds) + len(peers)
+        entities, days, navs = [], [], []
+        for model, key, ids, offset in (
+            (FundPerformance, FundPerformance.fund_id, fund_ids, 0),
+            (PeerPerformance, PeerPerformance.peer_fund_id, peer_ids, len(funds)),
+        ):
+            loaded = await self._boundary_navs(model, key, as_of)
+            if len(loaded[0]) and len(ids):
+                index = np.searchsorted(ids, loaded[0])
+                known = (index < len(ids)) & (ids[np.minimum(index, len(ids) - 1)] == loaded[0])
+                entities.append(index[known] + offset)
+                days.append(loaded[1][known])
+                navs.append(loaded[2][known])
+        entities, days, navs = (
+            (np.concatenate(parts) if parts else np.array([], dtype=dtype))
+            for parts, dtype in ((entities, np.int64), (days, np.int64), (navs, float))
+        )
+
+        returns = compute_trailing_returns(entities, days, navs, size, as_of)
+        codes = {category: i for i, category in enumerate(PeerCategory)}
+        categories = np.array(
+            [codes[c] if c is not None else -1 for c in fund_categories]
+            + [codes[PeerCategory(row.benchmark_category)] for row in peers],
+            dtype=np.int64,
+        )
+        is_peer = np.arange(size) >= len(funds)
+        ranks = {window: percentile_ranks(values, categories, is_peer) for window, values in returns.items()}
+
+        computed_at = datetime.utcnow()
+        category_list = list(PeerCategory)
+        records = []
+        for i, row in enumerate([*funds, *peers]):
+            records.append({
+                "entity_type": "peer" if is_peer[i] else "fund",
+                "entity_id": row.id,
+                "category": category_list[categories[i]] if categories[i] >= 0 else None,
+                "name": row.name,
+                "total_aum": row.total_aum,
+                "expense_ratio": row.expense_ratio,
+                "as_of": as_of,
+                **{f"return_{w}": _optional(float(returns[w][i]), 4) for w in TRAILING_WINDOWS},
+                **{f"percentile_{w}": _optional(float(ranks[w][i]), 2) for w in TRAILING_WINDOWS},
+                "computed_at": computed_at,
+            })
+
+        await self.db.execute(delete(PeerRanking))
+        if records:
+            await self.db.execute(PeerRanking.__table__.insert(), records)
+        await bump(self.db, "peers")
+        await self.db.commit()
+        invalidate("peers")
+
+        return {
+            "as_of": as_of,
+            "funds": len(funds),
+            "peers": len(peers),
+            "ranked": int(np.isfinite(ranks["1y"]).sum()),
+            "categories": len(set(categories[categories >= 0].tolist())),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    async def _fund_categories(self, funds: Sequence) -> List[Optional[PeerCategory]]:
+        """Category per fund; sector funds take the sector with most of their cost basis"""
+        sector_funds = [row.id for row in funds if row.strategy == FundStrategy.sector_specific]
+        dominant: Dict[int, str] = {}
+        if sector_funds:
+            result = await self.db.execute(
+                select(Holding.fund_id, Holding.sector, func.sum(Holding.shares * Holding.purchase_price).label("cost"))
+                .where(Holding.fund_id.in_(sector_funds), Holding.sector.is_not(None))
+                .group_by(Holding.fund_id, Holding.sector)
+                .order_by(Holding.fund_id, func.sum(Holding.shares * Holding.purchase_price))
+            )
+            # Ascending by cost, so each fund ends on its largest sector
+            dominant = {row.fund_id: row.sector for row in result}
+        return [peer_category_for(row.strategy, dominant.get(row.id)) for row in funds]
+
+    async def _boundary_navs(self, model, key, as_of: date):
+        """(entity id, date ordinal, NAV) arrays for the days just before each window boundary"""
+        lookback = timedelta(days=NAV_LOOKBACK_DAYS - 1)
+        boundaries = [as_of, *window_starts(as_of).values()]
+        result = await self.db.execute(
+            select(key, model.date, model.nav_price)
+            .where(or_(*(model.date.between(day - lookback, day) for day in boundaries)))
+        )
+        rows = result.all()
+        return (
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.array([row[1].toordinal() for row in rows], dtype=np.int64),
+            np.array([float(row[2]) for row in rows], dtype=float),
+        )
+
+    @cached("peers", tags=lambda fund_id, **_: [f"fund:{fund_id}", "peers"])
+    async def get_peer_comparison(self, fund_id: int, limit: int = 10) -> Optional[dict]:
+        """
+        The fund's ranking row and its category's peers, in one query over
+        the ranking table's primary key and category index
+        """
+        category = (
+            select(PeerRanking.category)
+            .where(PeerRanking.entity_type == "fund", PeerRanking.entity_id == fund_id)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(PeerRanking, Fund.strategy)
+            .outerjoin(Fund, and_(PeerRanking.entity_type == "fund", Fund.id == PeerRanking.entity_id))
+            .where(or_(
+                and_(PeerRanking.entity_type == "fund", PeerRanking.entity_id == fund_id),
+                and_(PeerRanking.entity_type == "peer", PeerRanking.category == category),
+            ))
+        )
+        rows = result.all()
+        own = next((row for row in rows if row.PeerRanking.entity_type == "fund"), None)
+        peers = [row.PeerRanking for row in rows if row.PeerRanking.entity_type == "peer"]
+
+        if own is None:
+            # Created since the last ranking run: no returns yet, peers by strategy
+            fund = await get_loaders(self.db).fund_header.load(fund_id)
+            if fund is None:
+                return None
+            peer_category = peer_category_for(fund["strategy"])
+            if peer_category is not None:
+                peers = (await self.db.execute(
+                    select(PeerRanking).where(PeerRanking.category == peer_category, PeerRanking.entity_type == "peer")
+                )).scalars().all()
+            name, strategy, ranking = fund["name"], fund["strategy"], None
+        else:
+            ranking = own.PeerRanking
+            name, strategy, peer_category = ranking.name, own.strategy, ranking.category
+
+        peers = sorted(peers, key=lambda peer: (peer.return_1y is None, -(peer.return_1y or 0), peer.name))
+        return {
+            "fund_id": fund_id,
+            "fund_name": name,
+            "fund_strategy": strategy,
+            "peer_category": peer_category,
+            "as_of": ranking.as_of if ranking else (peers[0].as_of if peers else None),
+            "fund_performance": ranking.return_1y if ranking else None,
+            "trailing_returns": _windows(ranking, "return") if ranking else None,
+            "percentile_ranks": _windows(ranking, "percentile") if ranking else None,
+            "peer_count": len(peers),
+            "peers": [{
+                "fund_id": peer.entity_id,
+                "fund_name": peer.name,
+                "benchmark_category": peer.category,
+                "total_aum": peer.total_aum,
+                "expense_ratio": peer.expense_ratio,
+                "total_return": peer.return_1y,
+                "trailing_returns": _windows(peer, "return"),
+                "percentile_ranks": _windows(peer, "percentile"),
+            } for peer in peers[:limit]],
+        }
+
+
+async def setup_peer_categories(bind: AsyncEngine) -> None:
+    """Add peer categories introduced after a PostgreSQL database was created"""
+    if bind.dialect.name != "postgresql":
+        return
+    # ALTER TYPE ... ADD VALUE must commit before the value is used
+    async with bind.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for category in PeerCategory:
+            await conn.execute(text(f"ALTER TYPE peer_category ADD VALUE IF NOT EXISTS '{category.value}'"))
+
+
+class PeerRankingScheduler:
+    """
+    Refresh the rankings every night at ``hour`` (UTC). On start it also
+    catches up when the table is empty or older than the last scheduled run.
+    Each run first brings the return ladders up to the day's NAVs and prices
+    """
+
+    def __init__(self, hour: int):
+        self.hour = hour
+        self.last_result: Optional[dict] = None
+        self.last_ladders: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if 0 <= self.hour < 24 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _last_slot(self, now: datetime) -> datetime:
+        slot = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+        return slot if slot <= now else slot - timedelta(days=1)
+
+    async def _run(self) -> None:
+        while True:
+            now = datetime.utcnow()
+            try:
+                async with AsyncSessionLocal() as session:
+                    self.last_ladders = await ReturnLadderService(session).catch_up()
+            except Exception:
+                logger.exception("Scheduled return ladder catch-up failed")
+            try:
+                async with AsyncSessionLocal() as session:
+                    service = PeerRankingService(session)
+                    last = await service.last_computed_at()
+                    if last is None or last < self._last_slot(now):
+                        self.last_result = await service.refresh_rankings()
+            except Exception:
+                logger.exception("Scheduled peer ranking refresh failed")
+            next_slot = self._last_slot(datetime.utcnow()) + timedelta(days=1)
+            await asyncio.sleep(max((next_slot - datetime.utcnow()).total_seconds(), 1.0))
+
+
+peer_ranking_scheduler = PeerRankingScheduler(settings.PEER_RANKINGS_HOUR)
@@ -0,0 +1,268 @@
+"""
+Trailing-return ladders (1d, 1w, 1m, 3m, ytd, 1y, 3y, itd) for every fund
+and ticker, kept in fund_return_ladders and ticker_return_ladders and
+rewritten per entity as its history changes
+"""
+import calendar
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate
+from app.core.versioning import bump
+from app.models.fund_performance import FundPerformance
+from app.models.return_ladder import FundReturnLadder, TickerReturnLadder
+from app.models.stock_price import StockPrice
+
+LADDER_WINDOWS = ("1d", "1w", "1m", "3m", "ytd", "1y", "3y", "itd")
+# Window -> months back from the as-of date; 1d steps back one observation,
+# 1w seven days, ytd to the previous year end and itd to the first observation
+LADDER_MONTHS = {"1m": 1, "3m": 3, "1y": 12, "3y": 36}
+ANNUALIZED_YEARS = {"3y": 3}
+
+# A window starts (and ends) at the last NAV at most this many days before its date
+NAV_LOOKBACK_DAYS = 7
+
+# Entities per boundary read, which bounds the IN list and the rows held at once
+_LADDER_BATCH = 1_000
+
+# Held for the catch-up transaction so only one worker rewrites stale ladders (PostgreSQL)
+LADDER_LOCK_ID = 5_407_322
+
+# Observations sort on entity * _DAY_SPAN + date ordinal; ordinals stay well below it
+_DAY_SPAN = 1 << 20
+
+
+def months_before(day: date, months: int) -> date:
+    """Same day ``months`` earlier, clamped to the end of shorter months"""
+    index = day.year * 12 + day.month - 1 - months
+    year, month = divmod(index, 12)
+    month += 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def ladder_starts(as_of: date) -> Dict[str, date]:
+    """Start date of each calendar window ending on ``as_of``"""
+    starts = {"1w": as_of - timedelta(days=7), "ytd": date(as_of.year - 1, 12, 31)}
+    starts.update({window: months_before(as_of, months) for window, months in LADDER_MONTHS.items()})
+    return starts
+
+
+def compute_ladders(entities: np.ndarray, days: np.ndarray, values: np.ndarray, as_of: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Return in percent per window for ``len(as_of)`` entities at once. The
+    observations are parallel arrays (entity index, date ordinal, value)
+    holding each entity's first observation and those within the lookback
+    of its ``as_of`` ordinal and of every window start. NaN where a window
+    reaches back before the history or has no observation near its start.
+
+    The log of the cumulative product of day-over-day growth is kept as
+    one prefix-sum array over all entities, so each window's growth is the
+    difference of two entries. The product telescopes over the days left
+    out, so only the observations at the window edges need to be read
+    """
+    size = len(as_of)
+    keys, unique = np.unique(entities * _DAY_SPAN + days, return_index=True)
+    days, values = days[unique], values[unique]
+    bases = np.arange(size, dtype=np.int64) * _DAY_SPAN
+    firsts = np.searchsorted(keys, bases)
+    ends = np.searchsorted(keys, bases + as_of, side="right") - 1
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.ones(len(values))
+        growth[1:] = values[1:] / values[:-1]
+        # Each entity's chain starts afresh at its first observation
+        growth[firsts[firsts < len(values)]] = 1.0
+        prefix = np.cumsum(np.log(growth))
+
+        starts = {window: np.empty(size, dtype=np.int64) for window in ladder_starts(date.today())}
+        for day in np.unique(as_of):
+            members = as_of == day
+            for window, start in ladder_starts(date.fromordinal(int(day))).items():
+                starts[window][members] = start.toordinal()
+
+        returns = {}
+        for window in LADDER_WINDOWS:
+            if window == "itd":
+                rows, valid = firsts, np.ones(size, dtype=bool)
+            else:
+                if window == "1d":
+                    boundary, rows = as_of, ends - 1
+                else:
+                    boundary = starts[window]
+                    rows = np.searchsorted(keys, bases + boundary, side="right") - 1
+                valid = (rows >= firsts) & (days[np.maximum(rows, 0)] > boundary - NAV_LOOKBACK_DAYS)
+            window_growth = np.exp(prefix[ends] - prefix[np.maximum(rows, 0)])
+            years = ANNUALIZED_YEARS.get(window)
+            if years:
+                window_growth = np.power(window_growth, 1.0 / years)
+            returns[window] = np.where(valid, (window_growth - 1.0) * 100.0, np.nan)
+    return returns
+
+
+def ladder_returns(ladder: Any) -> Optional[Dict[str, Optional[Decimal]]]:
+    """Return per window of a ladder row; None when there is no row"""
+    if ladder is None:
+        return None
+    return {window: getattr(ladder, f"return_{window}") for window in LADDER_WINDOWS}
+
+
+def _percent(value: float) -> Optional[float]:
+    return round(value, 4) if np.isfinite(value) else None
+
+
+@dataclass(frozen=True)
+class LadderSource:
+    """The series a ladder table is computed from"""
+    ladder: Any  # ladder model
+    ladder_key: Any  # its primary key column
+    key: Any  # entity column of the series
+    date: Any
+    value: Any
+
+
+FUND_LADDERS = LadderSource(
+    FundReturnLadder, FundReturnLadder.fund_id,
+    FundPerformance.fund_id, FundPerformance.date, FundPerformance.nav_price,
+)
+# Adjusted closes carry splits and dividends; rows without one fall back to the close
+TICKER_LADDERS = LadderSource(
+    TickerReturnLadder, TickerReturnLadder.ticker,
+    StockPrice.ticker, StockPrice.date, func.coalesce(StockPrice.adjusted_close, StockPrice.close_price),
+)
+
+
+class ReturnLadderService:
+    """Maintains the fund and ticker return ladder tables"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def refresh_fund_ladders(self, fund_ids: Optional[Iterable[int]] = None) -> int:
+        """Rewrite the ladders of ``fund_ids`` (every fund when None). The caller commits"""
+        return await self._refresh(FUND_LADDERS, fund_ids)
+
+    async def refresh_ticker_ladders(self, tickers: Optional[Iterable[str]] = None) -> int:
+        """Rewrite the ladders of ``tickers`` (every ticker when None). The caller commits"""
+        return await self._refresh(TICKER_LADDERS, tickers)
+
+    async def catch_up(self) -> dict:
+        """
+        Rewrite the ladders whose series has a newer day than their as-of
+        date, or that have none yet, and commit. This picks up NAVs and
+        prices loaded outside the services, which refresh their own writes.
+        Skipped while another worker is catching up
+        """
+        started = time.perf_counter()
+        if self.db.get_bind().dialect.name == "postgresql":
+            locked = (await self.db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": LADDER_LOCK_ID})).scalar()
+            if not locked:
+                await self.db.rollback()
+                return {"skipped": True}
+        funds = await self._stale_keys(FUND_LADDERS)
+        tickers = await self._stale_keys(TICKER_LADDERS)
+        if funds:
+            await self.refresh_fund_ladders(funds)
+            await bump(self.db, "performance")
+        if tickers:
+            await self.refresh_ticker_ladders(tickers)
+            await bump(self.db, "daily_returns")
+        await self.db.commit()
+        if funds:
+            invalidate("performance")
+        if tickers:
+            invalidate("daily_returns")
+        return {
+            "funds": len(funds),
+            "tickers": len(tickers),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    async def _stale_keys(self, source: LadderSource) -> List:
+        latest = (
+            select(source.key.label("key"), func.max(source.date).label("as_of"))
+            .group_by(source.key)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(latest.c.key)
+            .outerjoin(source.ladder, source.ladder_key == latest.c.key)
+            .where(or_(source.ladder.as_of.is_(None), source.ladder.as_of != latest.c.as_of))
+        )
+        return result.scalars().all()
+
+    async def _refresh(self, source: LadderSource, keys: Optional[Iterable] = None) -> int:
+        if keys is None:
+            await self.db.execute(delete(source.ladder))
+            batches = [None]
+        else:
+            keys = sorted(set(keys))
+            batches = [keys[i:i + _LADDER_BATCH] for i in range(0, len(keys), _LADDER_BATCH)]
+
+        computed_at = datetime.utcnow()
+        written = 0
+        for batch in batches:
+            if batch is not None:
+                await self.db.execute(delete(source.ladder).where(source.ladder_key.in_(batch)))
+            # Entities ending on the same day (typically a whole nightly load)
+            # share their window boundaries, so they are read together
+            by_as_of = defaultdict(list)
+            for span in await self._spans(source, batch):
+                by_as_of[span.as_of].append(span)
+            for as_of, spans in by_as_of.items():
+                for i in range(0, len(spans), _LADDER_BATCH):
+                    records = await self._ladders(source, as_of, spans[i:i + _LADDER_BATCH], computed_at)
+                    await self.db.execute(source.ladder.__table__.insert(), records)
+                    written += len(records)
+        return written
+
+    async def _spans(self, source: LadderSource, keys: Optional[Sequence]) -> List:
+        """First date and value and last date of each entity's series"""
+        bounds = select(
+            source.key.label("key"),
+            func.min(source.date).label("first_date"),
+            func.max(source.date).label("as_of"),
+        ).group_by(source.key)
+        if keys is not None:
+            bounds = bounds.where(source.key.in_(keys))
+        bounds = bounds.subquery()
+        result = await self.db.execute(
+            select(bounds.c.key, bounds.c.first_date, bounds.c.as_of, source.value.label("first_value"))
+            .select_from(bounds)
+            .join(source.key.table, and_(source.key == bounds.c.key, source.date == bounds.c.first_date))
+        )
+        return result.all()
+
+    async def _ladders(self, source: LadderSource, as_of: date, spans: Sequence, computed_at: datetime) -> List[dict]:
+        """Ladder rows for entities whose series ends on ``as_of``"""
+        lookback = timedelta(days=NAV_LOOKBACK_DAYS - 1)
+        boundaries = [as_of, *ladder_starts(as_of).values()]
+        index = {span.key: i for i, span in enumerate(spans)}
+        result = await self.db.execute(
+            select(source.key, source.date, source.value)
+            .where(
+                source.key.in_(list(index)),
+                or_(*(source.date.between(day - lookback, day) for day in boundaries)),
+            )
+        )
+        rows = result.all()
+
+        entities = np.array([index[row[0]] for row in rows] + list(range(len(spans))), dtype=np.int64)
+        days = np.array([row[1].toordinal() for row in rows] + [span.first_date.toordinal() for span in spans], dtype=np.int64)
+        values = np.array([float(row[2]) for row in rows] + [float(span.first_value) for span in spans], dtype=float)
+        returns = compute_ladders(entities, days, values, np.full(len(spans), as_of.toordinal(), dtype=np.int64))
+
+        return [{
+            source.ladder_key.key: span.key,
+            "as_of": span.as_of,
+            "first_date": span.first_date,
+            **{f"return_{window}": _percent(float(returns[window][i])) for window in LADDER_WINDOWS},
+            "computed_at": computed_at,
+        } for i, span in enumerate(spans)]
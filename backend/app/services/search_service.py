@@ -0,0 +1,363 @@
+"""
+Fund and security search: similarity-ranked matches served by pg_trgm GIN
+indexes, and prefix autocomplete from an in-memory sorted name index
+"""
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, String, case, cast, func, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.cache import cached
+from app.core.config import settings
+from app.core.versioning import version_tracker
+from app.models.fund import Fund
+from app.models.holding import Holding
+from app.services.load_profiles import AGGREGATES, LIST, RETURNS, select_funds
+
+logger = logging.getLogger(__name__)
+
+SEARCH_VERSIONS = ("funds", "holdings")
+
+TRIGRAM_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_funds_name_trgm ON funds USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_funds_manager_trgm ON funds USING gin (manager_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_funds_description_trgm ON funds USING gin (description gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_holdings_ticker_trgm ON holdings USING gin (ticker gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_holdings_company_trgm ON holdings USING gin (company_name gin_trgm_ops)",
+)
+
+# The holdings listing filters the holding_details view while read models are on
+READ_MODEL_TRIGRAM_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_holding_details_ticker_trgm ON holding_details USING gin (ticker gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_holding_details_company_trgm ON holding_details USING gin (company_name gin_trgm_ops)",
+)
+
+# A name match outranks the same match on the manager, and both outrank
+# a word somewhere in the description
+MANAGER_WEIGHT = 0.8
+DESCRIPTION_WEIGHT = 0.5
+
+
+class TrigramSearch:
+    """
+    Owns the pg_trgm extension and GIN indexes. While ``enabled`` searches
+    also match misspellings and rank by trigram similarity; otherwise (e.g.
+    under SQLite) they fall back to substring matches ranked by position
+    """
+
+    def __init__(self):
+        self.enabled = False
+
+    async def setup(self, bind: AsyncEngine) -> bool:
+        """Create the extension and any missing indexes (PostgreSQL only)"""
+        self.enabled = False
+        if not settings.TRIGRAM_SEARCH_ENABLED or bind.dialect.name != "postgresql":
+            return False
+
+        try:
+            async with bind.begin() as conn:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception:
+            logger.warning("pg_trgm is not available; search falls back to substring matches", exc_info=True)
+            return False
+
+        async with bind.begin() as conn:
+            for ddl in TRIGRAM_INDEXES:
+                await conn.execute(text(ddl))
+            if (await conn.execute(text("SELECT to_regclass('holding_details')"))).scalar() is not None:
+                for ddl in READ_MODEL_TRIGRAM_INDEXES:
+                    await conn.execute(text(ddl))
+
+        self.enabled = True
+        return True
+
+
+trigram_search = TrigramSearch()
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _position_score(query: str, pattern: str, *columns: Tuple):
+    """
+    Ranking without pg_trgm for ``(column, weight)`` pairs: an exact match
+    scores the weight, a prefix 0.9 and a substring 0.7 of it. The
+    conditions are ordered by score, so the first that holds is the best
+    """
+    lowered, prefix = query.lower(), pattern[1:].lower()
+    whens = []
+    for column, weight in columns:
+        whens += [
+            (func.lower(column) == lowered, weight),
+            (func.lower(column).like(prefix, escape="\\"), 0.9 * weight),
+            (column.ilike(pattern, escape="\\"), 0.7 * weight),
+        ]
+    whens.sort(key=lambda when: -when[1])
+    return case(*whens, else_=0.0)
+
+
+def fund_match(query: str) -> Tuple:
+    """
+    Filter and relevance score (0 to 1) for funds matching ``query`` in
+    name, manager or description. With pg_trgm both are served by the GIN
+    indexes and the score is word similarity, so misspellings match too
+    """
+    query = query.strip()
+    pattern = _like_pattern(query)
+    columns = (Fund.name, Fund.manager_name, Fund.description)
+    substring = [column.ilike(pattern, escape="\\") for column in columns]
+    if not trigram_search.enabled:
+        score = _position_score(
+            query, pattern, (Fund.name, 1.0), (Fund.manager_name, MANAGER_WEIGHT), (Fund.description, DESCRIPTION_WEIGHT),
+        )
+        return or_(*substring), score
+
+    term = cast(literal(query), String)
+    fuzzy = [term.bool_op("<%")(column) for column in columns]
+    score = func.greatest(
+        func.word_similarity(term, Fund.name),
+        func.word_similarity(term, Fund.manager_name) * MANAGER_WEIGHT,
+        func.word_similarity(term, Fund.description) * DESCRIPTION_WEIGHT,
+    )
+    return or_(*substring, *fuzzy), score
+
+
+def holding_match(query: str) -> Tuple:
+    """
+    Filter and relevance score for holdings matching ``query`` by ticker or
+    company name; an exact ticker scores 1
+    """
+    query = query.strip()
+    pattern = _like_pattern(query)
+    substring = [Holding.ticker.ilike(pattern, escape="\\"), Holding.company_name.ilike(pattern, escape="\\")]
+    exact = Holding.ticker == query.upper()
+    if not trigram_search.enabled:
+        score = case((exact, 1.0), else_=_position_score(query, pattern, (Holding.ticker, 0.95), (Holding.company_name, 1.0)))
+        return or_(*substring), score
+
+    term = cast(literal(query), String)
+    fuzzy = [term.bool_op("<%")(Holding.ticker), term.bool_op("<%")(Holding.company_name)]
+    score = case(
+        (exact, 1.0),
+        else_=func.greatest(
+            func.similarity(Holding.ticker, term) * 0.95,
+            func.word_similarity(term, Holding.company_name),
+        ),
+    )
+    return or_(*substring, *fuzzy), score
+
+
+async def set_similarity_threshold(db: AsyncSession) -> None:
+    """Apply SEARCH_SIMILARITY_THRESHOLD to the ``<%`` operator for this transaction"""
+    if trigram_search.enabled:
+        await db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(settings.SEARCH_SIMILARITY_THRESHOLD)},
+        )
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+@dataclass
+class AutocompleteIndex:
+    """
+    Sorted keys for prefix lookups. ``start_keys`` hold whole names,
+    managers, tickers and company names; ``word_keys`` the same strings
+    from each later word on, so "growth" finds "Alpha Growth Fund" after
+    every name starting with it. Refs are (item, matched field)
+    """
+    versions: Dict[str, int]
+    items: List[dict]
+    start_keys: List[str]
+    start_refs: List[Tuple[int, str]]
+    word_keys: List[str]
+    word_refs: List[Tuple[int, str]]
+    build_ms: float
+
+    def complete(self, prefix: str, limit: int) -> List[dict]:
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        seen, suggestions = set(), []
+        for keys, refs in ((self.start_keys, self.start_refs), (self.word_keys, self.word_refs)):
+            position = bisect.bisect_left(keys, prefix)
+            while position < len(keys) and len(suggestions) < limit and keys[position].startswith(prefix):
+                item, field = refs[position]
+                if item not in seen:
+                    seen.add(item)
+                    suggestions.append({**self.items[item], "match": field})
+                position += 1
+        return suggestions
+
+
+def build_autocomplete_index(funds: Sequence, securities: Sequence, versions: Dict[str, int]) -> AutocompleteIndex:
+    """Index fund (id, name, manager) and security (ticker, company, fund count) rows"""
+    started = time.perf_counter()
+    items, starts, words = [], [], []
+
+    def add(item: int, field: str, value: Optional[str]) -> None:
+        if not value:
+            return
+        key = _normalize(value)
+        starts.append((key, item, field))
+        parts = key.split(" ")
+        for i in range(1, len(parts)):
+            words.append((" ".join(parts[i:]), item, field))
+
+    for fund_id, name, manager in funds:
+        items.append({"kind": "fund", "fund_id": fund_id, "ticker": None, "label": name, "detail": manager})
+        add(len(items) - 1, "name", name)
+        add(len(items) - 1, "manager", manager)
+    for ticker, company, fund_count in securities:
+        items.append({
+            "kind": "security", "fund_id": None, "ticker": ticker, "label": ticker,
+            "detail": company, "fund_count": fund_count,
+        })
+        add(len(items) - 1, "ticker", ticker)
+        add(len(items) - 1, "company", company)
+
+    starts.sort()
+    words.sort()
+    return AutocompleteIndex(
+        versions=versions,
+        items=items,
+        start_keys=[key for key, _, _ in starts],
+        start_refs=[(item, field) for _, item, field in starts],
+        word_keys=[key for key, _, _ in words],
+        word_refs=[(item, field) for _, item, field in words],
+        build_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+class AutocompleteIndexCache:
+    """
+    Holds the current autocomplete index per process, rebuilt in a worker
+    thread once the funds or holdings versions move
+    """
+
+    def __init__(self):
+        self.index: Optional[AutocompleteIndex] = None
+        self.builds = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def get(self, db: AsyncSession) -> AutocompleteIndex:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        versions = await version_tracker.get(db, SEARCH_VERSIONS)
+        if self.index is not None and self.index.versions == versions:
+            return self.index
+        async with self._lock:
+            # Another request may have rebuilt it while this one waited
+            if self.index is None or self.index.versions != versions:
+                funds = (await db.execute(select(Fund.id, Fund.name, Fund.manager_name))).all()
+                securities = (await db.execute(
+                    select(Holding.ticker, func.max(Holding.company_name), func.count(func.distinct(Holding.fund_id)))
+                    .group_by(Holding.ticker)
+                )).all()
+                self.index = await asyncio.to_thread(build_autocomplete_index, funds, securities, versions)
+                self.builds += 1
+        return self.index
+
+    def clear(self) -> None:
+        self.index = None
+
+    def stats(self) -> dict:
+        index = self.index
+        return {
+            "builds": self.builds,
+            "entries": len(index.start_keys) + len(index.word_keys) if index else 0,
+            "build_ms": index.build_ms if index else None,
+            "trigram": trigram_search.enabled,
+        }
+
+
+autocomplete_index = AutocompleteIndexCache()
+
+
+class SearchService:
+    """Ranked fund and security search and prefix autocomplete"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search_funds(self, query: str, limit: int = 10) -> List[Fund]:
+        """Funds matching ``query``, most relevant first"""
+        match, score = fund_match(query)
+        await set_similarity_threshold(self.db)
+        result = await self.db.execute(
+            select_funds(LIST, AGGREGATES, RETURNS).where(match).order_by(score.desc(), Fund.name).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def search_holdings(self, query: str, limit: int = 50) -> List[Holding]:
+        """Holdings matching ``query`` by ticker or company name, most relevant first"""
+        match, score = holding_match(query)
+        await set_similarity_threshold(self.db)
+        result = await self.db.execute(
+            select(Holding)
+            .options(selectinload(Holding.fund))
+            .where(match)
+            .order_by(score.desc(), Holding.ticker, Holding.fund_id).limit(limit)
+        )
+        return result.scalars().all()
+
+    @cached("search", tags=lambda **_: ["funds", "holdings"])
+    async def search(self, query: str, limit: int = 10) -> dict:
+        """Funds and held securities matching ``query``, each ranked by relevance"""
+        fund_filter, fund_score = fund_match(query)
+        holding_filter, holding_score = holding_match(query)
+        await set_similarity_threshold(self.db)
+
+        fund_score = cast(fund_score, Float).label("score")
+        funds = (await self.db.execute(
+            select(Fund.id, Fund.name, Fund.manager_name, Fund.strategy, fund_score)
+            .where(fund_filter)
+            .order_by(fund_score.desc(), Fund.name)
+            .limit(limit)
+        )).all()
+
+        security_score = cast(func.max(holding_score), Float).label("score")
+        securities = (await self.db.execute(
+            select(
+                Holding.ticker,
+                func.max(Holding.company_name),
+                func.count(func.distinct(Holding.fund_id)),
+                security_score,
+            )
+            .where(holding_filter)
+            .group_by(Holding.ticker)
+            .order_by(security_score.desc(), Holding.ticker)
+            .limit(limit)
+        )).all()
+
+        return {
+            "query": query,
+            "funds": [{
+                "fund_id": fund_id,
+                "name": name,
+                "manager_name": manager,
+                "strategy": strategy,
+                "score": round(score, 4),
+            } for fund_id, name, manager, strategy, score in funds],
+            "securities": [{
+                "ticker": ticker,
+                "company_name": company,
+                "fund_count": fund_count,
+                "score": round(score, 4),
+            } for ticker, company, fund_count, score in securities],
+        }
+
+    async def autocomplete(self, prefix: str, limit: int = 10) -> dict:
+        """Funds and securities whose name, manager, ticker or company starts with ``prefix``"""
+        index = await autocomplete_index.get(self.db)
+        return {"query": prefix, "suggestions": index.complete(prefix, limit)}
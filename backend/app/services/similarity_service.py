@@ -0,0 +1,306 @@
+"""
+Pairwise fund similarity: weighted overlap, cosine similarity and common
+holdings for every pair of funds, from one pass over the position matrix
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.versioning import version_tracker
+from app.services.exposure_service import PositionMatrix, position_matrix
+
+# The index follows the books rather than the marks: it is rebuilt when
+# funds or holdings change (and daily), weighted at the prices of the time
+SIMILARITY_VERSIONS = ("funds", "holdings")
+
+METRICS = ("overlap", "cosine", "common")
+
+
+class PairKernel:
+    """
+    The sparse product W @ W.T carried out explicitly. Each position of a
+    fund is paired with the positions other funds hold in the same ticker
+    (read from the CSC columns) and the pairs are summed per fund pair
+    under three reductions at once: min(a, b) of portfolio weights for the
+    overlap, a * b of L2-normalised market values for cosine, and 1 for
+    the count
+    """
+
+    def __init__(self, matrix: PositionMatrix):
+        csr = matrix.values
+        csc = matrix.values_csc if matrix.values_csc.has_sorted_indices else matrix.values_csc.sorted_indices()
+        with np.errstate(divide="ignore"):
+            inverse_norms = np.where(matrix.value_norms > 0, 1.0 / matrix.value_norms, 0.0)
+
+        self.funds = csr.shape[0]
+        self.csr_indptr, self.csr_columns = csr.indptr, csr.indices
+        self.csr_rows = np.repeat(np.arange(self.funds), np.diff(csr.indptr))
+        self.csr_weights = csr.data * matrix.inverse_totals[self.csr_rows]
+        self.csr_units = csr.data * inverse_norms[self.csr_rows]
+        self.csc_indptr, self.csc_rows = csc.indptr, csc.indices
+        self.csc_weights = csc.data * matrix.inverse_totals[csc.indices]
+        self.csc_units = csc.data * inverse_norms[csc.indices]
+
+    def row_costs(self) -> np.ndarray:
+        """Position pairs each fund expands to against every fund"""
+        holders = np.diff(self.csc_indptr)[self.csr_columns]
+        return np.bincount(self.csr_rows, weights=holders, minlength=self.funds)
+
+    def block(self, rows: np.ndarray, first: np.ndarray, offset: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Overlap, cosine and common count of ``rows`` against funds
+        ``offset`` onwards, as dense ``len(rows) x (funds - offset)``
+        arrays. ``first[t]`` is the CSC position of the first holder of
+        ticker ``t`` at or after ``offset``
+        """
+        starts, stops = self.csr_indptr[rows], self.csr_indptr[rows + 1]
+        counts = stops - starts
+        entries = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+        columns = self.csr_columns[entries]
+
+        lengths = self.csc_indptr[columns + 1] - first[columns]
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(first[columns] - offsets, lengths) + np.arange(int(lengths.sum()))
+
+        width = self.funds - offset
+        size = len(rows) * width
+        pairs = np.repeat(np.repeat(np.arange(len(rows)) * width, counts), lengths) + (self.csc_rows[positions] - offset)
+        overlap = np.bincount(
+            pairs, np.minimum(np.repeat(self.csr_weights[entries], lengths), self.csc_weights[positions]), size,
+        )
+        cosine = np.bincount(pairs, np.repeat(self.csr_units[entries], lengths) * self.csc_units[positions], size)
+        common = np.bincount(pairs, minlength=size)
+        shape = (len(rows), width)
+        return overlap.reshape(shape), cosine.reshape(shape), common.reshape(shape)
+
+
+def _chunks(costs: np.ndarray, budget: int) -> Iterator[Tuple[int, int]]:
+    """
+    Consecutive row ranges that each expand to about ``budget`` position
+    pairs and hold at most ``budget`` dense result cells
+    """
+    funds = len(costs)
+    cumulative = np.cumsum(costs)
+    step = max(1, budget // max(funds, 1))
+    start = 0
+    while start < funds:
+        spent = cumulative[start - 1] if start else 0
+        stop = max(start + 1, int(np.searchsorted(cumulative, spent + budget, side="right")))
+        stop = min(funds, start + step, stop)
+        yield start, stop
+        start = stop
+
+
+class _TopK:
+    """Running ``k`` best candidates per fund for one metric"""
+
+    def __init__(self, funds: int, k: int):
+        self.k = k
+        self.ids = np.full((funds, k), -1, dtype=np.int64)
+        self.scores = np.full((funds, k), -np.inf)
+        self.values = np.zeros((funds, k, 3))
+
+    def merge(self, offset: int, ids: np.ndarray, scores: np.ndarray, values: np.ndarray) -> None:
+        """Fold candidates for funds ``offset`` onwards (one row each) into their best ``k``"""
+        if scores.shape[1] > self.k:
+            keep = np.argpartition(-scores, self.k - 1, axis=1)[:, :self.k]
+            ids, scores = np.take_along_axis(ids, keep, axis=1), np.take_along_axis(scores, keep, axis=1)
+            values = np.take_along_axis(values, keep[..., None], axis=1)
+        # Only funds with a candidate beating their current k-th best change
+        floor = self.scores[offset:offset + len(scores)].min(axis=1)
+        changed = np.flatnonzero((scores > floor[:, None]).any(axis=1))
+        if not len(changed):
+            return
+        target = offset + changed
+        ids = np.concatenate((self.ids[target], ids[changed]), axis=1)
+        scores = np.concatenate((self.scores[target], scores[changed]), axis=1)
+        values = np.concatenate((self.values[target], values[changed]), axis=1)
+        keep = np.argpartition(-scores, self.k - 1, axis=1)[:, :self.k]
+        self.ids[target] = np.take_along_axis(ids, keep, axis=1)
+        self.scores[target] = np.take_along_axis(scores, keep, axis=1)
+        self.values[target] = np.take_along_axis(values, keep[..., None], axis=1)
+
+    def ranked(self) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(-self.scores, axis=1, kind="stable")
+        ids = np.take_along_axis(self.ids, order, axis=1)
+        valid = np.isfinite(np.take_along_axis(self.scores, order, axis=1))
+        return np.where(valid, ids, -1).astype(np.int32), np.take_along_axis(self.values, order[..., None], axis=1)
+
+
+@dataclass
+class SimilarityIndex:
+    """
+    The ``k`` most similar funds of every fund under each metric, with all
+    three metrics for each of those pairs
+    """
+    matrix: PositionMatrix
+    kernel: PairKernel
+    k: int
+    neighbours: Dict[str, np.ndarray]  # metric -> funds x k matrix rows, -1 padded
+    values: Dict[str, np.ndarray]  # metric -> funds x k x (overlap, cosine, common)
+    versions: Dict[str, int]
+    built_on: date
+    build_ms: float
+
+    def top(self, fund_id: int, metric: str, limit: int) -> Optional[List[dict]]:
+        row = self.matrix.fund_index.get(fund_id)
+        if row is None:
+            return None
+        result = []
+        for rank, other in enumerate(self.neighbours[metric][row, :limit].tolist()):
+            if other < 0:
+                break
+            overlap, cosine, common = self.values[metric][row, rank].tolist()
+            result.append({
+                "fund_id": int(self.matrix.fund_ids[other]),
+                "fund_name": self.matrix.fund_names[other],
+                "weighted_overlap": round(overlap * 100.0, 4),
+                "cosine_similarity": round(cosine, 6),
+                "common_holdings": int(common),
+            })
+        return result
+
+
+def build_similarity_index(matrix: PositionMatrix, versions: Dict[str, int], k: int, budget: int) -> SimilarityIndex:
+    """
+    Top-``k`` neighbours per fund and metric. Each chunk of funds is
+    paired with itself and the funds after it only; the block serves the
+    chunk's rows directly and, transposed, the later funds' rows, so every
+    pair is computed once and memory stays bounded by ``budget``
+    """
+    started = time.perf_counter()
+    kernel = PairKernel(matrix)
+    funds = matrix.shape[0]
+    k = max(0, min(k, funds - 1))
+    best = {metric: _TopK(funds, k) for metric in METRICS}
+    first = kernel.csc_indptr[:-1].copy()
+
+    for start, stop in _chunks(kernel.row_costs(), budget) if k else ():
+        rows = np.arange(start, stop)
+        overlap, cosine, common = kernel.block(rows, first, start)
+        # CSC rows are sorted, so skipping the chunk's own positions leaves
+        # each column starting at its first holder after the chunk
+        first += np.bincount(kernel.csr_columns[kernel.csr_indptr[start]:kernel.csr_indptr[stop]], minlength=len(first))
+
+        values = np.stack((overlap, cosine, common), axis=-1)
+        local = np.arange(len(rows))
+        later = stop - start
+        for metric, scores in zip(METRICS, (overlap, cosine, common)):
+            # Funds without a common holding, and the fund itself, never qualify
+            scores = np.where(common > 0, scores, -np.inf)
+            scores[local, local] = -np.inf
+            best[metric].merge(start, np.broadcast_to(np.arange(start, funds), scores.shape), scores, values)
+            best[metric].merge(
+                stop,
+                np.broadcast_to(rows, (funds - stop, len(rows))),
+                scores[:, later:].T,
+                values[:, later:].transpose(1, 0, 2),
+            )
+
+    neighbours, values = {}, {}
+    for metric in METRICS:
+        neighbours[metric], values[metric] = best[metric].ranked()
+    return SimilarityIndex(
+        matrix=matrix,
+        kernel=kernel,
+        k=k,
+        neighbours=neighbours,
+        values=values,
+        versions=versions,
+        built_on=date.today(),
+        build_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+class SimilarityIndexCache:
+    """
+    Holds the current index per process. It is rebuilt, in a worker thread
+    so the event loop keeps serving, once the funds or holdings versions
+    move or the day changes
+    """
+
+    def __init__(self):
+        self.index: Optional[SimilarityIndex] = None
+        self.builds = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _current(self, versions: Dict[str, int]) -> bool:
+        return self.index is not None and self.index.versions == versions and self.index.built_on == date.today()
+
+    async def get(self, db: AsyncSession) -> SimilarityIndex:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        versions = await version_tracker.get(db, SIMILARITY_VERSIONS)
+        if self._current(versions):
+            return self.index
+        async with self._lock:
+            # Another request may have rebuilt it while this one waited
+            if not self._current(versions):
+                matrix = await position_matrix.get(db)
+                self.index = await asyncio.to_thread(
+                    build_similarity_index, matrix, versions,
+                    settings.SIMILARITY_TOP_K, settings.SIMILARITY_CHUNK_PAIRS,
+                )
+                self.builds += 1
+        return self.index
+
+    def clear(self) -> None:
+        self.index = None
+
+    def stats(self) -> dict:
+        index = self.index
+        return {
+            "builds": self.builds,
+            "k": index.k if index else None,
+            "built_on": index.built_on if index else None,
+            "build_ms": index.build_ms if index else None,
+        }
+
+
+similarity_index = SimilarityIndexCache()
+
+
+class SimilarityService:
+    """Fund similarity lookups over the cached index"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_similar_funds(self, fund_id: int, metric: str = "overlap", limit: int = 10) -> Optional[dict]:
+        """The funds most similar to ``fund_id`` under ``metric``"""
+        index = await similarity_index.get(self.db)
+        similar = index.top(fund_id, metric, limit)
+        if similar is None:
+            return None
+        matrix = index.matrix
+        row = matrix.fund_index[fund_id]
+        return {
+            "fund_id": fund_id,
+            "fund_name": matrix.fund_names[row],
+            "metric": metric,
+            "holdings_count": int(matrix.values.indptr[row + 1] - matrix.values.indptr[row]),
+            "priced_at": matrix.priced_at,
+            "similar": similar,
+        }
+
+    async def get_similarity_matrix(self, fund_ids: Sequence[int]) -> dict:
+        """All three metrics for every pair among ``fund_ids``, unknown ids skipped"""
+        index = await similarity_index.get(self.db)
+        matrix, kernel = index.matrix, index.kernel
+        rows = matrix.rows(list(dict.fromkeys(fund_ids)))
+        overlap, cosine, common = kernel.block(rows, kernel.csc_indptr[:-1], 0)
+        overlap, cosine, common = overlap[:, rows], cosine[:, rows], common[:, rows]
+        return {
+            "fund_ids": matrix.fund_ids[rows].tolist(),
+            "fund_names": [matrix.fund_names[i] for i in rows],
+            "priced_at": matrix.priced_at,
+            "weighted_overlap": np.round(overlap * 100.0, 4).tolist(),
+            "cosine_similarity": np.round(cosine, 6).tolist(),
+            "common_holdings": common.tolist(),
+        }
@@ -1,14 +1,183 @@
 """
 Stock price service for database operations
 """
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List, Optional
-from sqlalchemy import select, func, and_, desc, asc
+import codecs
+import csv
+from collections import defaultdict
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from sqlalchemy import select, func, and_, desc, asc, text, tuple_, delete, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.core.cache import cached, invalidate
+from app.core.pagination import Keyset, SortKey
+from app.core.read_models import read_models
+from app.core.versioning import bump
+from app.models.daily_return import DailyReturn
+from app.models.holding import Holding
 from app.models.stock_price import StockPrice
 from app.schemas.stock_price import StockPriceCreate, StockPriceUpdate
+from app.services.downsampling import lttb_indices, ohlc_buckets
+from app.services.loaders import get_loaders
+from app.services.return_ladder_service import ReturnLadderService
+
+
+# Column order of rows accepted by bulk_upsert_prices
+PRICE_ROW_COLUMNS = (
+    "ticker", "date", "open_price", "high_price", "low_price",
+    "close_price", "volume", "adjusted_close",
+)
+
+# Listing order shared by offset and cursor pagination
+PRICE_KEYSET = Keyset(
+    SortKey("date", StockPrice.date, descending=True),
+    SortKey("ticker", StockPrice.ticker),
+)
+
+PriceRow = Tuple[str, date, Decimal, Decimal, Decimal, Decimal, int, Optional[Decimal]]
+
+_CREATE_STAGING_SQL = text("""
+    CREATE TEMP TABLE IF NOT EXISTS stock_prices_staging (
+        seq INTEGER NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        date DATE NOT NULL,
+        open_price NUMERIC(10, 4),
+        high_price NUMERIC(10, 4),
+        low_price NUMERIC(10, 4),
+        close_price NUMERIC(10, 4),
+        volume BIGINT,
+        adjusted_close NUMERIC(10, 4)
+    ) ON COMMIT DELETE ROWS
+""")
+
+# Deduplicate the staged chunk (last row wins), drop rows that would violate
+# the stock_prices check constraints and upsert the rest in one statement.
+_UPSERT_STAGING_SQL = text("""
+    WITH deduped AS (
+        SELECT DISTINCT ON (ticker, date) *
+        FROM stock_prices_staging
+        ORDER BY ticker, date, seq DESC
+    ),
+    valid AS (
+        SELECT * FROM deduped
+        WHERE open_price > 0 AND high_price > 0 AND low_price > 0 AND close_price > 0
+          AND volume >= 0
+          AND (adjusted_close IS NULL OR adjusted_close > 0)
+          AND low_price <= open_price AND low_price <= close_price
+          AND open_price <= high_price AND close_price <= high_price
+    ),
+    upserted AS (
+        INSERT INTO stock_prices (
+            ticker, date, open_price, high_price, low_price,
+            close_price, volume, adjusted_close, created_at
+        )
+        SELECT ticker, date, open_price, high_price, low_price,
+               close_price, volume, adjusted_close, :created_at
+        FROM valid
+        ON CONFLICT (ticker, date) DO UPDATE SET
+            open_price = EXCLUDED.open_price,
+            high_price = EXCLUDED.high_price,
+            low_price = EXCLUDED.low_price,
+            close_price = EXCLUDED.close_price,
+            volume = EXCLUDED.volume,
+            adjusted_close = EXCLUDED.adjusted_close
+        RETURNING ticker, date, (xmax = 0) AS inserted
+    )
+    SELECT
+        ticker,
+        min(date) AS earliest,
+        count(*) FILTER (WHERE inserted) AS inserted,
+        count(*) FILTER (WHERE NOT inserted) AS updated
+    FROM upserted
+    GROUP BY ticker
+""")
+
+
+def _is_valid_price_row(row: PriceRow) -> bool:
+    """Mirror of the stock_prices check constraints"""
+    _, _, open_p, high, low, close, volume, adjusted = row
+    return (
+        open_p > 0 and high > 0 and low > 0 and close > 0 and volume >= 0
+        and (adjusted is None or adjusted > 0)
+        and low <= open_p and low <= close and open_p <= high and close <= high
+    )
+
+
+async def _iterate(rows):
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+def _parse_decimal(value: str) -> Optional[Decimal]:
+    return Decimal(value) if value not in ("", None) else None
+
+
+# Tickers per daily-returns refresh statement, well inside bind parameter limits
+_DAILY_RETURNS_BATCH = 5_000
+
+
+async def parse_price_csv(
+    chunks: AsyncIterable[bytes],
+    errors: List[str],
+    max_errors: int = 100,
+) -> AsyncIterable[PriceRow]:
+    """
+    Parse a streamed CSV body with a header row naming PRICE_ROW_COLUMNS.
+
+    Unparseable rows are yielded as ``None`` so bulk_upsert_prices counts
+    them as rejected; the first ``max_errors`` are described in ``errors``.
+    """
+    header: Optional[List[str]] = None
+    buffer = ""
+    line_number = 0
+
+    async def lines():
+        nonlocal buffer
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *complete, buffer = buffer.split("\n")
+            for line in complete:
+                yield line
+        buffer += decoder.decode(b"", final=True)
+        if buffer:
+            yield buffer
+
+    async for line in lines():
+        line_number += 1
+        if not line.strip():
+            continue
+        fields = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip().lower() for name in fields]
+            missing = set(PRICE_ROW_COLUMNS[:7]) - set(header)
+            if missing:
+                raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+            continue
+
+        try:
+            record = dict(zip(header, fields))
+            yield (
+                record["ticker"].upper().strip(),
+                date.fromisoformat(record["date"]),
+                Decimal(record["open_price"]),
+                Decimal(record["high_price"]),
+                Decimal(record["low_price"]),
+                Decimal(record["close_price"]),
+                int(record["volume"]),
+                _parse_decimal(record.get("adjusted_close", "")),
+            )
+        except (KeyError, ValueError, ArithmeticError) as e:
+            if len(errors) < max_errors:
+                errors.append(f"line {line_number}: {e}")
+            yield None
 
 
 class StockPriceService:
@@ -16,15 +185,12 @@ class StockPriceService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.loaders = get_loaders(db)
     
-    async def get_stock_prices(self, skip: int = 0, limit: int = 100) -> List[StockPrice]:
-        """Get all stock prices with pagination"""
-        query = (
-            select(StockPrice)
-            .offset(skip)
-            .limit(limit)
-            .order_by(desc(StockPrice.date), StockPrice.ticker)
-        )
+    @cached("stock_prices", tags=lambda **_: ["stock_prices"])
+    async def get_stock_prices(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[StockPrice]:
+        """Get all stock prices with pagination, starting after ``cursor`` when given"""
+        query = PRICE_KEYSET.apply(select(StockPrice), cursor).offset(skip).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()
     
@@ -34,12 +200,14 @@ class StockPriceService:
         result = await self.db.execute(query)
         return result.scalars().first()
     
+    @cached("stock_prices", tags=lambda ticker, **_: [f"ticker:{ticker.upper()}"])
     async def get_stock_prices_by_ticker(
         self, 
         ticker: str, 
         start_date: Optional[date] = None, 
         end_date: Optional[date] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[StockPrice]:
         """Get stock prices for a specific ticker with optional date range"""
         query = select(StockPrice).where(StockPrice.ticker == ticker.upper())
@@ -49,51 +217,97 @@ class StockPriceService:
         if end_date:
             query = query.where(StockPrice.date <= end_date)
         
-        query = query.order_by(desc(StockPrice.date)).limit(limit)
+        query = PRICE_KEYSET.apply(query, cursor).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()
     
-    async def get_latest_price(self, ticker: str) -> Optional[StockPrice]:
-        """Get the latest price for a ticker"""
+    @cached("stock_prices", tags=lambda ticker, **_: [f"ticker:{ticker.upper()}"])
+    async def get_price_history(
+        self,
+        ticker: str,
+        start_date: date,
+        end_date: date,
+        max_points: Optional[int] = None,
+        method: str = "ohlc",
+    ) -> dict:
+        """
+        Get a ticker's daily prices between two dates, newest first.
+
+        When there are more than ``max_points`` rows the series is reduced:
+        ``lttb`` keeps the most shape-relevant daily rows in ``prices``, and
+        ``ohlc`` aggregates consecutive days into ``bars`` (``prices`` is then
+        empty).
+        """
         query = (
             select(StockPrice)
-            .where(StockPrice.ticker == ticker.upper())
-            .order_by(desc(StockPrice.date))
-            .limit(1)
+            .where(
+                StockPrice.ticker == ticker.upper(),
+                StockPrice.date >= start_date,
+                StockPrice.date <= end_date,
+            )
+            .order_by(asc(StockPrice.date))
         )
         result = await self.db.execute(query)
-        return result.scalars().first()
+        prices = result.scalars().all()
+        history = {"total_records": len(prices), "prices": prices[::-1], "bars": None, "downsampled": None}
+        
+        if not max_points or len(prices) <= max_points:
+            return history
+        
+        if method == "lttb":
+            keep = lttb_indices(
+                np.array([price.date.toordinal() for price in prices], dtype=float),
+                np.array([float(price.close_price) for price in prices]),
+                max_points,
+            )
+            history["prices"] = [prices[i] for i in keep[::-1]]
+        else:
+            buckets = ohlc_buckets(
+                np.array([price.open_price for price in prices], dtype=object),
+                np.array([price.high_price for price in prices], dtype=object),
+                np.array([price.low_price for price in prices], dtype=object),
+                np.array([price.close_price for price in prices], dtype=object),
+                np.array([price.volume for price in prices], dtype=np.int64),
+                max_points,
+            )
+            bars = [
+                {
+                    "date": prices[first].date,
+                    "end_date": prices[last].date,
+                    "open_price": open_price,
+                    "high_price": high,
+                    "low_price": low,
+                    "close_price": close,
+                    "volume": int(volume),
+                    "records": int(last - first + 1),
+                }
+                for first, last, open_price, high, low, close, volume in zip(
+                    buckets["start"].tolist(), buckets["end"].tolist(),
+                    buckets["open"], buckets["high"], buckets["low"],
+                    buckets["close"], buckets["volume"],
+                )
+            ]
+            history["prices"] = []
+            history["bars"] = bars[::-1]
+        
+        history["downsampled"] = method
+        return history
+    
+    @cached("stock_prices", tags=lambda ticker: [f"ticker:{ticker.upper()}"])
+    async def get_latest_price(self, ticker: str) -> Optional[StockPrice]:
+        """Get the latest price for a ticker"""
+        return await self.loaders.latest_price.load(ticker.upper())
     
+    @cached("stock_prices", tags=lambda tickers: [f"ticker:{t.upper()}" for t in tickers])
     async def get_latest_prices(self, tickers: List[str]) -> List[StockPrice]:
         """Get latest prices for multiple tickers"""
         if not tickers:
             return []
         
-        # This is a complex query to get latest price for each ticker
-        # Using a subquery to get the max date for each ticker
-        subquery = (
-            select(
-                StockPrice.ticker,
-                func.max(StockPrice.date).label('max_date')
-            )
-            .where(StockPrice.ticker.in_([t.upper() for t in tickers]))
-            .group_by(StockPrice.ticker)
-            .subquery()
-        )
-        
-        query = (
-            select(StockPrice)
-            .join(
-                subquery,
-                and_(
-                    StockPrice.ticker == subquery.c.ticker,
-                    StockPrice.date == subquery.c.max_date
-                )
-            )
-            .order_by(StockPrice.ticker)
-        )
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        # One DISTINCT ON query resolves every ticker in the batch
+        unique_tickers = sorted({t.upper() for t in tickers})
+        prices = await self.loaders.latest_price.load_many(unique_tickers)
+        return [price for price in prices if price is not None]
     
     async def create_stock_price(self, price_data: StockPriceCreate) -> StockPrice:
         """Create a new stock price record"""
@@ -101,8 +315,13 @@ class StockPriceService:
         price = StockPrice(**price_dict)
         
         self.db.add(price)
+        await self.db.flush()
+        await self._refresh_returns({price.ticker: price.date})
+        await self._bump(price.ticker)
         await self.db.commit()
         await self.db.refresh(price)
+        self.loaders.clear()
+        self._invalidate(price.ticker)
         return price
     
     async def update_stock_price(self, price_id: int, price_data: StockPriceUpdate) -> Optional[StockPrice]:
@@ -115,8 +334,13 @@ class StockPriceService:
         for field, value in update_data.items():
             setattr(price, field, value)
         
+        await self.db.flush()
+        await self._refresh_returns({price.ticker: price.date})
+        await self._bump(price.ticker)
         await self.db.commit()
         await self.db.refresh(price)
+        self.loaders.clear()
+        self._invalidate(price.ticker)
         return price
     
     async def delete_stock_price(self, price_id: int) -> bool:
@@ -125,10 +349,226 @@ class StockPriceService:
         if not price:
             return False
         
+        ticker = price.ticker
+        price_date = price.date
         await self.db.delete(price)
+        await self.db.flush()
+        await self._refresh_returns({ticker: price_date})
+        await self._bump(ticker)
         await self.db.commit()
+        self.loaders.clear()
+        self._invalidate(ticker)
         return True
     
+    async def _bump(self, *tickers: str) -> None:
+        """Advance the data versions a price change for these tickers affects"""
+        await bump(self.db, "stock_prices", "tickers", "daily_returns", *(f"ticker:{t}" for t in tickers))
+    
+    @staticmethod
+    def _invalidate(ticker: str) -> None:
+        """Drop cached reads affected by a price change for one ticker"""
+        invalidate("stock_prices", f"ticker:{ticker}", "tickers", "daily_returns")
+        read_models.schedule_refresh()
+    
+    async def bulk_upsert_prices(
+        self,
+        rows: Union[Iterable[Optional[PriceRow]], AsyncIterable[Optional[PriceRow]]],
+        chunk_size: int = 50_000,
+    ) -> dict:
+        """
+        Insert or update many price rows keyed on (ticker, date).
+
+        Under PostgreSQL each chunk is COPYed into a temporary staging table
+        and merged with a single INSERT ... ON CONFLICT statement. Rows that
+        would violate the table's check constraints, and earlier duplicates
+        of the same (ticker, date), are counted as rejected, as are ``None``
+        placeholders for rows the caller failed to parse.
+        """
+        totals = {"total": 0, "inserted": 0, "updated": 0, "rejected": 0}
+        earliest: Dict[str, date] = {}
+        
+        if self.db.get_bind().dialect.name == "postgresql":
+            upsert_chunk = self._upsert_chunk_copy
+        else:
+            upsert_chunk = self._upsert_chunk_generic
+        
+        chunk: List[PriceRow] = []
+        async for row in _iterate(rows):
+            if row is None:
+                totals["total"] += 1
+                totals["rejected"] += 1
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                await self._merge_chunk(upsert_chunk, chunk, totals, earliest)
+                chunk = []
+        if chunk:
+            await self._merge_chunk(upsert_chunk, chunk, totals, earliest)
+        
+        if earliest:
+            await self._refresh_returns(earliest)
+            await self._bump(*earliest)
+        await self.db.commit()
+        self.loaders.clear()
+        if earliest:
+            invalidate("stock_prices", "tickers", "daily_returns", *(f"ticker:{t}" for t in earliest))
+            read_models.schedule_refresh()
+        
+        totals["tickers"] = sorted(earliest)
+        return totals
+    
+    async def _merge_chunk(self, upsert_chunk, chunk: List[PriceRow], totals: dict, earliest: Dict[str, date]) -> None:
+        inserted, updated, accepted = await upsert_chunk(chunk)
+        totals["total"] += len(chunk)
+        totals["inserted"] += inserted
+        totals["updated"] += updated
+        totals["rejected"] += len(chunk) - inserted - updated
+        # Only rows that reached stock_prices move returns, ladders and versions
+        for ticker, row_date in accepted.items():
+            if ticker not in earliest or row_date < earliest[ticker]:
+                earliest[ticker] = row_date
+    
+    async def _upsert_chunk_copy(self, chunk: Sequence[PriceRow]) -> Tuple[int, int, Dict[str, date]]:
+        """
+        COPY a chunk into the staging table and merge it into stock_prices.
+        Returns the inserted and updated counts and the earliest merged date
+        per ticker
+        """
+        conn = await self.db.connection()
+        # Executing through SQLAlchemy first opens the transaction the
+        # staging table's ON COMMIT clause and the raw COPY run inside.
+        await conn.execute(_CREATE_STAGING_SQL)
+        await conn.execute(text("TRUNCATE stock_prices_staging"))
+        
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "stock_prices_staging",
+            records=((seq, *row) for seq, row in enumerate(chunk)),
+            columns=("seq", *PRICE_ROW_COLUMNS),
+        )
+        
+        result = await conn.execute(_UPSERT_STAGING_SQL, {"created_at": datetime.utcnow()})
+        inserted = updated = 0
+        accepted: Dict[str, date] = {}
+        for row in result:
+            inserted += row.inserted
+            updated += row.updated
+            accepted[row.ticker] = row.earliest
+        return inserted, updated, accepted
+    
+    async def _upsert_chunk_generic(self, chunk: Sequence[PriceRow]) -> Tuple[int, int, Dict[str, date]]:
+        """Upsert through executemany for SQLite, which has no COPY; returns as _upsert_chunk_copy"""
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        
+        latest = {}
+        for row in chunk:
+            if _is_valid_price_row(row):
+                latest[(row[0], row[1])] = row
+        if not latest:
+            return 0, 0, {}
+        
+        existing_query = select(StockPrice.ticker, StockPrice.date).where(
+            tuple_(StockPrice.ticker, StockPrice.date).in_(list(latest))
+        )
+        existing = len((await self.db.execute(existing_query)).all())
+        
+        created_at = datetime.utcnow()
+        values = [dict(zip(PRICE_ROW_COLUMNS, row), created_at=created_at) for row in latest.values()]
+        statement = sqlite_insert(StockPrice)
+        statement = statement.on_conflict_do_update(
+            index_elements=[StockPrice.ticker, StockPrice.date],
+            set_={column: statement.excluded[column] for column in PRICE_ROW_COLUMNS[2:]},
+        )
+        await self.db.execute(statement, values)
+        
+        accepted: Dict[str, date] = {}
+        for ticker, row_date in latest:
+            if ticker not in accepted or row_date < accepted[ticker]:
+                accepted[ticker] = row_date
+        return len(latest) - existing, existing, accepted
+    
+    async def _refresh_returns(self, since: Dict[str, date]) -> None:
+        """Rebuild the daily returns and return ladders of the changed tickers"""
+        await self.refresh_daily_returns(since)
+        await ReturnLadderService(self.db).refresh_ticker_ladders(since)
+    
+    async def refresh_daily_returns(self, since: Optional[Dict[str, date]] = None) -> None:
+        """
+        Recompute daily returns from stock prices.
+
+        ``since`` maps each changed ticker to its earliest changed date; only
+        returns on or after that date are rebuilt (a changed close also moves
+        the next day's return). Without ``since`` the whole table is rebuilt.
+        The caller commits.
+        """
+        if since is None:
+            await self.db.execute(delete(DailyReturn))
+            await self.db.execute(self._daily_returns_insert())
+            return
+        
+        # Tickers sharing a start date (typically a whole nightly load) are
+        # refreshed with one statement per batch
+        by_date: Dict[date, List[str]] = defaultdict(list)
+        for ticker, start in since.items():
+            by_date[start].append(ticker)
+        
+        for start, tickers in by_date.items():
+            for i in range(0, len(tickers), _DAILY_RETURNS_BATCH):
+                batch = tickers[i:i + _DAILY_RETURNS_BATCH]
+                await self.db.execute(
+                    delete(DailyReturn).where(
+                        DailyReturn.ticker.in_(batch),
+                        DailyReturn.date >= start,
+                    )
+                )
+                await self.db.execute(self._daily_returns_insert(batch, start))
+    
+    @staticmethod
+    def _daily_returns_insert(tickers: Optional[List[str]] = None, start: Optional[date] = None):
+        """INSERT ... SELECT computing returns with LAG(close_price) per ticker"""
+        windowed = select(
+            StockPrice.ticker,
+            StockPrice.date,
+            StockPrice.close_price,
+            StockPrice.volume,
+            func.lag(StockPrice.close_price)
+            .over(partition_by=StockPrice.ticker, order_by=StockPrice.date)
+            .label("previous_close"),
+        )
+        if tickers is not None:
+            # The window must see the last close before ``start`` to compute
+            # the first refreshed return
+            earlier = aliased(StockPrice)
+            previous_date = (
+                select(func.max(earlier.date))
+                .where(earlier.ticker == StockPrice.ticker, earlier.date < start)
+                .scalar_subquery()
+            )
+            windowed = windowed.where(
+                StockPrice.ticker.in_(tickers),
+                StockPrice.date >= func.coalesce(previous_date, start),
+            )
+        windowed = windowed.subquery("windowed")
+        
+        change = windowed.c.close_price - windowed.c.previous_close
+        returns = select(
+            windowed.c.ticker,
+            windowed.c.date,
+            windowed.c.close_price,
+            windowed.c.previous_close,
+            change,
+            change / windowed.c.previous_close * 100,
+            windowed.c.volume,
+        ).where(windowed.c.previous_close > 0)
+        if start is not None:
+            returns = returns.where(windowed.c.date >= start)
+        
+        return insert(DailyReturn).from_select(
+            ["ticker", "date", "close_price", "previous_close", "change", "change_percent", "volume"],
+            returns,
+        )
+    
+    @cached("stock_prices", tags=lambda ticker, **_: [f"ticker:{ticker.upper()}"])
     async def get_price_history_summary(self, ticker: str, days: int = 30) -> dict:
         """Get price history summary for a ticker"""
         start_date = date.today() - timedelta(days=days)
@@ -197,16 +637,63 @@ class StockPriceService:
             'period_return_percent': period_return
         }
     
-    async def get_daily_gainers_losers(self, date_filter: date, limit: int = 10) -> dict:
-        """Get top gainers and losers for a specific date"""
-        # This would require calculating daily changes
-        # For now, return basic structure
+    @cached(
+        "stock_prices",
+        tags=lambda fund_id, **_: ["daily_returns"] + ([f"fund:{fund_id}", "holdings"] if fund_id else []),
+    )
+    async def get_daily_gainers_losers(
+        self,
+        date_filter: Optional[date] = None,
+        limit: int = 10,
+        fund_id: Optional[int] = None,
+    ) -> dict:
+        """
+        Get top gainers and losers for a date (the latest available by
+        default), optionally restricted to tickers held by one fund
+        """
+        if date_filter is None:
+            latest = await self.db.execute(select(func.max(DailyReturn.date)))
+            date_filter = latest.scalar()
+            if date_filter is None:
+                return {'date': None, 'fund_id': fund_id, 'top_gainers': [], 'top_losers': []}
+        
+        # Both directions walk the (date, change_percent) index
+        query = select(DailyReturn).where(DailyReturn.date == date_filter)
+        if fund_id is not None:
+            query = query.where(
+                DailyReturn.ticker.in_(select(Holding.ticker).where(Holding.fund_id == fund_id))
+            )
+        
+        gainers = await self.db.execute(
+            query.where(DailyReturn.change_percent > 0)
+            .order_by(desc(DailyReturn.change_percent))
+            .limit(limit)
+        )
+        losers = await self.db.execute(
+            query.where(DailyReturn.change_percent < 0)
+            .order_by(asc(DailyReturn.change_percent))
+            .limit(limit)
+        )
+        
         return {
             'date': date_filter,
-            'top_gainers': [],
-            'top_losers': []
+            'fund_id': fund_id,
+            'top_gainers': [self._mover(row) for row in gainers.scalars().all()],
+            'top_losers': [self._mover(row) for row in losers.scalars().all()],
+        }
+    
+    @staticmethod
+    def _mover(row: DailyReturn) -> dict:
+        return {
+            'ticker': row.ticker,
+            'date': row.date,
+            'close_price': row.close_price,
+            'volume': row.volume,
+            'daily_change': row.change,
+            'daily_change_percent': row.change_percent,
         }
     
+    @cached("tickers", tags=lambda: ["tickers"])
     async def get_tickers_list(self) -> List[str]:
         """Get list of all available tickers"""
         query = select(StockPrice.ticker).distinct().order_by(StockPrice.ticker)
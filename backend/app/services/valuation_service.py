@@ -0,0 +1,171 @@
+"""
+Mark-to-market valuation of holdings against the latest stock prices
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.holding import Holding
+from app.models.stock_price import StockPrice
+from app.services.loaders import latest_rows_query
+
+
+def _format(values: np.ndarray, places: int, mask: Optional[np.ndarray] = None) -> List[Optional[str]]:
+    """Render a float array as fixed-point strings, None where masked out"""
+    spec = f".{places}f"
+    if mask is None:
+        return [format(v, spec) for v in values.tolist()]
+    return [format(v, spec) if ok else None for v, ok in zip(values.tolist(), mask.tolist())]
+
+
+class ValuationService:
+    """
+    Values holdings in one statement: the caller's holdings query is joined
+    to the latest price of every ticker and to the total market value of each
+    fund involved, then all derived figures are computed as NumPy arrays.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _valuation_query(self, holdings_query: Select) -> Select:
+        relevant_funds = holdings_query.with_only_columns(Holding.fund_id).subquery()
+        relevant_tickers = (
+            select(Holding.ticker)
+            .where(Holding.fund_id.in_(select(relevant_funds.c.fund_id)))
+            .distinct()
+        )
+        latest_prices = latest_rows_query(
+            self.db, StockPrice, StockPrice.ticker, StockPrice.date, relevant_tickers
+        ).cte("latest_prices")
+
+        fund_totals = (
+            select(
+                Holding.fund_id,
+                func.sum(
+                    Holding.shares * func.coalesce(latest_prices.c.close_price, Holding.purchase_price)
+                ).label("fund_value"),
+            )
+            .outerjoin(latest_prices, latest_prices.c.ticker == Holding.ticker)
+            .where(Holding.fund_id.in_(select(relevant_funds.c.fund_id)))
+            .group_by(Holding.fund_id)
+            .subquery("fund_totals")
+        )
+
+        return (
+            holdings_query
+            .outerjoin(latest_prices, latest_prices.c.ticker == Holding.ticker)
+            .outerjoin(fund_totals, fund_totals.c.fund_id == Holding.fund_id)
+            .add_columns(
+                latest_prices.c.close_price.label("price"),
+                latest_prices.c.date.label("price_date"),
+                fund_totals.c.fund_value,
+            )
+        )
+
+    @staticmethod
+    def _compute(rows) -> Dict[str, np.ndarray]:
+        """Derive valuation arrays for a result set in one vectorized pass"""
+        shares = np.array([float(row[0].shares) for row in rows])
+        purchase_price = np.array([float(row[0].purchase_price) for row in rows])
+        price = np.array([np.nan if row.price is None else float(row.price) for row in rows])
+        fund_value = np.array([np.nan if row.fund_value is None else float(row.fund_value) for row in rows])
+
+        priced = ~np.isnan(price)
+        cost_basis = shares * purchase_price
+        market_value = np.where(priced, shares * np.nan_to_num(price), cost_basis)
+        gain_loss = market_value - cost_basis
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain_loss_pct = np.where(cost_basis > 0, gain_loss / cost_basis * 100.0, 0.0)
+            weight = np.where(fund_value > 0, market_value / fund_value * 100.0, 0.0)
+
+        return {
+            "price": np.nan_to_num(price),
+            "priced": priced,
+            "cost_basis": cost_basis,
+            "market_value": market_value,
+            "gain_loss": gain_loss,
+            "gain_loss_pct": gain_loss_pct,
+            "weight": weight,
+        }
+
+    def _build(self, rows, values: Dict[str, np.ndarray]) -> List[dict]:
+        current_price = _format(values["price"], 4, values["priced"])
+        cost_basis = _format(values["cost_basis"], 2)
+        market_value = _format(values["market_value"], 2)
+        gain_loss = _format(values["gain_loss"], 2)
+        gain_loss_pct = _format(values["gain_loss_pct"], 4)
+        weight = _format(values["weight"], 4)
+
+        valued = []
+        for i, row in enumerate(rows):
+            holding = row[0]
+            holding.mark_to_market(row.price)
+            valued.append({
+                "id": holding.id,
+                "fund_id": holding.fund_id,
+                "ticker": holding.ticker,
+                "company_name": holding.company_name,
+                "shares": str(holding.shares),
+                "purchase_price": str(holding.purchase_price),
+                "purchase_date": holding.purchase_date.isoformat(),
+                "sector": holding.sector,
+                "market_cap": holding.market_cap,
+                "created_at": holding.created_at.isoformat(),
+                "updated_at": holding.updated_at.isoformat(),
+                "cost_basis": cost_basis[i],
+                "current_price": current_price[i],
+                "price_date": row.price_date.isoformat() if row.price_date else None,
+                "current_value": market_value[i],
+                "unrealized_gain_loss": gain_loss[i],
+                "unrealized_gain_loss_percent": gain_loss_pct[i],
+                "weight_in_fund": weight[i],
+            })
+        return valued
+
+    async def value_holdings(self, holdings_query: Select) -> List[dict]:
+        """
+        Value every holding selected by ``holdings_query`` (a ``select(Holding)``
+        statement, optionally filtered, ordered and limited).
+
+        Holdings without a price are valued at cost.
+        """
+        result = await self.db.execute(self._valuation_query(holdings_query))
+        rows = result.all()
+        if not rows:
+            return []
+        return self._build(rows, self._compute(rows))
+
+    async def value_fund(self, fund_id: int) -> Dict[str, object]:
+        """
+        Fund totals with every holding marked to market, summed in SQL so no
+        holding is loaded; holdings without a price count at cost
+        """
+        latest_prices = latest_rows_query(
+            self.db, StockPrice, StockPrice.ticker, StockPrice.date,
+            select(Holding.ticker).where(Holding.fund_id == fund_id).distinct(),
+        ).cte("latest_prices")
+        result = await self.db.execute(
+            select(
+                func.count(Holding.id),
+                func.sum(Holding.shares * Holding.purchase_price),
+                func.sum(Holding.shares * func.coalesce(latest_prices.c.close_price, Holding.purchase_price)),
+            )
+            .outerjoin(latest_prices, latest_prices.c.ticker == Holding.ticker)
+            .where(Holding.fund_id == fund_id)
+        )
+        count, total_cost, total_value = result.one()
+        total_cost, total_value = float(total_cost or 0), float(total_value or 0)
+        gain_loss = total_value - total_cost
+
+        return {
+            "fund_id": fund_id,
+            "holdings_count": count,
+            "total_cost_basis": total_cost,
+            "total_market_value": total_value,
+            "unrealized_gain_loss": gain_loss,
+            "unrealized_gain_loss_percent": (gain_loss / total_cost * 100) if total_cost > 0 else 0.0,
+        }
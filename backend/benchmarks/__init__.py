@@ -0,0 +1,4 @@
+"""
+Scale benchmarks: a deterministic synthetic data generator and a latency
+harness for the API routes and service methods
+"""
@@ -0,0 +1,127 @@
+"""
+Command line entry point:
+
+    python -m benchmarks generate --scale small
+    python -m benchmarks run --output benchmarks/results/baseline.json
+    python -m benchmarks run --compare benchmarks/results/baseline.json
+    python -m benchmarks serialization --rows 1000
+
+The database is the one configured by DATABASE_URL.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+from benchmarks import generator, harness, serialization
+
+
+def _generate(args: argparse.Namespace) -> int:
+    from app.core.database import engine
+
+    scale = generator.get_scale(
+        args.scale,
+        funds=args.funds,
+        holdings_per_fund=args.holdings_per_fund,
+        tickers=args.tickers,
+        years=args.years,
+        seed=args.seed,
+    )
+    print(f"Generating {scale} into {engine.url.render_as_string(hide_password=True)}")
+
+    async def main():
+        try:
+            return await generator.generate(engine, scale, end=args.end, reset=args.reset)
+        finally:
+            await engine.dispose()
+
+    report = asyncio.run(main())
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    print(harness.HEADER)
+    report = asyncio.run(harness.run(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        names=args.scenario,
+        base_url=args.base_url,
+        cache=not args.no_cache,
+        seed=args.seed,
+    ))
+    if args.output:
+        harness.save(report, args.output)
+        print(f"Saved results to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        lines = harness.compare(report, baseline, args.threshold)
+        print(f"\nChange against {args.compare}:")
+        print("\n".join(lines))
+        if args.fail_on_regression and any(line.endswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+
+def _serialization(args: argparse.Namespace) -> int:
+    report = serialization.run(rows=args.rows, repeat=args.repeat, names=args.payload)
+    print(f"{'payload':<16}{'default ms/1k':>16}{'fast ms/1k':>14}{'saved ms/1k':>14}{'speedup':>10}")
+    for name, stats in report["payloads"].items():
+        print(
+            f"{name:<16}{stats['default_ms_per_1k']:>16.2f}{stats['fast_ms_per_1k']:>14.2f}"
+            f"{stats['saved_ms_per_1k']:>14.2f}{stats['speedup']:>9.1f}x"
+        )
+    if args.output:
+        harness.save(report, args.output)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="Load a synthetic dataset")
+    gen.add_argument("--scale", default="small", choices=sorted(generator.SCALES))
+    gen.add_argument("--funds", type=int)
+    gen.add_argument("--holdings-per-fund", type=int)
+    gen.add_argument("--tickers", type=int)
+    gen.add_argument("--years", type=int)
+    gen.add_argument("--seed", type=int)
+    gen.add_argument("--end", type=date.fromisoformat, help="Last trading day (default today)")
+    gen.add_argument("--reset", action="store_true", help="Empty the portfolio tables first")
+    gen.set_defaults(handler=_generate)
+
+    bench = commands.add_parser("run", help="Measure route and service latency")
+    bench.add_argument("--requests", type=int, default=200, help="Timed calls per scenario")
+    bench.add_argument("--concurrency", type=int, default=10)
+    bench.add_argument("--warmup", type=int, default=5, help="Untimed calls per scenario")
+    bench.add_argument("--scenario", action="append",
+                       help="Scenario name or prefix (repeatable), e.g. api.fund_detail or service.")
+    bench.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    bench.add_argument("--no-cache", action="store_true", help="Disable the application cache")
+    bench.add_argument("--seed", type=int, default=42)
+    bench.add_argument("--output", type=Path, help="Write results JSON here")
+    bench.add_argument("--compare", type=Path, help="Baseline results JSON to compare against")
+    bench.add_argument("--threshold", type=float, default=0.10,
+                       help="p95 growth flagged as a regression (fraction)")
+    bench.add_argument("--fail-on-regression", action="store_true")
+    bench.set_defaults(handler=_run)
+
+    ser = commands.add_parser("serialization", help="CPU time of response serialization per 1k rows")
+    ser.add_argument("--rows", type=int, default=1000)
+    ser.add_argument("--repeat", type=int, default=20)
+    ser.add_argument("--payload", action="append", choices=sorted(serialization.CASES))
+    ser.add_argument("--output", type=Path, help="Write results JSON here")
+    ser.set_defaults(handler=_serialization)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
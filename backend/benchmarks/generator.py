@@ -0,0 +1,378 @@
+"""
+Deterministic synthetic portfolio data at configurable scale.
+
+Every value is drawn from a NumPy generator seeded by ``Scale.seed`` and
+the row's position, so the same scale and end date always produce the
+same database. Rows are built per batch as DataFrames and bulk loaded:
+``COPY ... FROM STDIN (FORMAT csv)`` under PostgreSQL, executemany
+inserts elsewhere.
+"""
+import io
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.read_models import read_models
+from app.core.versioning import BULK_LOAD_KEYS, bump
+from app.models.daily_return import DailyReturn
+from app.models.fund import Fund, FundStrategy
+from app.models.fund_performance import FundPerformance
+from app.models.holding import Holding
+from app.models.peer_fund import PeerCategory, PeerFund
+from app.models.peer_performance import PeerPerformance, PeerRanking
+from app.models.return_ladder import FundReturnLadder, TickerReturnLadder
+from app.models.stock_price import StockPrice
+from app.services.peer_service import PeerRankingService
+from app.services.return_ladder_service import ReturnLadderService
+from app.services.stock_price_service import StockPriceService
+
+SECTORS = (
+    "Technology", "Healthcare", "Financial Services", "Consumer Discretionary",
+    "Consumer Staples", "Communication Services", "Industrials", "Energy",
+    "Utilities", "Real Estate", "Materials",
+)
+
+BENCHMARK_TICKER = "SPY"
+
+TICKER_BATCH = 200
+FUND_BATCH = 500
+
+
+@dataclass(frozen=True)
+class Scale:
+    """How much data to generate"""
+    funds: int
+    holdings_per_fund: int
+    tickers: int
+    years: int
+    peers_per_category: int = 10
+    seed: int = 42
+
+    @property
+    def holdings(self) -> int:
+        return self.funds * self.holdings_per_fund
+
+
+SCALES: Dict[str, Scale] = {
+    "tiny": Scale(funds=20, holdings_per_fund=25, tickers=200, years=1, peers_per_category=2),
+    "small": Scale(funds=250, holdings_per_fund=100, tickers=1000, years=3),
+    "medium": Scale(funds=1000, holdings_per_fund=250, tickers=4000, years=10),
+    "full": Scale(funds=5000, holdings_per_fund=settings.MAX_HOLDINGS_PER_FUND, tickers=8000, years=20),
+}
+
+
+def get_scale(name: str, **overrides) -> Scale:
+    """A named scale with any non-None field overridden"""
+    if name not in SCALES:
+        raise ValueError(f"Unknown scale '{name}', expected one of {', '.join(SCALES)}")
+    return replace(SCALES[name], **{key: value for key, value in overrides.items() if value is not None})
+
+
+def ticker_symbols(count: int) -> List[str]:
+    """``count`` distinct symbols, the benchmark first then AAAA, AAAB, ..."""
+    symbols = [BENCHMARK_TICKER]
+    index = 0
+    while len(symbols) < count:
+        digits = []
+        value = index
+        for _ in range(4):
+            value, remainder = divmod(value, 26)
+            digits.append(chr(ord("A") + remainder))
+        symbol = "".join(reversed(digits))
+        if symbol != BENCHMARK_TICKER:
+            symbols.append(symbol)
+        index += 1
+    return symbols[:count]
+
+
+def trading_days(end: date, years: int) -> List[date]:
+    """Weekdays in the ``years`` before ``end`` inclusive"""
+    start = end - timedelta(days=365 * years)
+    days = pd.bdate_range(start, end)
+    return [day.date() for day in days]
+
+
+class SyntheticDataset:
+    """Column values for one scale, generated lazily batch by batch"""
+
+    def __init__(self, scale: Scale, end: date):
+        self.scale = scale
+        self.end = end
+        self.days = trading_days(end, scale.years)
+        self.tickers = ticker_symbols(scale.tickers)
+        self.created_at = datetime.utcnow()
+
+        rng = np.random.default_rng([scale.seed, 0])
+        self.start_prices = np.round(rng.lognormal(3.8, 0.8, scale.tickers), 4).clip(1, 2000)
+        self.drifts = rng.normal(0.07, 0.08, scale.tickers)
+        self.volatilities = rng.uniform(0.12, 0.55, scale.tickers)
+        self.volatilities[0] = 0.16  # the benchmark behaves like a broad index
+        self.sectors = rng.integers(0, len(SECTORS), scale.tickers)
+        self.market_caps = rng.lognormal(23, 1.5, scale.tickers).astype(np.int64)
+
+    def _rng(self, stream: int, index: int) -> np.random.Generator:
+        return np.random.default_rng([self.scale.seed, stream, index])
+
+    def peer_funds(self) -> pd.DataFrame:
+        rng = self._rng(1, 0)
+        rows = []
+        for category in PeerCategory:
+            for n in range(self.scale.peers_per_category):
+                rows.append({
+                    "id": len(rows) + 1,
+                    "name": f"Peer {category.value.replace('_', ' ').title()} Fund {n + 1}",
+                    "benchmark_category": category.value,
+                    "total_aum": round(float(rng.lognormal(22, 1.2)), 2),
+                    "expense_ratio": round(float(rng.uniform(0.0003, 0.012)), 4),
+                    "inception_date": self.days[0] - timedelta(days=int(rng.integers(0, 7000))),
+                    "manager_company": f"Peer Manager {int(rng.integers(1, 40))}",
+                    "description": "Synthetic benchmark peer",
+                    "created_at": self.created_at,
+                })
+        return pd.DataFrame(rows)
+
+    def funds(self) -> Iterator[pd.DataFrame]:
+        strategies = [strategy.value for strategy in FundStrategy]
+        for first in range(0, self.scale.funds, FUND_BATCH):
+            ids = np.arange(first + 1, min(first + FUND_BATCH, self.scale.funds) + 1)
+            rng = self._rng(2, first)
+            yield pd.DataFrame({
+                "id": ids,
+                "name": [f"Synthetic Fund {fund_id:05d}" for fund_id in ids],
+                "strategy": [strategies[i] for i in rng.integers(0, len(strategies), len(ids))],
+                "inception_date": [self.days[0] - timedelta(days=int(d)) for d in rng.integers(0, 3650, len(ids))],
+                "total_aum": np.round(rng.lognormal(19, 1.0, len(ids)), 2),
+                "manager_name": [f"Manager {int(m)}" for m in rng.integers(1, 1000, len(ids))],
+                "expense_ratio": np.round(rng.uniform(0.0005, 0.015, len(ids)), 4),
+                "description": "Synthetic fund",
+                "created_at": self.created_at,
+                "updated_at": self.created_at,
+            })
+
+    def holdings(self) -> Iterator[pd.DataFrame]:
+        per_fund = min(self.scale.holdings_per_fund, self.scale.tickers - 1)
+        for first in range(0, self.scale.funds, FUND_BATCH):
+            fund_ids = np.arange(first + 1, min(first + FUND_BATCH, self.scale.funds) + 1)
+            rng = self._rng(3, first)
+            # The benchmark is never held, so it stays a pure market series
+            positions = np.concatenate([
+                rng.choice(self.scale.tickers - 1, per_fund, replace=False) + 1 for _ in fund_ids
+            ])
+            count = len(positions)
+            ids = np.arange(first * per_fund + 1, first * per_fund + count + 1)
+            purchase_offsets = rng.integers(0, len(self.days), count)
+            yield pd.DataFrame({
+                "id": ids,
+                "fund_id": np.repeat(fund_ids, per_fund),
+                "ticker": [self.tickers[i] for i in positions],
+                "company_name": [f"{self.tickers[i]} Holdings Inc." for i in positions],
+                "shares": np.round(rng.lognormal(9, 1.2, count), 4),
+                "purchase_price": np.round(self.start_prices[positions] * rng.lognormal(0, 0.3, count), 4),
+                "purchase_date": [self.days[i] for i in purchase_offsets],
+                "sector": [SECTORS[self.sectors[i]] for i in positions],
+                "market_cap": self.market_caps[positions],
+                "created_at": self.created_at,
+                "updated_at": self.created_at,
+            })
+
+    def _price_series(self, index: int) -> Dict[str, np.ndarray]:
+        rng = self._rng(4, index)
+        n = len(self.days)
+        daily_sigma = self.volatilities[index] / np.sqrt(252)
+        log_returns = rng.normal(self.drifts[index] / 252 - daily_sigma ** 2 / 2, daily_sigma, n)
+        log_returns[0] = 0.0
+        close = (self.start_prices[index] * np.exp(np.cumsum(log_returns))).clip(0.5, 50_000)
+        gaps = np.exp(rng.normal(0, daily_sigma * 0.3, n))
+        open_ = np.empty(n)
+        open_[0] = self.start_prices[index]
+        open_[1:] = close[:-1] * gaps[1:]
+        open_ = open_.clip(0.5, 50_000)
+        wick_high = 1 + np.abs(rng.normal(0, daily_sigma * 0.5, n))
+        wick_low = 1 - np.abs(rng.normal(0, daily_sigma * 0.5, n)).clip(0, 0.5)
+        close, open_ = np.round(close, 4), np.round(open_, 4)
+        high = np.maximum(np.round(np.maximum(open_, close) * wick_high, 4), np.maximum(open_, close))
+        low = np.minimum(np.round(np.minimum(open_, close) * wick_low, 4), np.minimum(open_, close))
+        return {
+            "open_price": open_,
+            "high_price": high,
+            "low_price": low,
+            "close_price": close,
+            "volume": rng.lognormal(13, 1.0, n).astype(np.int64),
+        }
+
+    def stock_prices(self) -> Iterator[pd.DataFrame]:
+        n = len(self.days)
+        for first in range(0, self.scale.tickers, TICKER_BATCH):
+            indices = range(first, min(first + TICKER_BATCH, self.scale.tickers))
+            series = [self._price_series(i) for i in indices]
+            columns = {key: np.concatenate([s[key] for s in series]) for key in series[0]}
+            yield pd.DataFrame({
+                "ticker": np.repeat([self.tickers[i] for i in indices], n),
+                "date": self.days * len(series),
+                **columns,
+                "adjusted_close": columns["close_price"],
+                "created_at": self.created_at,
+            })
+
+    def fund_performance(self) -> Iterator[pd.DataFrame]:
+        n = len(self.days)
+        for first in range(0, self.scale.funds, FUND_BATCH):
+            fund_ids = np.arange(first + 1, min(first + FUND_BATCH, self.scale.funds) + 1)
+            rng = self._rng(5, first)
+            sigma = rng.uniform(0.08, 0.35, len(fund_ids))[:, None] / np.sqrt(252)
+            drift = rng.normal(0.07, 0.05, len(fund_ids))[:, None] / 252
+            log_returns = rng.normal(drift - sigma ** 2 / 2, sigma, (len(fund_ids), n))
+            log_returns[:, 0] = 0.0
+            start_nav = rng.uniform(10, 100, len(fund_ids))[:, None]
+            nav = np.round((start_nav * np.exp(np.cumsum(log_returns, axis=1))).clip(0.01, 99_999), 4)
+            daily = np.zeros_like(nav)
+            daily[:, 1:] = (nav[:, 1:] / nav[:, :-1] - 1) * 100
+            total = (nav / nav[:, :1] - 1) * 100
+            shares = rng.lognormal(15, 1.0, len(fund_ids)).astype(np.int64)[:, None]
+            yield pd.DataFrame({
+                "fund_id": np.repeat(fund_ids, n),
+                "date": self.days * len(fund_ids),
+                "nav_price": nav.ravel(),
+                "total_return": np.round(total, 4).clip(-99.9999, 9999.9999).ravel(),
+                "daily_return": np.round(daily, 4).clip(-99.9999, 9999.9999).ravel(),
+                "assets_under_management": np.round(nav * shares, 2).ravel(),
+                "shares_outstanding": np.broadcast_to(shares, nav.shape).ravel(),
+                "created_at": self.created_at,
+            })
+
+    def peer_performance(self) -> Iterator[pd.DataFrame]:
+        n = len(self.days)
+        peers = len(PeerCategory) * self.scale.peers_per_category
+        for first in range(0, peers, FUND_BATCH):
+            peer_ids = np.arange(first + 1, min(first + FUND_BATCH, peers) + 1)
+            rng = self._rng(6, first)
+            sigma = rng.uniform(0.08, 0.30, len(peer_ids))[:, None] / np.sqrt(252)
+            drift = rng.normal(0.07, 0.04, len(peer_ids))[:, None] / 252
+            log_returns = rng.normal(drift - sigma ** 2 / 2, sigma, (len(peer_ids), n))
+            log_returns[:, 0] = 0.0
+            start_nav = rng.uniform(10, 100, len(peer_ids))[:, None]
+            nav = np.round((start_nav * np.exp(np.cumsum(log_returns, axis=1))).clip(0.01, 99_999), 4)
+            yield pd.DataFrame({
+                "peer_fund_id": np.repeat(peer_ids, n),
+                "date": self.days * len(peer_ids),
+                "nav_price": nav.ravel(),
+            })
+
+
+async def write_frame(conn: AsyncConnection, table: Table, frame: pd.DataFrame) -> None:
+    """Bulk insert ``frame`` into ``table``, through COPY when available"""
+    if conn.dialect.name == "postgresql":
+        payload = frame.to_csv(index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_to_table(
+            table.name,
+            source=io.BytesIO(payload.encode()),
+            columns=list(frame.columns),
+            format="csv",
+        )
+    else:
+        await conn.execute(table.insert(), frame.to_dict("records"))
+
+
+_TABLES = (
+    PeerRanking, PeerPerformance, FundReturnLadder, TickerReturnLadder, DailyReturn,
+    FundPerformance, StockPrice, Holding, Fund, PeerFund,
+)
+
+
+async def _reset(conn: AsyncConnection) -> None:
+    if conn.dialect.name == "postgresql":
+        names = ", ".join(model.__tablename__ for model in _TABLES)
+        await conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    else:
+        for model in _TABLES:
+            await conn.execute(model.__table__.delete())
+
+
+async def generate(engine: AsyncEngine, scale: Scale, end: date = None, reset: bool = False) -> dict:
+    """
+    Create the schema and load a synthetic dataset of ``scale`` into it.
+
+    Refuses to touch a database that already has funds unless ``reset``
+    is set, in which case every portfolio table is emptied first. Returns
+    row counts and load timings per table.
+    """
+    dataset = SyntheticDataset(scale, end or date.today())
+    report = {"scale": asdict(scale), "end": dataset.end.isoformat(), "days": len(dataset.days), "tables": {}}
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if reset:
+            await _reset(conn)
+        elif (await conn.execute(select(func.count()).select_from(Fund))).scalar():
+            raise RuntimeError("Database already contains funds; reset it to load a synthetic dataset")
+
+    steps = (
+        (PeerFund, lambda: iter([dataset.peer_funds()])),
+        (Fund, dataset.funds),
+        (Holding, dataset.holdings),
+        (StockPrice, dataset.stock_prices),
+        (FundPerformance, dataset.fund_performance),
+        (PeerPerformance, dataset.peer_performance),
+    )
+    for model, frames in steps:
+        started = time.perf_counter()
+        rows = 0
+        # One transaction per batch keeps WAL and lock footprints bounded
+        for frame in frames():
+            async with engine.begin() as conn:
+                await write_frame(conn, model.__table__, frame)
+            rows += len(frame)
+        elapsed = time.perf_counter() - started
+        report["tables"][model.__tablename__] = {
+            "rows": rows,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed) if elapsed else None,
+        }
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Explicit ids were loaded, so move the serial sequences past them
+            for model in (Fund, Holding, PeerFund):
+                table = model.__tablename__
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                ))
+            await conn.execute(text("ANALYZE"))
+
+    started = time.perf_counter()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await StockPriceService(session).refresh_daily_returns()
+        await session.commit()
+    report["tables"]["daily_returns"] = {"seconds": round(time.perf_counter() - started, 3)}
+
+    started = time.perf_counter()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        ladders = ReturnLadderService(session)
+        rows = await ladders.refresh_fund_ladders() + await ladders.refresh_ticker_ladders()
+        await bump(session, *BULK_LOAD_KEYS)
+        await session.commit()
+    report["tables"]["return_ladders"] = {"rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+
+    started = time.perf_counter()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        rankings = await PeerRankingService(session).refresh_rankings(dataset.end)
+    report["tables"]["peer_rankings"] = {
+        "rows": rankings.get("funds", 0) + rankings.get("peers", 0),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+    if await read_models.setup(engine):
+        started = time.perf_counter()
+        await read_models.refresh()
+        report["read_models_seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,331 @@
+"""
+Latency harness: drives API routes and service methods with concurrent
+workers and reports p50/p95/p99 latency and throughput per scenario,
+plus the statements run and ORM objects loaded per API request (read
+from the Server-Timing header).
+
+API scenarios go through the ASGI app in-process (lifespan included) or,
+with a base URL, over HTTP to a running server. Service scenarios call
+the service layer directly with a fresh session per call. Request
+arguments are picked from a seeded RNG so runs are comparable.
+"""
+import asyncio
+import json
+import platform
+import random
+import re
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from sqlalchemy import distinct, func, select
+
+from app.core.cache import set_cache_backend
+from app.core.database import AsyncSessionLocal, engine
+from app.models.fund import Fund
+from app.models.holding import Holding
+from app.services.fund_service import FundService
+from app.services.holding_service import HoldingService
+from app.services.stock_price_service import StockPriceService
+
+API = "/api/v1"
+
+_FOOTPRINT = re.compile(r'desc="(\d+) queries".*orm;desc="(\d+) objects"')
+
+
+@dataclass
+class Target:
+    """Ids and tickers present in the database, sampled for request arguments"""
+    fund_ids: List[int]
+    tickers: List[str]
+    holdings: int
+
+
+@dataclass
+class Scenario:
+    name: str
+    kind: str  # "api" or "service"
+    call: Callable[["Runner", random.Random], Awaitable[None]]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    kind: str
+    requests: int
+    errors: int
+    concurrency: int
+    seconds: float
+    latencies: List[float] = field(repr=False, default_factory=list)
+    footprints: List[Tuple[int, int]] = field(repr=False, default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        values = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        footprint = np.array(self.footprints).mean(axis=0) if self.footprints else None
+        return {
+            "kind": self.kind,
+            "requests": self.requests,
+            "errors": self.errors,
+            "concurrency": self.concurrency,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "mean_ms": round(float(values.mean()), 3),
+            "max_ms": round(float(values.max()), 3),
+            "throughput_rps": round(self.requests / self.seconds, 2) if self.seconds else None,
+            "queries_per_request": round(float(footprint[0]), 2) if footprint is not None else None,
+            "objects_per_request": round(float(footprint[1]), 2) if footprint is not None else None,
+        }
+
+
+class Runner:
+    """Holds the HTTP client and target data shared by scenario calls"""
+
+    def __init__(self, client: httpx.AsyncClient, target: Target):
+        self.client = client
+        self.target = target
+        # (statements, ORM objects) per response of the running scenario
+        self.footprints: List[Tuple[int, int]] = []
+
+    def _record(self, response: httpx.Response) -> None:
+        match = _FOOTPRINT.search(response.headers.get("server-timing", ""))
+        if match:
+            self.footprints.append((int(match.group(1)), int(match.group(2))))
+
+    async def get(self, path: str, **params) -> None:
+        response = await self.client.get(API + path, params=params)
+        response.raise_for_status()
+        await response.aread()
+        self._record(response)
+
+    async def post(self, path: str, payload: Any) -> None:
+        response = await self.client.post(API + path, json=payload)
+        response.raise_for_status()
+        self._record(response)
+
+    def fund(self, rng: random.Random) -> int:
+        return rng.choice(self.target.fund_ids)
+
+    def ticker(self, rng: random.Random) -> str:
+        return rng.choice(self.target.tickers)
+
+
+async def _service(call: Callable[[Any], Awaitable[Any]]) -> None:
+    async with AsyncSessionLocal() as session:
+        await call(session)
+
+
+def _history_window():
+    end = date.today()
+    return end - timedelta(days=365), end
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("api.funds_list", "api", lambda r, rng: r.get(
+        "/funds/", limit=100, skip=rng.randrange(0, max(len(r.target.fund_ids) - 100, 1)))),
+    Scenario("api.fund_search", "api", lambda r, rng: r.get("/funds/", search=f"{rng.randrange(1, 100):05d}", limit=20)),
+    Scenario("api.fund_detail", "api", lambda r, rng: r.get(f"/funds/{r.fund(rng)}")),
+    Scenario("api.fund_performance", "api", lambda r, rng: r.get(
+        f"/funds/{r.fund(rng)}/performance", days=365, max_points=250)),
+    Scenario("api.fund_stats", "api", lambda r, rng: r.get(f"/funds/{r.fund(rng)}/stats")),
+    Scenario("api.funds_analytics", "api", lambda r, rng: r.get(
+        "/funds/analytics", fund_ids=rng.sample(r.target.fund_ids, min(10, len(r.target.fund_ids))), days=365)),
+    Scenario("api.holdings_by_fund", "api", lambda r, rng: r.get("/holdings/", fund_id=r.fund(rng), limit=100)),
+    Scenario("api.holdings_summary", "api", lambda r, rng: r.get(f"/holdings/fund/{r.fund(rng)}/summary")),
+    Scenario("api.sector_breakdown", "api", lambda r, rng: r.get(f"/holdings/fund/{r.fund(rng)}/sectors")),
+    Scenario("api.price_history", "api", lambda r, rng: r.get(
+        f"/stock-prices/ticker/{r.ticker(rng)}/history", days=365, max_points=250)),
+    Scenario("api.batch_latest", "api", lambda r, rng: r.post(
+        "/stock-prices/batch/latest", rng.sample(r.target.tickers, min(50, len(r.target.tickers))))),
+    Scenario("api.movers", "api", lambda r, rng: r.get("/stock-prices/movers", limit=10)),
+    Scenario("service.get_funds", "service", lambda r, rng: _service(
+        lambda db: FundService(db).get_funds(limit=100))),
+    Scenario("service.get_fund_by_id", "service", lambda r, rng: _service(
+        lambda db, fund_id=r.fund(rng): FundService(db).get_fund_by_id(fund_id))),
+    Scenario("service.holdings_summary", "service", lambda r, rng: _service(
+        lambda db, fund_id=r.fund(rng): HoldingService(db).get_fund_holdings_summary(fund_id))),
+    Scenario("service.latest_prices", "service", lambda r, rng: _service(
+        lambda db, tickers=rng.sample(r.target.tickers, min(50, len(r.target.tickers))):
+            StockPriceService(db).get_latest_prices(tickers))),
+    Scenario("service.price_history", "service", lambda r, rng: _service(
+        lambda db, ticker=r.ticker(rng): StockPriceService(db).get_price_history(ticker, *_history_window()))),
+]
+
+
+async def load_target() -> Target:
+    async with AsyncSessionLocal() as session:
+        fund_ids = list((await session.execute(select(Fund.id).order_by(Fund.id))).scalars())
+        tickers = list((await session.execute(select(distinct(Holding.ticker)).order_by(Holding.ticker))).scalars())
+        holdings = (await session.execute(select(func.count()).select_from(Holding))).scalar()
+    if not fund_ids or not tickers:
+        raise RuntimeError("No funds or holdings found; run `python -m benchmarks generate` first")
+    return Target(fund_ids=fund_ids, tickers=tickers, holdings=holdings)
+
+
+async def run_scenario(
+    runner: Runner, scenario: Scenario, requests: int, concurrency: int, warmup: int, seed: int,
+) -> ScenarioResult:
+    """Issue ``requests`` calls from ``concurrency`` workers after ``warmup`` untimed calls"""
+    for i in range(warmup):
+        try:
+            await scenario.call(runner, random.Random(f"{seed}:warmup:{scenario.name}:{i}"))
+        except Exception:
+            pass
+
+    latencies: List[float] = []
+    errors = 0
+    runner.footprints = []
+    next_index = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in next_index:
+            rng = random.Random(f"{seed}:{scenario.name}:{i}")
+            started = time.perf_counter()
+            try:
+                await scenario.call(runner, rng)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ScenarioResult(
+        name=scenario.name,
+        kind=scenario.kind,
+        requests=requests,
+        errors=errors,
+        concurrency=concurrency,
+        seconds=time.perf_counter() - started,
+        latencies=latencies,
+        footprints=runner.footprints,
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(
+    requests: int = 200,
+    concurrency: int = 10,
+    warmup: int = 5,
+    names: Optional[List[str]] = None,
+    base_url: Optional[str] = None,
+    cache: bool = True,
+    seed: int = 42,
+    progress: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Run the selected scenarios and return a JSON-serializable report"""
+    scenarios = [s for s in SCENARIOS if not names or any(s.name.startswith(n) for n in names)]
+    if not cache:
+        set_cache_backend(None)
+
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+        lifespan = None
+    else:
+        from app.main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://localhost", timeout=60)
+        lifespan = app.router.lifespan_context(app)
+
+    results: Dict[str, Any] = {}
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            target = await load_target()
+            runner = Runner(client, target)
+            for scenario in scenarios:
+                result = await run_scenario(runner, scenario, requests, concurrency, warmup, seed)
+                results[scenario.name] = result.as_dict()
+                progress(format_row(scenario.name, results[scenario.name]))
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "target": base_url or "in-process",
+            "cache": cache,
+            "requests": requests,
+            "concurrency": concurrency,
+            "seed": seed,
+            "dataset": {
+                "funds": len(target.fund_ids),
+                "held_tickers": len(target.tickers),
+                "holdings": target.holdings,
+            },
+        },
+        "scenarios": results,
+    }
+
+
+HEADER = (
+    f"{'scenario':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}"
+    f"{'queries':>9}{'objects':>9}"
+)
+
+
+def _per_request(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def format_row(name: str, stats: Dict[str, Any]) -> str:
+    return (
+        f"{name:<28}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        f"{stats['throughput_rps'] or 0:>10.1f}{stats['errors']:>8}"
+        f"{_per_request(stats.get('queries_per_request')):>9}{_per_request(stats.get('objects_per_request')):>9}"
+    )
+
+
+def save(report: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Lines describing the change of each scenario against ``baseline``.
+    Scenarios whose p95 or ORM objects per request grew by more than
+    ``threshold`` (a fraction) are marked as regressions
+    """
+    lines = [f"{'scenario':<28}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}{'objects':>10}"]
+    for name, stats in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            lines.append(f"{name:<28}{'(new)':>10}")
+            continue
+
+        def delta(key: str) -> str:
+            if not before.get(key):
+                return "n/a"
+            return f"{(stats[key] - before[key]) / before[key]:+.1%}"
+
+        def grew(key: str) -> bool:
+            return bool(before.get(key)) and (stats.get(key) or 0) > before[key] * (1 + threshold)
+
+        regressed = grew("p95_ms") or grew("objects_per_request")
+        objects = delta("objects_per_request") if stats.get("objects_per_request") is not None else "n/a"
+        lines.append(
+            f"{name:<28}{delta('p50_ms'):>10}{delta('p95_ms'):>10}{delta('p99_ms'):>10}"
+            f"{delta('throughput_rps'):>10}{objects:>10}" + ("  REGRESSION" if regressed else "")
+        )
+    return lines
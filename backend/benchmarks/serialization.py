@@ -0,0 +1,138 @@
+"""
+CPU cost of response serialization per 1k rows: FastAPI's default path
+(response_model validation, JSON-mode dump, stdlib json) against the
+ResponseSerializer fast path, on rows shaped like the real listings
+"""
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.serialization import ResponseSerializer
+from app.models.stock_price import StockPrice as StockPriceModel
+from app.schemas.fund import Fund
+from app.schemas.stock_price import StockPrice
+
+
+def fund_rows(count: int) -> List[dict]:
+    """Dicts as built by FundService._summary_data"""
+    now = datetime(2024, 6, 1, 12, 30, 15, 123456)
+    return [{
+        "id": i,
+        "name": f"Synthetic Fund {i:05d}",
+        "strategy": "growth",
+        "inception_date": date(2015, 1, 1) + timedelta(days=i % 3000),
+        "total_aum": "125000000.00",
+        "manager_name": f"Manager {i % 1000}",
+        "expense_ratio": "0.0075",
+        "description": "Synthetic fund",
+        "created_at": now,
+        "updated_at": now,
+        "holdings_count": 500,
+        "total_return_percent": 12.3456,
+        "daily_return_percent": -0.4321,
+        "current_value": "131000000.00",
+        "unrealized_gain_loss": "6000000.00",
+        "unrealized_gain_loss_percent": 4.8,
+    } for i in range(count)]
+
+
+def holding_rows(count: int) -> List[dict]:
+    """JSON-ready dicts as built by _valued_holding"""
+    return [{
+        "id": i,
+        "fund_id": i // 500 + 1,
+        "ticker": f"T{i % 8000:04d}",
+        "company_name": f"T{i % 8000:04d} Holdings Inc.",
+        "shares": "1250.0000",
+        "purchase_price": "101.2500",
+        "purchase_date": "2023-02-01",
+        "sector": "Technology",
+        "market_cap": 25_000_000_000,
+        "created_at": "2024-06-01T12:30:15.123456",
+        "updated_at": "2024-06-01T12:30:15.123456",
+        "cost_basis": "126562.50",
+        "current_price": "118.4200",
+        "price_date": "2024-05-31",
+        "current_value": "148025.00",
+        "unrealized_gain_loss": "21462.50",
+        "unrealized_gain_loss_percent": "16.9580",
+        "weight_in_fund": "0.2000",
+    } for i in range(count)]
+
+
+def price_rows(count: int) -> List[StockPriceModel]:
+    """Transient ORM rows as returned by the price listing"""
+    now = datetime(2024, 6, 1, 12, 30, 15)
+    return [StockPriceModel(
+        id=i,
+        ticker=f"T{i % 8000:04d}",
+        date=date(2024, 1, 1) + timedelta(days=i % 365),
+        open_price=Decimal("101.2500"),
+        high_price=Decimal("103.1000"),
+        low_price=Decimal("100.9000"),
+        close_price=Decimal("102.7700"),
+        volume=1_250_000,
+        adjusted_close=Decimal("102.7700"),
+        created_at=now,
+    ) for i in range(count)]
+
+
+CASES: Dict[str, tuple] = {
+    "funds": (fund_rows, List[Fund]),
+    "holdings": (holding_rows, None),
+    "stock_prices": (price_rows, List[StockPrice]),
+}
+
+
+async def _default_path(field, rows: Any) -> bytes:
+    if field is None:
+        content = jsonable_encoder(rows)
+    else:
+        content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+
+def _cpu_per_call(call: Callable[[], Any], repeat: int) -> float:
+    call()  # warm caches and lazy schema builds
+    started = time.process_time()
+    for _ in range(repeat):
+        call()
+    return (time.process_time() - started) / repeat
+
+
+def run(rows: int = 1000, repeat: int = 20, names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """CPU milliseconds per 1k rows for each payload on both paths"""
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for name, (build, annotation) in CASES.items():
+            if names and name not in names:
+                continue
+            data = build(rows)
+            field = create_model_field(f"Response_{name}", annotation, mode="serialization") if annotation else None
+            serializer = ResponseSerializer(name, annotation)
+
+            default_body = loop.run_until_complete(_default_path(field, data))
+            if default_body != serializer.encode(data):
+                raise AssertionError(f"Fast path output differs from FastAPI's for {name}")
+
+            default = _cpu_per_call(lambda: loop.run_until_complete(_default_path(field, data)), repeat)
+            fast = _cpu_per_call(lambda: serializer.encode(data), repeat)
+            scale = 1000 / rows
+            results[name] = {
+                "default_ms_per_1k": round(default * 1000 * scale, 3),
+                "fast_ms_per_1k": round(fast * 1000 * scale, 3),
+                "saved_ms_per_1k": round((default - fast) * 1000 * scale, 3),
+                "speedup": round(default / fast, 2) if fast else None,
+                "bytes": len(default_body),
+            }
+    finally:
+        loop.close()
+    return {"rows": rows, "repeat": repeat, "payloads": results}
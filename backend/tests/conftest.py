@@ -0,0 +1,91 @@
+"""
+Shared fixtures: a throwaway SQLite database per test and a seeding helper
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.cache import get_cache, set_cache_backend
+from app.core.database import Base
+from app.models.fund import Fund, FundStrategy
+from app.models.fund_performance import FundPerformance
+from app.models.holding import Holding
+# Registers every table with Base.metadata
+import app.models.daily_return  # noqa: F401
+import app.models.data_version  # noqa: F401
+import app.models.peer_fund  # noqa: F401
+import app.models.peer_performance  # noqa: F401
+import app.models.return_ladder  # noqa: F401
+import app.models.stock_price  # noqa: F401
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session_factory(engine):
+    return async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def no_cache():
+    """Every call reaches the database, so its statements can be counted"""
+    backend = get_cache()
+    set_cache_backend(None)
+    yield
+    set_cache_backend(backend)
+
+
+async def seed_funds(db: AsyncSession, count: int, holdings_per_fund: int = 3, days: int = 5, first: int = 0) -> None:
+    """``count`` funds numbered from ``first``, each with a few holdings and a short NAV history"""
+    start = date(2024, 1, 1)
+    strategies = list(FundStrategy)
+    for i in range(first, first + count):
+        fund = Fund(
+            name=f"Test Fund {i:04d}",
+            strategy=strategies[i % len(strategies)],
+            inception_date=start,
+            total_aum=Decimal("1000000.00"),
+            manager_name=f"Manager {i}",
+            expense_ratio=Decimal("0.0075"),
+            description="Test fund",
+        )
+        db.add(fund)
+        await db.flush()
+        db.add_all(
+            Holding(
+                fund_id=fund.id,
+                ticker=f"T{j:03d}",
+                company_name=f"Company {j}",
+                shares=Decimal("100"),
+                purchase_price=Decimal("10.00"),
+                purchase_date=start,
+            )
+            for j in range(holdings_per_fund)
+        )
+        db.add_all(
+            FundPerformance(
+                fund_id=fund.id,
+                date=start + timedelta(days=d),
+                nav_price=Decimal("10.00") + d,
+                total_return=Decimal(d),
+                daily_return=Decimal("0.5"),
+                assets_under_management=Decimal("1000000.00"),
+            )
+            for d in range(days)
+        )
+    await db.commit()
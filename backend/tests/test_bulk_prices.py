@@ -0,0 +1,36 @@
+"""
+Bulk price ingestion: rejected rows do not count as changes
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models.stock_price import StockPrice
+from app.services.stock_price_service import StockPriceService
+
+
+def _row(ticker: str, day: date, close: str = "10"):
+    price = Decimal(close)
+    return (ticker, day, price, price, price, price, 1000, price)
+
+
+@pytest.mark.asyncio
+async def test_rejected_rows_leave_tickers_unchanged(db):
+    await StockPriceService(db).bulk_upsert_prices([
+        _row("AAA", date(2024, 1, 2)),
+        _row("AAA", date(2024, 1, 3), "11"),
+    ])
+
+    bad = ("BBB", date(2020, 1, 1), Decimal("-1"), Decimal("1"), Decimal("1"), Decimal("1"), 1, None)
+    totals = await StockPriceService(db).bulk_upsert_prices([
+        _row("AAA", date(2024, 1, 4), "12"),
+        ("AAA", date(2020, 1, 1), *bad[2:]),
+        bad,
+    ])
+
+    assert (totals["inserted"], totals["updated"], totals["rejected"]) == (1, 0, 2)
+    assert totals["tickers"] == ["AAA"]
+    dates = (await db.execute(select(StockPrice.date).order_by(StockPrice.date))).scalars().all()
+    assert dates == [date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)]
@@ -0,0 +1,79 @@
+"""
+Service read cache: stale reads are not stored and callers get their own copies
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.cache import MemoryCache, cached, invalidate, set_cache_backend
+from app.models.holding import Holding
+
+from conftest import seed_funds
+
+
+class Reader:
+    def __init__(self, db=None):
+        self.db = db
+        self.calls = 0
+        self.gate = None
+
+    @cached("test", tags=lambda fund_id: [f"fund:{fund_id}"])
+    async def read(self, fund_id: int) -> dict:
+        self.calls += 1
+        value = {"fund_id": fund_id, "call": self.calls, "items": [1, 2]}
+        if self.gate is not None:
+            await self.gate.wait()
+        return value
+
+    @cached("test", tags=lambda fund_id: [f"fund:{fund_id}"])
+    async def holdings(self, fund_id: int):
+        result = await self.db.execute(select(Holding).where(Holding.fund_id == fund_id))
+        return result.scalars().all()
+
+
+@pytest.fixture
+def cache():
+    backend = MemoryCache(max_bytes=1 << 20, default_ttl=60)
+    set_cache_backend(backend)
+    return backend
+
+
+@pytest.mark.asyncio
+async def test_read_invalidated_in_flight_is_not_stored(cache):
+    reader = Reader()
+    reader.gate = asyncio.Event()
+    pending = asyncio.ensure_future(reader.read(1))
+    await asyncio.sleep(0)
+    # A write commits and invalidates while the read is still running
+    invalidate("fund:1")
+    reader.gate.set()
+    assert (await pending)["call"] == 1
+
+    reader.gate = None
+    assert (await reader.read(1))["call"] == 2
+    assert (await reader.read(1))["call"] == 2
+
+
+@pytest.mark.asyncio
+async def test_callers_get_their_own_copies(cache):
+    reader = Reader()
+    first = await reader.read(1)
+    first["items"].append(3)
+    second = await reader.read(1)
+    assert second["items"] == [1, 2]
+    second["items"].append(4)
+    assert (await reader.read(1))["items"] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_orm_results_stay_in_the_callers_session(cache, db):
+    await seed_funds(db, 1)
+    reader = Reader(db)
+    holdings = await reader.holdings(1)
+    assert all(holding in db for holding in holdings)
+
+    cached_holdings = await reader.holdings(1)
+    assert [h.ticker for h in cached_holdings] == [h.ticker for h in holdings]
+    assert not any(holding in db for holding in cached_holdings)
+    assert cached_holdings[0] is not holdings[0]
@@ -0,0 +1,68 @@
+"""
+Fund loader profiles: ORM objects loaded per endpoint stay bounded by the
+page size, not by the number of holdings behind it
+"""
+from typing import List
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.core.database import get_db
+from app.core.instrumentation import current_queries
+from app.main import app
+from app.services.return_ladder_service import ReturnLadderService
+
+from conftest import seed_funds
+
+HOLDINGS_PER_FUND = 40
+PAGE = 10
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
+    """Test client on the test database, recording the ORM objects each request loads"""
+    objects: List[int] = []
+
+    async def get_test_db():
+        async with session_factory() as session:
+            try:
+                yield session
+            finally:
+                objects.append(current_queries().objects)
+
+    app.dependency_overrides[get_db] = get_test_db
+    # Without the lifespan, which would seed the configured database
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://localhost") as client:
+        client.objects = objects
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest_asyncio.fixture
+async def funds(session_factory):
+    async with session_factory() as db:
+        await seed_funds(db, 30, holdings_per_fund=HOLDINGS_PER_FUND)
+        await ReturnLadderService(db).refresh_fund_ladders()
+        await db.commit()
+
+
+async def _objects(client, path: str) -> int:
+    client.objects.clear()
+    response = await client.get(path)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["funds"] if isinstance(body, dict) and "funds" in body else body
+    return sum(client.objects)
+
+
+@pytest.mark.parametrize("path, limit", [
+    # Per fund: the fund, its ladder and its latest performance row
+    (f"/api/v1/funds/?limit={PAGE}", 3 * PAGE),
+    (f"/api/v1/funds/?search=Test Fund&limit={PAGE}", 3 * PAGE),
+    ("/api/v1/funds/1", 3),
+    (f"/api/v1/search/?q=Test Fund&limit={PAGE}", 3 * PAGE),
+])
+@pytest.mark.asyncio
+async def test_objects_per_endpoint_are_bounded(funds, client, path, limit):
+    assert await _objects(client, path) <= limit
@@ -0,0 +1,85 @@
+"""
+Request-scoped loaders: the fund list issues a constant number of
+statements however many funds it returns
+"""
+import asyncio
+from typing import Tuple
+
+import pytest
+from sqlalchemy import event
+
+from app.services.fund_service import FundService
+from app.services.loaders import DataLoader, get_loaders
+
+from conftest import seed_funds
+
+
+class StatementCounter:
+    """Counts the statements executed through an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        self._engine = engine.sync_engine
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self._engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self._engine, "before_cursor_execute", self._count)
+
+
+async def _list_statements(engine, session_factory) -> Tuple[int, int]:
+    async with session_factory() as db:
+        with StatementCounter(engine) as counter:
+            listed = await FundService(db).get_funds(limit=1000)
+    return len(listed), counter.count
+
+
+@pytest.mark.asyncio
+async def test_get_funds_statement_count_is_constant(engine, session_factory):
+    async with session_factory() as db:
+        await seed_funds(db, 5)
+    few, few_statements = await _list_statements(engine, session_factory)
+
+    async with session_factory() as db:
+        await seed_funds(db, 45, first=5)
+    many, many_statements = await _list_statements(engine, session_factory)
+
+    assert (few, many) == (5, 50)
+    assert few_statements == many_statements
+    # The funds with their aggregates and ladders, then the batched latest performance
+    assert many_statements == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_holdings_are_not_shared(db):
+    await seed_funds(db, 2, holdings_per_fund=0)
+    loaders = get_loaders(db)
+    first, second = await loaders.holdings_by_fund.load_many([1, 2])
+    assert first == [] and second == []
+    first.append("corrupted")
+    assert second == []
+    assert await loaders.holdings_by_fund.load(2) == []
+
+
+@pytest.mark.asyncio
+async def test_cancelled_dispatch_releases_waiters():
+    started = asyncio.Event()
+
+    async def batch(keys):
+        started.set()
+        await asyncio.sleep(3600)
+
+    loader = DataLoader(batch, asyncio.Lock())
+    waiter = asyncio.ensure_future(loader.load(1))
+    await started.wait()
+    # The loader holds the running dispatch, so it cannot be collected mid-flight
+    (dispatch,) = loader._tasks
+    dispatch.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(waiter, 1)
+    assert not loader._tasks
@@ -0,0 +1,80 @@
+"""
+Market data sync against the offline provider: incremental runs, unknown
+symbols and malformed responses are reported per ticker without losing
+the other tickers' rows
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.holding import Holding
+from app.models.stock_price import StockPrice
+from app.services.fake_market_provider import create_app
+from app.services.market_data_service import MarketDataClient, MarketDataService, TokenBucket, last_trading_day
+
+from conftest import seed_funds
+
+TICKERS = ["AAA", "BAD", "ZZZ"]
+
+
+@pytest.fixture(autouse=True)
+def fast_provider(monkeypatch):
+    monkeypatch.setattr(settings, "STOCK_API_URL", "http://provider/query")
+    monkeypatch.setattr(settings, "STOCK_API_BACKFILL_DAYS", 30)
+    monkeypatch.setattr(settings, "STOCK_API_RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(settings, "STOCK_API_MAX_RETRIES", 10)
+
+
+def _client() -> MarketDataClient:
+    # 503s for a third of the requests exercise the retries
+    transport = httpx.ASGITransport(app=create_app(failure_rate=0.3, seed=7))
+    return MarketDataClient(transport=transport, limiter=TokenBucket(1_000_000, period=1, capacity=1_000))
+
+
+async def _stored(db, ticker: str):
+    result = await db.execute(
+        select(func.count(), func.max(StockPrice.date)).where(StockPrice.ticker == ticker)
+    )
+    return tuple(result.one())
+
+
+@pytest.mark.asyncio
+async def test_sync_prices_records_failures_and_keeps_other_rows(db):
+    await seed_funds(db, 1, holdings_per_fund=0)
+    db.add_all(
+        Holding(fund_id=1, ticker=ticker, company_name=ticker, shares=Decimal("1"),
+                purchase_price=Decimal("1"), purchase_date=date(2024, 1, 2))
+        for ticker in TICKERS + ["CCC"]
+    )
+    # CCC is a week behind, so its run fetches only the missing days
+    behind = last_trading_day(date.today()) - timedelta(days=7)
+    db.add(StockPrice(ticker="CCC", date=behind, open_price=Decimal("1"), high_price=Decimal("1"),
+                      low_price=Decimal("1"), close_price=Decimal("1"), volume=1))
+    await db.commit()
+
+    async with _client() as client:
+        first = await MarketDataService(db, client).sync_prices()
+        aaa = await _stored(db, "AAA")
+        second = await MarketDataService(db, client).sync_prices()
+
+    assert first["tickers_requested"] == 4
+    assert first["tickers_fetched"] == 2
+    assert set(first["tickers_failed"]) == {"BAD", "ZZZ"}
+    assert "Unknown symbol" in first["tickers_failed"]["ZZZ"]
+    assert "bad-date" in first["tickers_failed"]["BAD"]
+    assert first["inserted"] == aaa[0] + (await _stored(db, "CCC"))[0] - 1
+    assert aaa[0] > 0 and aaa[1] == last_trading_day(date.today())
+    assert (await _stored(db, "BAD"))[0] == 0
+    ccc_count, ccc_latest = await _stored(db, "CCC")
+    assert ccc_latest == aaa[1] and ccc_count <= 6
+
+    # Everything fetched is current now; only the failing tickers are retried
+    assert second["tickers_up_to_date"] == 2
+    assert second["tickers_fetched"] == 0
+    assert set(second["tickers_failed"]) == {"BAD", "ZZZ"}
+    assert second["inserted"] == second["updated"] == 0
+    assert await _stored(db, "AAA") == aaa
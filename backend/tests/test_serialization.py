@@ -0,0 +1,59 @@
+"""
+Response serialization: trusted payloads are shaped without validation and
+encode to the same JSON as the validating path
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from app.core.serialization import ResponseSerializer
+from app.models.fund import FundStrategy
+from app.schemas.fund import Fund, FundPerformanceResponse
+
+
+def _fund(**overrides) -> dict:
+    fund = {
+        "id": 1,
+        "name": "Fund",
+        "strategy": FundStrategy.growth,
+        "inception_date": date(2020, 1, 1),
+        "total_aum": Decimal("1000.00"),
+        "created_at": datetime(2024, 1, 1, 12, 0, 0, 123456),
+        "updated_at": datetime(2024, 1, 2),
+        # Typed differently from the model, as service dicts often are
+        "total_return_percent": 12.3456,
+        "expense_ratio": "0.0075",
+        "trailing_returns": {"1y": 4, "3y": None},
+        "unused": object(),
+    }
+    fund.update(overrides)
+    return fund
+
+
+def test_trusted_payloads_match_validated_json():
+    for annotation, content in (
+        (List[Fund], [_fund(), _fund(id=2, holdings_count=3, returns_as_of=date(2024, 1, 5))]),
+        (FundPerformanceResponse, {
+            "fund_id": 1, "fund_name": "Fund", "period_days": 30,
+            "performance_data": [{"date": date(2024, 1, 1), "nav_price": Decimal("10.5000"), "daily_return": 0.25}],
+        }),
+    ):
+        trusted = ResponseSerializer("trusted", annotation)
+        validated = ResponseSerializer("validated", annotation, validate=True)
+        assert trusted.adapter is None
+        assert trusted.encode(content) == validated.encode(content)
+
+
+def test_unsupported_annotations_are_validated():
+    class Aliased(BaseModel):
+        value: int = Field(serialization_alias="v")
+
+    class Mixed(BaseModel):
+        value: Optional[Union[int, str]] = None
+
+    for annotation in (Aliased, Mixed):
+        serializer = ResponseSerializer("fallback", annotation)
+        assert serializer.adapter is not None
+    assert ResponseSerializer("fallback", Mixed).encode({"value": "1"}) == b'{"value":"1"}'
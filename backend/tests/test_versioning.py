@@ -0,0 +1,83 @@
+"""
+Data versions: table keys are striped across rows, and the performance
+ETag moves with NAV writes however they are loaded
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select
+
+from app.core.database import get_db
+from app.core.versioning import VersionTracker, bump
+from app.main import app
+from app.models.data_version import DataVersion
+from app.models.fund_performance import FundPerformance
+
+from conftest import seed_funds
+
+
+@pytest.mark.asyncio
+async def test_table_keys_are_summed_over_stripes(db):
+    # A version written before striping still counts
+    db.add(DataVersion(key="holdings", version=5))
+    await bump(db, "holdings", "fund:1")
+    await bump(db, "holdings", "fund:2")
+    await bump(db, "holdings", "fund:2")
+    await db.commit()
+
+    # Writes to different funds do not wait on one row lock
+    rows = (await db.execute(select(DataVersion.key).where(DataVersion.key.like("holdings%")))).scalars().all()
+    assert sorted(rows) == ["holdings", "holdings#4", "holdings#6"]
+
+    versions = await VersionTracker().get(db, ["holdings", "fund:1", "fund:2", "peers"])
+    assert versions == {"holdings": 8, "fund:1": 1, "fund:2": 2, "peers": 0}
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://localhost") as client:
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def _revalidate(client, etag: str):
+    return await client.get("/api/v1/funds/1/performance?days=3650", headers={"If-None-Match": etag})
+
+
+@pytest.mark.asyncio
+async def test_performance_etag_moves_with_navs(session_factory, client):
+    async with session_factory() as db:
+        await seed_funds(db, 2)
+
+    first = await client.get("/api/v1/funds/1/performance?days=3650")
+    etag = first.headers["ETag"]
+    assert (await _revalidate(client, etag)).status_code == 304
+
+    written = await client.post("/api/v1/funds/1/performance", json=[
+        {"date": "2024-02-01", "nav_price": "11.5"},
+        {"date": "2024-02-01", "nav_price": "12"},
+    ])
+    assert written.json() == {"fund_id": 1, "written": 1, "returns_as_of": "2024-02-01"}
+    second = await _revalidate(client, etag)
+    assert second.status_code == 200
+    assert second.json()["performance_data"][0]["nav_price"] == "12.0000"
+
+    # A load that bypasses the services leaves the versions alone
+    async with session_factory() as db:
+        await db.execute(insert(FundPerformance).values(
+            fund_id=1, date=date(2024, 2, 2), nav_price=Decimal("12.5"),
+        ))
+        await db.commit()
+    third = await _revalidate(client, second.headers["ETag"])
+    assert third.status_code == 200
+    assert len(third.json()["performance_data"]) == len(second.json()["performance_data"]) + 1
+
+    assert (await client.post("/api/v1/funds/99/performance", json=[])).status_code == 404
@@ -2,12 +2,20 @@
 -- PostgreSQL Database Schema for Fund Management System
 
 -- Drop tables if they exist (for clean setup)
+DROP TABLE IF EXISTS fund_return_ladders CASCADE;
+DROP TABLE IF EXISTS ticker_return_ladders CASCADE;
+DROP TABLE IF EXISTS daily_returns CASCADE;
 DROP TABLE IF EXISTS fund_performance CASCADE;
 DROP TABLE IF EXISTS holdings CASCADE;
 DROP TABLE IF EXISTS stock_prices CASCADE;
+DROP TABLE IF EXISTS peer_rankings CASCADE;
+DROP TABLE IF EXISTS peer_performance CASCADE;
 DROP TABLE IF EXISTS peer_funds CASCADE;
 DROP TABLE IF EXISTS funds CASCADE;
 
+-- Trigram operators and GIN operator classes behind fuzzy search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create enum types
 CREATE TYPE fund_strategy AS ENUM (
     'growth',
@@ -30,7 +38,8 @@ CREATE TYPE peer_category AS ENUM (
     'emerging_markets',
     'sector_technology',
     'sector_healthcare',
-    'sector_financial'
+    'sector_financial',
+    'balanced'
 );
 
 -- Funds table: Core fund information
@@ -87,6 +96,18 @@ CREATE TABLE stock_prices (
     )
 );
 
+-- Daily returns table: close-to-close change per ticker, derived from stock_prices
+CREATE TABLE daily_returns (
+    ticker VARCHAR(10) NOT NULL,
+    date DATE NOT NULL,
+    close_price DECIMAL(10, 4) NOT NULL,
+    previous_close DECIMAL(10, 4) NOT NULL,
+    change DECIMAL(10, 4) NOT NULL,
+    change_percent DECIMAL(12, 4) NOT NULL,
+    volume BIGINT NOT NULL,
+    PRIMARY KEY (ticker, date)
+);
+
 -- Peer funds table: Benchmark/competitor fund data
 CREATE TABLE peer_funds (
     id SERIAL PRIMARY KEY,
@@ -100,6 +121,41 @@ CREATE TABLE peer_funds (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Peer performance table: Daily NAV of each peer fund from the benchmark data vendor
+CREATE TABLE peer_performance (
+    peer_fund_id INTEGER NOT NULL REFERENCES peer_funds(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    nav_price DECIMAL(10, 4) NOT NULL,
+    PRIMARY KEY (peer_fund_id, date),
+    CONSTRAINT ck_peer_positive_nav CHECK (nav_price > 0)
+);
+
+-- Peer rankings: trailing returns (percent, 3y/5y annualized) and percentile
+-- ranks within the peer category for every fund and peer; rewritten nightly
+CREATE TABLE peer_rankings (
+    entity_type VARCHAR(4) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    category peer_category,
+    name VARCHAR(255) NOT NULL,
+    total_aum DECIMAL(15, 2),
+    expense_ratio DECIMAL(5, 4),
+    as_of DATE,
+    return_1m DECIMAL(12, 4),
+    return_3m DECIMAL(12, 4),
+    return_ytd DECIMAL(12, 4),
+    return_1y DECIMAL(12, 4),
+    return_3y DECIMAL(12, 4),
+    return_5y DECIMAL(12, 4),
+    percentile_1m DECIMAL(5, 2),
+    percentile_3m DECIMAL(5, 2),
+    percentile_ytd DECIMAL(5, 2),
+    percentile_1y DECIMAL(5, 2),
+    percentile_3y DECIMAL(5, 2),
+    percentile_5y DECIMAL(5, 2),
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity_type, entity_id)
+);
+
 -- Fund performance table: Historical NAV and performance metrics
 CREATE TABLE fund_performance (
     id SERIAL PRIMARY KEY,
@@ -115,16 +171,68 @@ CREATE TABLE fund_performance (
     CONSTRAINT positive_nav CHECK (nav_price > 0)
 );
 
+-- Return ladders: trailing returns (percent, 3y annualized) ending at each
+-- fund's last NAV and each ticker's last adjusted close; rewritten per entity
+CREATE TABLE fund_return_ladders (
+    fund_id INTEGER PRIMARY KEY REFERENCES funds(id) ON DELETE CASCADE,
+    as_of DATE NOT NULL,
+    first_date DATE NOT NULL,
+    return_1d DECIMAL(12, 4),
+    return_1w DECIMAL(12, 4),
+    return_1m DECIMAL(12, 4),
+    return_3m DECIMAL(12, 4),
+    return_ytd DECIMAL(12, 4),
+    return_1y DECIMAL(12, 4),
+    return_3y DECIMAL(12, 4),
+    return_itd DECIMAL(12, 4),
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE ticker_return_ladders (
+    ticker VARCHAR(10) PRIMARY KEY,
+    as_of DATE NOT NULL,
+    first_date DATE NOT NULL,
+    return_1d DECIMAL(12, 4),
+    return_1w DECIMAL(12, 4),
+    return_1m DECIMAL(12, 4),
+    return_3m DECIMAL(12, 4),
+    return_ytd DECIMAL(12, 4),
+    return_1y DECIMAL(12, 4),
+    return_3y DECIMAL(12, 4),
+    return_itd DECIMAL(12, 4),
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Data versions: monotonic counters per table or per fund ("funds", "fund:42"),
+-- bumped in the same transaction as the write; they back the API's ETags
+CREATE TABLE data_versions (
+    key VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for performance optimization
 CREATE INDEX idx_holdings_fund_id ON holdings(fund_id);
 CREATE INDEX idx_holdings_ticker ON holdings(ticker);
+CREATE INDEX idx_holdings_ticker_id ON holdings(ticker, id);
 CREATE INDEX idx_stock_prices_ticker ON stock_prices(ticker);
 CREATE INDEX idx_stock_prices_date ON stock_prices(date);
 CREATE INDEX idx_stock_prices_ticker_date ON stock_prices(ticker, date);
+CREATE INDEX idx_stock_prices_date_desc_ticker ON stock_prices(date DESC, ticker);
+CREATE INDEX idx_daily_returns_date_change ON daily_returns(date, change_percent);
 CREATE INDEX idx_fund_performance_fund_id ON fund_performance(fund_id);
 CREATE INDEX idx_fund_performance_date ON fund_performance(date);
 CREATE INDEX idx_fund_performance_fund_date ON fund_performance(fund_id, date);
 CREATE INDEX idx_peer_funds_category ON peer_funds(benchmark_category);
+CREATE INDEX idx_peer_performance_date ON peer_performance(date);
+CREATE INDEX idx_peer_rankings_category_type ON peer_rankings(category, entity_type);
+
+-- Trigram indexes: serve ILIKE '%term%' and the word similarity operator (<%)
+CREATE INDEX idx_funds_name_trgm ON funds USING gin (name gin_trgm_ops);
+CREATE INDEX idx_funds_manager_trgm ON funds USING gin (manager_name gin_trgm_ops);
+CREATE INDEX idx_funds_description_trgm ON funds USING gin (description gin_trgm_ops);
+CREATE INDEX idx_holdings_ticker_trgm ON holdings USING gin (ticker gin_trgm_ops);
+CREATE INDEX idx_holdings_company_trgm ON holdings USING gin (company_name gin_trgm_ops);
 
 -- Update timestamp trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -142,62 +250,116 @@ CREATE TRIGGER update_funds_updated_at BEFORE UPDATE ON funds
 CREATE TRIGGER update_holdings_updated_at BEFORE UPDATE ON holdings
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
--- Views for common queries
-CREATE VIEW fund_summary AS
-SELECT 
-    f.id,
-    f.name,
-    f.strategy,
-    f.inception_date,
-    f.total_aum,
-    f.manager_name,
-    f.expense_ratio,
-    COUNT(h.id) as total_holdings,
-    COALESCE(SUM(h.shares * sp.close_price), 0) as current_market_value,
-    fp.nav_price as latest_nav,
-    fp.total_return as latest_total_return
+-- Materialized read models behind the fund and holding listings; the API
+-- refreshes them CONCURRENTLY after holding/fund writes and price ingestion.
+-- latest_prices resolves each held ticker's latest close with one index probe
+-- instead of a correlated MAX(date) per holding row.
+CREATE MATERIALIZED VIEW holding_details AS
+WITH valued AS (
+    WITH latest_prices AS (
+        SELECT t.ticker, p.date, p.close_price
+        FROM (SELECT DISTINCT ticker FROM holdings) t
+        LEFT JOIN LATERAL (
+            SELECT sp.date, sp.close_price
+            FROM stock_prices sp
+            WHERE sp.ticker = t.ticker
+            ORDER BY sp.date DESC
+            LIMIT 1
+        ) p ON true
+    )
+    SELECT
+        h.*,
+        lp.close_price AS current_price,
+        lp.date AS price_date,
+        h.shares * h.purchase_price AS exact_cost_basis,
+        h.shares * COALESCE(lp.close_price, h.purchase_price) AS exact_current_value
+    FROM holdings h
+    LEFT JOIN latest_prices lp ON lp.ticker = h.ticker
+)
+SELECT
+    v.id, v.fund_id, f.name AS fund_name, v.ticker, v.company_name, v.shares,
+    v.purchase_price, v.purchase_date, v.sector, v.market_cap, v.created_at, v.updated_at,
+    v.current_price, v.price_date,
+    ROUND(v.exact_cost_basis, 2) AS cost_basis,
+    ROUND(v.exact_current_value, 2) AS current_value,
+    ROUND(v.exact_current_value - v.exact_cost_basis, 2) AS unrealized_gain_loss,
+    ROUND(CASE WHEN v.exact_cost_basis > 0
+          THEN (v.exact_current_value - v.exact_cost_basis) / v.exact_cost_basis * 100
+          ELSE 0 END, 4) AS unrealized_gain_loss_percent,
+    ROUND(CASE WHEN SUM(v.exact_current_value) OVER fund_window > 0
+          THEN v.exact_current_value / SUM(v.exact_current_value) OVER fund_window * 100
+          ELSE 0 END, 4) AS weight_in_fund
+FROM valued v
+JOIN funds f ON f.id = v.fund_id
+WINDOW fund_window AS (PARTITION BY v.fund_id);
+
+CREATE MATERIALIZED VIEW fund_summary AS
+WITH valued AS (
+    WITH latest_prices AS (
+        SELECT t.ticker, p.date, p.close_price
+        FROM (SELECT DISTINCT ticker FROM holdings) t
+        LEFT JOIN LATERAL (
+            SELECT sp.date, sp.close_price
+            FROM stock_prices sp
+            WHERE sp.ticker = t.ticker
+            ORDER BY sp.date DESC
+            LIMIT 1
+        ) p ON true
+    )
+    SELECT
+        h.fund_id,
+        h.shares * h.purchase_price AS exact_cost_basis,
+        h.shares * COALESCE(lp.close_price, h.purchase_price) AS exact_current_value
+    FROM holdings h
+    LEFT JOIN latest_prices lp ON lp.ticker = h.ticker
+),
+totals AS (
+    SELECT
+        fund_id,
+        COUNT(*) AS holdings_count,
+        SUM(exact_cost_basis) AS total_cost_basis,
+        SUM(exact_current_value) AS total_market_value
+    FROM valued
+    GROUP BY fund_id
+)
+SELECT
+    f.id, f.name, f.strategy, f.inception_date, f.total_aum, f.manager_name,
+    f.expense_ratio, f.description, f.created_at, f.updated_at,
+    COALESCE(t.holdings_count, 0) AS holdings_count,
+    COALESCE(t.total_cost_basis, 0) AS total_cost_basis,
+    COALESCE(t.total_market_value, 0) AS total_market_value,
+    fp.date AS performance_date,
+    fp.nav_price AS latest_nav,
+    fp.total_return AS latest_total_return,
+    fp.daily_return AS latest_daily_return,
+    fp.assets_under_management AS latest_aum
 FROM funds f
-LEFT JOIN holdings h ON f.id = h.fund_id
-LEFT JOIN stock_prices sp ON h.ticker = sp.ticker 
+LEFT JOIN totals t ON t.fund_id = f.id
 LEFT JOIN LATERAL (
-    SELECT nav_price, total_return 
-    FROM fund_performance 
-    WHERE fund_id = f.id 
-    ORDER BY date DESC 
+    SELECT date, nav_price, total_return, daily_return, assets_under_management
+    FROM fund_performance
+    WHERE fund_id = f.id
+    ORDER BY date DESC
     LIMIT 1
-) fp ON true
-WHERE sp.date = (SELECT MAX(date) FROM stock_prices WHERE ticker = sp.ticker)
-   OR sp.date IS NULL
-GROUP BY f.id, f.name, f.strategy, f.inception_date, f.total_aum, 
-         f.manager_name, f.expense_ratio, fp.nav_price, fp.total_return;
-
-CREATE VIEW holding_details AS
-SELECT 
-    h.id,
-    h.fund_id,
-    f.name as fund_name,
-    h.ticker,
-    h.company_name,
-    h.shares,
-    h.purchase_price,
-    h.purchase_date,
-    h.sector,
-    sp.close_price as current_price,
-    (h.shares * h.purchase_price) as cost_basis,
-    (h.shares * sp.close_price) as current_value,
-    ((sp.close_price - h.purchase_price) / h.purchase_price * 100) as percent_return,
-    (h.shares * (sp.close_price - h.purchase_price)) as unrealized_gain_loss
-FROM holdings h
-JOIN funds f ON h.fund_id = f.id
-LEFT JOIN stock_prices sp ON h.ticker = sp.ticker 
-WHERE sp.date = (SELECT MAX(date) FROM stock_prices WHERE ticker = h.ticker)
-   OR sp.date IS NULL;
+) fp ON true;
+
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY requires a unique index
+CREATE UNIQUE INDEX idx_holding_details_id ON holding_details (id);
+CREATE INDEX idx_holding_details_fund_ticker ON holding_details (fund_id, ticker);
+CREATE INDEX idx_holding_details_ticker_id ON holding_details (ticker, id);
+CREATE UNIQUE INDEX idx_fund_summary_id ON fund_summary (id);
+CREATE UNIQUE INDEX idx_fund_summary_name ON fund_summary (name);
+CREATE INDEX idx_holding_details_ticker_trgm ON holding_details USING gin (ticker gin_trgm_ops);
+CREATE INDEX idx_holding_details_company_trgm ON holding_details USING gin (company_name gin_trgm_ops);
 
 -- Comments for documentation
 COMMENT ON TABLE funds IS 'Core fund information managed by the portfolio manager';
 COMMENT ON TABLE holdings IS 'Individual stock positions within each fund';
 COMMENT ON TABLE stock_prices IS 'Historical stock price data for all holdings';
+COMMENT ON TABLE daily_returns IS 'Daily close-to-close returns maintained from stock_prices on ingestion';
 COMMENT ON TABLE peer_funds IS 'Benchmark and competitor fund data for comparison';
+COMMENT ON TABLE peer_performance IS 'Daily NAV history of peer funds';
+COMMENT ON TABLE peer_rankings IS 'Nightly trailing returns and category percentile ranks for funds and peers';
 COMMENT ON TABLE fund_performance IS 'Historical NAV and performance metrics for funds';
-COMMENT ON VIEW fund_summary IS 'Summary view with key metrics for all funds';
-COMMENT ON VIEW holding_details IS 'Detailed view of holdings with current valuations';
\ No newline at end of file
+COMMENT ON MATERIALIZED VIEW fund_summary IS 'Read model: fund listing with holdings totals and latest performance';
+COMMENT ON MATERIALIZED VIEW holding_details IS 'Read model: holdings marked to the latest price with P&L and fund weights';
\ No newline at end of file
@@ -130,4 +130,20 @@ SELECT
     (random() * 20 - 5) as total_return, -- Random return between -5% to 15%
     (random() * 4 - 2) as daily_return, -- Random daily return between -2% to 2%
     250000000 + (random() * 10000000 - 5000000) as assets_under_management
-;
\ No newline at end of file
+;
+-- Derive daily returns from the seeded stock prices
+INSERT INTO daily_returns (ticker, date, close_price, previous_close, change, change_percent, volume)
+SELECT ticker, date, close_price, previous_close,
+       close_price - previous_close,
+       (close_price - previous_close) / previous_close * 100,
+       volume
+FROM (
+    SELECT ticker, date, close_price, volume,
+           LAG(close_price) OVER (PARTITION BY ticker ORDER BY date) AS previous_close
+    FROM stock_prices
+) w
+WHERE previous_close > 0;
+
+-- Populate the read models from the seeded tables
+REFRESH MATERIALIZED VIEW holding_details;
+REFRESH MATERIALIZED VIEW fund_summary;
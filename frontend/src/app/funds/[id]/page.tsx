@@ -33,6 +33,9 @@ interface FundDetailPageProps {
   params: Promise<{ id: string }>;
 }
 
+// Upper bound on points per chart series; longer ranges are downsampled server-side
+const PERFORMANCE_CHART_POINTS = 250;
+
 export default function FundDetailPage({ params }: FundDetailPageProps) {
   const { id } = use(params);
   const fundId = parseInt(id);
@@ -41,7 +44,8 @@ export default function FundDetailPage({ params }: FundDetailPageProps) {
   const { holdings, loading: holdingsLoading } = useFundHoldings(fundId);
   const { performance, loading: performanceLoading } = useFundPerformance(
     fundId,
-    90
+    90,
+    PERFORMANCE_CHART_POINTS
   );
   const { peers, loading: peersLoading } = useFundPeers(fundId);
 
@@ -58,7 +58,7 @@ export function useFund(fundId: number) {
   return { fund, loading, error }
 }
 
-export function useFundPerformance(fundId: number, days: number = 30) {
+export function useFundPerformance(fundId: number, days: number = 30, maxPoints?: number) {
   const [performance, setPerformance] = useState<FundPerformanceResponse | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
@@ -69,7 +69,7 @@ export function useFundPerformance(fundId: number, days: number = 30) {
     async function fetchPerformance() {
       try {
         setLoading(true)
-        const data = await api.getFundPerformance(fundId, days)
+        const data = await api.getFundPerformance(fundId, days, maxPoints)
         setPerformance(data)
         setError(null)
       } catch (err) {
@@ -80,7 +80,7 @@ export function useFundPerformance(fundId: number, days: number = 30) {
     }
 
     fetchPerformance()
-  }, [fundId, days])
+  }, [fundId, days, maxPoints])
 
   return { performance, loading, error }
 }
@@ -15,6 +15,8 @@ export interface Fund {
   current_value: string | null
   total_return_percent: number | null
   daily_return_percent: number | null
+  returns_as_of?: string | null
+  trailing_returns?: TrailingWindows | null
   unrealized_gain_loss: string
   unrealized_gain_loss_percent: string
 }
@@ -39,6 +41,14 @@ export interface Holding {
   weight_in_fund: string | null
 }
 
+export interface TickerReturns {
+  ticker: string
+  company_name: string | null
+  as_of: string | null
+  first_date: string | null
+  trailing_returns: TrailingWindows | null
+}
+
 export interface FundPerformanceData {
   date: string
   nav_price: string
@@ -61,16 +71,62 @@ export interface PeerComparisonData {
   total_aum: string | null
   expense_ratio: string | null
   total_return: number | null
+  trailing_returns?: TrailingWindows | null
+  percentile_ranks?: TrailingWindows | null
 }
 
+// Keyed by window: 1m, 3m, ytd, 1y, 3y and 5y (annualized)
+export type TrailingWindows = Record<string, string | null>
+
 export interface PeerComparisonResponse {
   fund_id: number
   fund_name: string
   fund_strategy: string
+  peer_category?: string | null
+  as_of?: string | null
   fund_performance: number | null
+  trailing_returns?: TrailingWindows | null
+  percentile_ranks?: TrailingWindows | null
+  peer_count?: number
   peers: PeerComparisonData[]
 }
 
+export interface FundMatch {
+  fund_id: number
+  name: string
+  manager_name: string | null
+  strategy: string
+  score: number
+}
+
+export interface SecurityMatch {
+  ticker: string
+  company_name: string | null
+  fund_count: number
+  score: number
+}
+
+export interface SearchResponse {
+  query: string
+  funds: FundMatch[]
+  securities: SecurityMatch[]
+}
+
+export interface Suggestion {
+  kind: 'fund' | 'security'
+  fund_id: number | null
+  ticker: string | null
+  label: string
+  detail: string | null
+  fund_count?: number | null
+  match: 'name' | 'manager' | 'ticker' | 'company'
+}
+
+export interface AutocompleteResponse {
+  query: string
+  suggestions: Suggestion[]
+}
+
 class ApiError extends Error {
   constructor(public status: number, message: string) {
     super(message)
@@ -104,8 +160,9 @@ export const api = {
     return handleResponse<Fund>(response)
   },
 
-  async getFundPerformance(fundId: number, days: number = 30): Promise<FundPerformanceResponse> {
-    const response = await fetch(`${API_BASE_URL}/api/v1/funds/${fundId}/performance?days=${days}`)
+  async getFundPerformance(fundId: number, days: number = 30, maxPoints?: number): Promise<FundPerformanceResponse> {
+    const downsample = maxPoints ? `&max_points=${maxPoints}` : ''
+    const response = await fetch(`${API_BASE_URL}/api/v1/funds/${fundId}/performance?days=${days}${downsample}`)
     return handleResponse<FundPerformanceResponse>(response)
   },
 
@@ -137,6 +194,22 @@ export const api = {
     const response = await fetch(`${API_BASE_URL}/api/v1/holdings/fund/${fundId}/top?limit=${limit}`)
     return handleResponse<Holding[]>(response)
   },
+
+  async getFundTickerReturns(fundId: number): Promise<TickerReturns[]> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/holdings/fund/${fundId}/returns`)
+    return handleResponse<TickerReturns[]>(response)
+  },
+
+  // Search endpoints
+  async search(query: string, limit: number = 10): Promise<SearchResponse> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/search/?q=${encodeURIComponent(query)}&limit=${limit}`)
+    return handleResponse<SearchResponse>(response)
+  },
+
+  async autocomplete(prefix: string, limit: number = 10): Promise<AutocompleteResponse> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/search/autocomplete?q=${encodeURIComponent(prefix)}&limit=${limit}`)
+    return handleResponse<AutocompleteResponse>(response)
+  },
 }
 
 // Utility functions for formatting